@@ -1,17 +1,46 @@
 # backend/api.py
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.requests import HTTPConnection
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from robot import RobotArm
-from typing import List
+from robot import INITIAL_BIN_COUNTS, RobotArm, MotionExecutor, VersionConflict
+from fleet import RobotRegistry, RobotUnit
+from encoding import MATRIX_MEDIA_TYPE, MatrixResponse, NumpyJSONResponse, encode_matrix, negotiate_matrix
+from trajectory import trapezoidal_profile
+from programs import MotionProgram
+from telemetry import DEFAULT_CAPACITY as TELEMETRY_CAPACITY, as_matrix, iter_ndjson, replay_path
+from cache import LRUCache, quantize_key
+from collision import CollisionChecker
+from planner import PathPlanner, PlanningFailed, path_length, time_parametrize
+from persistence import StatePersistence
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, MetricsMiddleware
+from profiling import Profiler, ProfilingMiddleware
+from kinematics import forward_kinematics, quaternion_to_rotation, rotation_to_quaternion, solve_path
+from contextlib import asynccontextmanager
+from typing import Annotated, Dict, List, Literal, Optional
+import asyncio
 import os
-import uvicorn
+import time
 import numpy as np
 
+# Set to 1 to precompute the planner table and exercise the numeric paths before serving
+WARMUP_ENV = "YANIBOT_WARMUP"
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm the caches before the first request when YANIBOT_WARMUP is set."""
+    if os.environ.get(WARMUP_ENV, "").lower() in ("1", "true", "yes", "on"):
+        await asyncio.to_thread(warm_up)
+    yield
+    if persistence is not None:
+        persistence.close()  # Last changes and a snapshot, so the next start restores from the snapshot alone
+
 app = FastAPI(
     title="YaniBot API", 
     version="1.0.0",
-    description="ABB IRB6600 Robot Control API"
+    description="ABB IRB6600 Robot Control API",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -22,22 +51,159 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the robot arm
-robot = RobotArm(isEmergencyMode=False, isPaused=False, isMoving=False)
+# Request counts and latencies per route, plus the collectors registered below, served at /metrics
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Opt-in phase timers and stack sampler (YANIBOT_PROFILE=1 or POST /admin/profiling); a pass-through while off
+profiler = Profiler.from_env()
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Journal and snapshots of the robot states in STATE_DIR, restored on startup; states are lost on restart if unset
+persistence = None
+if os.environ.get('STATE_DIR'):
+    persistence = StatePersistence(
+        os.environ['STATE_DIR'],
+        flush_interval=float(os.environ.get('STATE_FLUSH_INTERVAL', 0.05)),
+        fsync=os.environ.get('STATE_FSYNC', 'false').lower() == 'true'
+    )
+
+# Floor, tables, bins and self-collision checks of the default cell, applied to every planned move
+collision_checker = CollisionChecker(clearance=float(os.environ.get('COLLISION_CLEARANCE', 0.0)))
+
+# Every simulated robot in this process; the unprefixed routes act on the default one
+registry = RobotRegistry(
+    max_robots=int(os.environ.get('MAX_ROBOTS', 1000)),
+    telemetry_capacity=int(os.environ.get('TELEMETRY_CAPACITY', TELEMETRY_CAPACITY)),
+    telemetry_dir=os.environ.get('TELEMETRY_DIR'),
+    persistence=persistence,
+    collision_checker=collision_checker
+)
+
+def select_unit(connection: HTTPConnection, robot_id: str):
+    """
+    Resolve the `{robot_id}` path segment of the `/robots/{robot_id}` mount, for `get_unit`.
+    
+    Raises:
+        HTTPException: If there is no robot with that ID.
+    """
+    try:
+        connection.state.unit = registry.get(robot_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown robot {robot_id}")
+
+def get_unit(connection: HTTPConnection):
+    """
+    The robot a request acts on: the one `select_unit` resolved under `/robots/{robot_id}`, the default robot at the
+    root. Takes no request parameter, so the root mount has no `robot_id` of its own.
+    """
+    return getattr(connection.state, "unit", registry.default)
+
+def get_robot(unit: RobotUnit = Depends(get_unit)):
+    return unit.robot
+
+def get_executor(unit: RobotUnit = Depends(get_unit)):
+    return unit.executor
+
+# Routes that act on one robot, mounted at the root for the default robot and under /robots/{robot_id}
+robot_router = APIRouter()
+
+# Encoded /interpolate responses keyed on quantized (start, target, steps)
+interpolate_cache = LRUCache(maxsize=int(os.environ.get('INTERPOLATE_CACHE_SIZE', 256)))
+
+# Collision-free joint-space paths in the default cell, cached on (start, goal)
+planner = PathPlanner(
+    collision_checker, registry.default.robot.lower_limits, registry.default.robot.upper_limits,
+    cache_size=int(os.environ.get('PLAN_CACHE_SIZE', 256))
+)
+
+# Compiled motion programs by name, shared by every robot
+programs: Dict[str, MotionProgram] = {}
+
+metrics.collector("yanibot_robots", "gauge", "Robots simulated by this process.", lambda: len(registry))
+metrics.collector("yanibot_active_moves", "gauge", "Unfinished moves across all robots.", registry.active_moves)
+metrics.collector(
+    "yanibot_control_tick_lateness_seconds", "histogram",
+    "How late motion executor control ticks wake up, across all robots.", lambda: registry.tick_jitter
+)
+metrics.collector(
+    "yanibot_stop_latency_seconds", "histogram",
+    "Time from a stop, emergency, safety or pause write to the running move halting, across all robots.",
+    lambda: registry.stop_latency
+)
+metrics.collector(
+    "yanibot_state_stream_clients", "gauge", "Connected /ws/state clients.",
+    lambda: sum(len(unit.broadcaster.subscribers) for unit in registry)
+)
+if persistence is not None:
+    metrics.collector(
+        "yanibot_state_journal_records_total", "counter", "Robot states appended to the state journal.",
+        lambda: persistence.records
+    )
+    metrics.collector(
+        "yanibot_state_journal_batches_total", "counter", "Batched writes to the state journal.",
+        lambda: persistence.batches
+    )
+    metrics.collector(
+        "yanibot_state_compactions_total", "counter", "State snapshots written in place of the journal.",
+        lambda: persistence.compactions
+    )
+metrics.collector("yanibot_programs", "gauge", "Compiled motion programs.", lambda: len(programs))
+metrics.collector("yanibot_interpolate_cache_entries", "gauge", "Entries in the /interpolate response cache.", lambda: len(interpolate_cache))
+metrics.collector("yanibot_interpolate_cache_hits_total", "counter", "/interpolate response cache hits.", lambda: interpolate_cache.hits)
+metrics.collector("yanibot_interpolate_cache_misses_total", "counter", "/interpolate response cache misses.", lambda: interpolate_cache.misses)
+metrics.collector("yanibot_plan_cache_hits_total", "counter", "/plan cache hits.", lambda: planner.cache.hits)
+metrics.collector("yanibot_plan_cache_misses_total", "counter", "/plan cache misses.", lambda: planner.cache.misses)
+metrics.collector(
+    "yanibot_interpolate_cache_evictions_total", "counter", "/interpolate response cache evictions.",
+    lambda: interpolate_cache.evictions
+)
+
+def warm_up():
+    """
+    Precompute what the first requests would otherwise pay for.
+    Plans the collision-free paths between every pair of distinct preset poses into the planner cache, and runs
+    interpolation, trajectory generation, forward kinematics and a collision check once so their first calls
+    are not slower than the rest. Run before serving when YANIBOT_WARMUP is set.
+    
+    Returns:
+        dict: The number of paths planned and the warm-up time in seconds.
+    """
+    from simulation import PRESET_POSITIONS  # Only needed here, kept off the import path
+    started = time.perf_counter()
+    robot = registry.default.robot
+    poses = []
+    for pose in PRESET_POSITIONS.values():
+        if pose not in poses:
+            poses.append(pose)
+    plans = 0
+    for start in poses:
+        for target in poses:
+            if start is not target:
+                planner.plan(start, target)
+                plans += 1
+    interpolate_path(poses[0], poses[1])
+    _, path = trapezoidal_profile(poses[0], poses[1], robot.max_velocity, robot.max_acceleration, registry.period)
+    forward_kinematics(path)
+    collision_checker.first_collision(path)
+    return {"plans": plans, "seconds": time.perf_counter() - started}
 
 def interpolate_path(startAngles, targetAngles, steps=20):
     """
     Interpolates between startAngles and targetAngles in a given number of steps.
+    The whole path is computed in one broadcast operation.
     Args:
         startAngles (list of float): Starting joint angles.
         targetAngles (list of float): Target joint angles.
         steps (int): Number of interpolation steps.
     Returns:
-        list of list of float: Interpolated joint angles at each step.
+        numpy.ndarray: Contiguous (steps, 6) array of joint angles, one row per step.
     """
-    current = np.array(startAngles)
-    target = np.array(targetAngles)
-    return [list(current + alpha * (target - current)) for alpha in np.linspace(0, 1, steps)]
+    current = np.asarray(startAngles, dtype=np.float64)
+    target = np.asarray(targetAngles, dtype=np.float64)
+    path = current + np.linspace(0.0, 1.0, steps)[:, None] * (target - current)
+    path[-1] = target  # Land exactly on the target despite rounding
+    return path
 
 class MovingStateRequest(BaseModel):
     is_moving: bool
@@ -46,11 +212,52 @@ class InterpolateRequest(BaseModel):
     startAngles: list[float] = Field(..., min_length=6, max_length=6)
     targetAngles: list[float] = Field(..., min_length=6, max_length=6)
 
+class ProgramWaypoint(BaseModel):
+    angles: List[float] = Field(..., min_length=6, max_length=6)
+    duration: float = Field(..., gt=0, description="Duration of the segment arriving at this waypoint, in milliseconds")
+    event: Optional[Literal["pick", "drop"]] = None
+    dwell: float = Field(0, ge=0, description="Time to hold the pose on arrival, in milliseconds")
+
+class ProgramRequest(BaseModel):
+    waypoints: List[ProgramWaypoint] = Field(..., min_length=2)
+    blend: bool = True
+
+class RunProgramRequest(BaseModel):
+    cycles: Optional[int] = Field(None, ge=1, description="Number of cycles, omit to repeat until stopped")
+
+class TrajectoryRequest(BaseModel):
+    startAngles: List[float] = Field(..., min_length=6, max_length=6)
+    targetAngles: List[float] = Field(..., min_length=6, max_length=6)
+    period: float = Field(0.05, ge=0.001, le=1.0, description="Sampling period in seconds, at least 1 ms")
+
 class JointLimitsResponse(BaseModel):
     joint_angles: List[float] = Field(..., min_length=6, max_length=6)
 
+class TrajectoryLimitsRequest(BaseModel):
+    trajectory: List[Annotated[List[float], Field(min_length=6, max_length=6)]] = Field(..., min_length=1)
+
+class CollisionRequest(BaseModel):
+    trajectory: List[Annotated[List[float], Field(min_length=6, max_length=6)]] = Field(..., min_length=1)
+
+class PlanRequest(BaseModel):
+    targetAngles: List[float] = Field(..., min_length=6, max_length=6)
+    startAngles: Optional[List[float]] = Field(
+        None, min_length=6, max_length=6, description="Plan from this pose instead of the current one"
+    )
+    execute: bool = Field(False, description="Follow the planned path from the current pose")
+
+class ForwardKinematicsRequest(BaseModel):
+    trajectory: List[Annotated[List[float], Field(min_length=6, max_length=6)]] = Field(..., min_length=1)
+
+class InverseKinematicsRequest(BaseModel):
+    positions: List[Annotated[List[float], Field(min_length=3, max_length=3)]] = Field(..., min_length=1)
+    quaternions: Optional[List[Annotated[List[float], Field(min_length=4, max_length=4)]]] = None
+    seedAngles: Optional[List[float]] = Field(None, min_length=6, max_length=6)
+    maxIterations: int = Field(100, ge=1, le=1000)
+
 class SetAnglesRequest(BaseModel):
     joint_angles: List[float] = Field(..., min_length=6, max_length=6)
+    expectedVersion: Optional[int] = Field(None, description="Only apply if the state is still at this version")
 
 class EmergencyStateRequest(BaseModel):
     is_emergency: bool
@@ -61,6 +268,42 @@ class PauseRequest(BaseModel):
 class StopRequest(BaseModel):
     is_stopped: bool
 
+class StateCommand(BaseModel):
+    command: Literal["reset", "angles", "moving", "pause", "stop", "emergency", "safety", "bins"]
+    value: Optional[bool] = Field(None, description="New flag value, for the flag commands")
+    joint_angles: Optional[List[float]] = Field(None, min_length=6, max_length=6, description="For `angles`")
+    left: Optional[int] = Field(None, ge=0, description="Objects in the left bin, for `bins`")
+    right: Optional[int] = Field(None, ge=0, description="Objects in the right bin, for `bins`")
+
+class CommandBatchRequest(BaseModel):
+    commands: List[StateCommand] = Field(..., min_length=1, max_length=32)
+    expectedVersion: Optional[int] = Field(None, description="Only apply if the state is still at this version")
+
+class TelemetryReplayRequest(BaseModel):
+    start: Optional[float] = Field(None, description="Earliest sample time, in seconds since the epoch")
+    end: Optional[float] = Field(None, description="Latest sample time, in seconds since the epoch")
+    last: Optional[float] = Field(None, gt=0, description="Only the last `last` seconds, instead of start")
+    speed: float = Field(1.0, gt=0, le=10)
+
+class ProfilingRequest(BaseModel):
+    enabled: bool
+    reset: bool = Field(False, description="Drop the data collected so far")
+
+class CreateRobotRequest(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+
+# Longest /move, in milliseconds: the planned path and its collision check grow with the duration
+MAX_MOVE_DURATION = 60000
+
+class MoveRequest(BaseModel):
+    targetAngles: List[float] = Field(..., min_length=6, max_length=6)
+    duration: Optional[float] = Field(
+        None, gt=0, le=MAX_MOVE_DURATION, description="Move duration in milliseconds, omit for a time-optimal move"
+    )
+    startAngles: Optional[List[float]] = Field(None, min_length=6, max_length=6)
+    manualIntervention: bool = False
+    expectedVersion: Optional[int] = Field(None, description="Only start if the state is still at this version")
+
 @app.get("/")
 def root():
     """
@@ -108,27 +351,46 @@ def health_check():
         "version": "1.0.0"
     }
 
-@app.get("/state")
-def get_state():
+@robot_router.get("/state")
+async def get_state(robot: RobotArm = Depends(get_robot)):
     """
     Retrieve the current state of the robot.
-    This endpoint returns the current state including moving, emergency, paused, stopped flags, and joint angles.
+    This endpoint returns the current state including moving, emergency, paused, stopped flags, joint angles and
+    bin counts.
+    The snapshot is read without locking, so polling never waits on writers.
     
     Returns:
-        dict: A dictionary containing the robot's state and joint angles.
+        dict: A dictionary containing the robot's state, joint angles and state `version`.
     """
-    return {
-        "isMoving": robot.isMoving,
-        "isEmergencyMode": robot.isEmergencyMode,
-        "isPaused": robot.isPaused,
-        "isStopped": robot.isStopped,
-        "isSafetyMode": robot.isSafetyMode,
-        "currentAngles": robot.currentAngles,
-        "homeAngles": robot.homeAngles
-    }
+    return robot.snapshot()
+
+@robot_router.websocket("/ws/state")
+async def stream_state(websocket: WebSocket, unit: RobotUnit = Depends(get_unit)):
+    """
+    Push the robot state to the client whenever it changes.
+    The first message is the current snapshot; after that a message is sent for every change,
+    with bursts of changes coalesced so a client receives at most one message per 20 ms.
+    Each message has the `/state` fields plus `moves`, the latest automated and manual moves.
+    Messages sent by the client are ignored.
+    """
+    await websocket.accept()
+    broadcaster = unit.broadcaster
+    subscription = broadcaster.subscribe()
+    sender = asyncio.create_task(broadcaster.stream(subscription, websocket.send_text))
+    try:
+        # Keep reading so a closed connection is noticed even when the state is idle
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscription)
+        sender.cancel()
 
-@app.post("/reset")
-def reset_robot():
+@robot_router.post("/reset")
+async def reset_robot(robot: RobotArm = Depends(get_robot)):
     """
     Reset robot to home position
     This endpoint moves the robot to a predefined home position.
@@ -153,8 +415,8 @@ def reset_robot():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/limits")
-def check_joint_limits(request: JointLimitsResponse):
+@robot_router.post("/limits")
+def check_joint_limits(request: JointLimitsResponse, robot: RobotArm = Depends(get_robot)):
     """
     Check if the provided joint angles are within the robot's limits.
     This endpoint checks if the joint angles provided in the request are within the robot's defined joint limits.
@@ -172,47 +434,261 @@ def check_joint_limits(request: JointLimitsResponse):
         if request.joint_angles is not None:
             if len(request.joint_angles) != 6:
                 raise HTTPException(status_code=400, detail="Invalid joint angles provided. Must be a list of 6 angles.")
-            for i in range(len(request.joint_angles)):
-                if request.joint_angles[i] < robot.joint_limits[i][0] or request.joint_angles[i] > robot.joint_limits[i][1]:
-                    return {
-                        "success": False,
-                        "message": f"Joint angle {i} out of limits: {robot.joint_limits[i]}",
-                        "joint_angles": request.joint_angles
-                    }
+            with profiler.phase("compute"):
+                violation = robot.first_limit_violation(request.joint_angles)
+            if violation is not None:
+                _, joint = violation
+                return {
+                    "success": False,
+                    "message": f"Joint angle {joint} out of limits: {robot.joint_limits[joint]}",
+                    "joint_angles": request.joint_angles
+                }
         else:
             raise HTTPException(status_code=400, detail="Provided empty joint angles.")
         return {"success": True, "currentAngles": request.joint_angles}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/angles")
-def set_joint_angles(request: SetAnglesRequest):
+@robot_router.post("/limits/batch")
+def check_trajectory_limits(request: TrajectoryLimitsRequest, robot: RobotArm = Depends(get_robot)):
+    """
+    Check a whole N×6 trajectory against the robot's joint limits in one vectorized pass.
+    
+    Args:
+        request (TrajectoryLimitsRequest): Contains the trajectory, one list of 6 joint angles per step.
+    
+    Returns:
+        dict: The success status, the number of steps checked and, on failure, the index of the first
+        violating step and the joint that caused it.
+    
+    Raises:
+        HTTPException: If the trajectory cannot be checked.
+    """
+    try:
+        with profiler.phase("compute"):
+            violation = robot.first_limit_violation(request.trajectory)
+        if violation is None:
+            return {"success": True, "steps": len(request.trajectory), "firstViolation": None, "joint": None}
+        step, joint = violation
+        return {
+            "success": False,
+            "steps": len(request.trajectory),
+            "firstViolation": step,
+            "joint": joint,
+            "message": f"Step {step}: joint angle {joint} out of limits: {robot.joint_limits[joint]}",
+            "joint_angles": request.trajectory[step]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/collisions")
+def check_trajectory_collisions(request: CollisionRequest):
+    """
+    Check a whole N×6 trajectory for collisions with the floor, the tables, the bins and the robot itself.
+    The motion between consecutive steps is checked too, not only the steps themselves.
+    
+    Args:
+        request (CollisionRequest): Contains the trajectory, one list of 6 joint angles per step.
+    
+    Returns:
+        dict: The success status, the number of steps checked and, on collision, the first colliding step, the
+        link that collides and what it collides with.
+    
+    Raises:
+        HTTPException: If the trajectory cannot be checked.
+    """
+    # A plain `def` on purpose: FastAPI runs it in its thread pool, so long trajectories do not stall the control loops
+    try:
+        with profiler.phase("compute"):
+            collision = collision_checker.first_collision(request.trajectory)
+        if collision is None:
+            return {"success": True, "steps": len(request.trajectory), "firstCollision": None}
+        return {
+            "success": False,
+            "steps": len(request.trajectory),
+            "firstCollision": collision["step"],
+            "link": collision["link"],
+            "obstacle": collision["obstacle"],
+            "message": f"Step {collision['step']}: {collision['link']} collides with {collision['obstacle']}"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@robot_router.post("/plan", response_class=NumpyJSONResponse)
+async def plan_path(
+    request: PlanRequest,
+    robot: RobotArm = Depends(get_robot),
+    executor: MotionExecutor = Depends(get_executor)
+):
+    """
+    Plan a collision-free joint-space path to the target angles, and optionally follow it.
+    A direct move is returned when it is clear; otherwise an RRT-Connect search with shortcut smoothing finds
+    a few intermediate waypoints. Plans are cached on the start and target poses. The executed path stops at
+    every waypoint, so it never leaves the checked straight segments. Planning runs in a worker thread so the
+    control loops keep ticking meanwhile.
+    
+    Args:
+        request (PlanRequest): Target angles, optional start angles and whether to execute the plan.
+    
+    Returns:
+        dict: The success status, the waypoints, the joint-space path length in degrees, the duration of the
+        executed trajectory in seconds, the planning time in milliseconds, whether the plan was cached and,
+        with `execute`, the scheduled move.
+    
+    Raises:
+        HTTPException: If the start or target pose is invalid or in collision, if no path is found, or if
+        `execute` is combined with `startAngles`; 409 with `execute` if the arm moved while the path was planned.
+    """
+    if request.execute and request.startAngles is not None:
+        raise HTTPException(status_code=400, detail="Executed plans start from the current pose; omit startAngles")
+    start = request.startAngles if request.startAngles is not None else robot.currentAngles
+    started = time.perf_counter()
+    try:
+        with profiler.phase("compute"):
+            waypoints, cached = await asyncio.to_thread(planner.plan, start, request.targetAngles)
+            trajectory = time_parametrize(waypoints, robot.max_velocity, robot.max_acceleration, executor.period)
+    except (ValueError, PlanningFailed) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    planning_time = (time.perf_counter() - started) * 1000.0
+    if request.execute and robot.currentAngles != start:
+        # The plan starts where the arm was; the way from where it is now to there was never checked
+        raise HTTPException(status_code=409, detail="Robot moved while the path was planned; plan again")
+    response = {
+        "success": True,
+        "waypoints": waypoints,
+        "pathLength": path_length(waypoints),
+        "duration": (len(trajectory) - 1) * executor.period,
+        "planningTime": planning_time,
+        "cached": cached
+    }
+    if request.execute:
+        try:
+            response["move"] = executor.follow(trajectory).to_dict()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return NumpyJSONResponse(response)
+
+@app.get("/plan/cache")
+def get_plan_cache_stats():
+    """
+    Retrieve the statistics of the `/plan` cache.
+    
+    Returns:
+        dict: Size, capacity, hit, miss and eviction counters and the hit rate.
+    """
+    return planner.cache.stats()
+
+@app.post("/fk", response_class=NumpyJSONResponse)
+def compute_tcp_poses(request: ForwardKinematicsRequest):
+    """
+    Compute the TCP pose for every step of a trajectory in one vectorized forward-kinematics pass.
+    Poses are in the robot base frame: metres, z up, origin at the centre of the base.
+    
+    Args:
+        request (ForwardKinematicsRequest): Contains the trajectory, one list of 6 joint angles per step.
+    
+    Returns:
+        dict: The success status, TCP positions (N×3) and orientations as (w, x, y, z) quaternions (N×4).
+    
+    Raises:
+        HTTPException: If the poses cannot be computed.
+    """
+    try:
+        with profiler.phase("compute"):
+            positions, rotations = forward_kinematics(np.asarray(request.trajectory, dtype=np.float64))
+            quaternions = rotation_to_quaternion(rotations)
+        with profiler.phase("encode"):
+            return NumpyJSONResponse({
+                "success": True,
+                "positions": positions,
+                "quaternions": quaternions
+            })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@robot_router.post("/ik", response_class=NumpyJSONResponse)
+def compute_joint_angles(request: InverseKinematicsRequest, robot: RobotArm = Depends(get_robot)):
+    """
+    Solve the joint angles reaching one TCP pose or a whole Cartesian path in one request.
+    The solver warm-starts from the robot's current angles (or `seedAngles`) and keeps every solution within
+    the joint limits. Without quaternions only the TCP position is solved.
+    
+    Args:
+        request (InverseKinematicsRequest): Contains the TCP positions (N×3) in the robot base frame, optional
+            (w, x, y, z) orientations (N×4), an optional seed pose and the iteration budget.
+    
+    Returns:
+        dict: The success status (every pose reached), joint angles (N×6), per-pose convergence flags and the seed used.
+    
+    Raises:
+        HTTPException: If the request is inconsistent or the poses cannot be solved.
+    """
+    try:
+        if request.quaternions is not None and len(request.quaternions) != len(request.positions):
+            raise ValueError("quaternions must match positions one to one")
+        seed = robot.currentAngles if request.seedAngles is None else request.seedAngles
+        rotations = None if request.quaternions is None else quaternion_to_rotation(request.quaternions)
+        angles, converged = solve_path(
+            request.positions, rotations, seed,
+            lower_limits=robot.lower_limits, upper_limits=robot.upper_limits,
+            max_iterations=request.maxIterations
+        )
+        return NumpyJSONResponse({
+            "success": bool(converged.all()),
+            "angles": angles,
+            "converged": converged,
+            "seedAngles": seed
+        })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@robot_router.get("/tcp", response_class=NumpyJSONResponse)
+async def get_tcp_pose(robot: RobotArm = Depends(get_robot)):
+    """
+    Retrieve the current TCP pose of the robot.
+    
+    Returns:
+        dict: The current joint angles, TCP position and (w, x, y, z) orientation quaternion in the robot base frame.
+    """
+    angles = robot.currentAngles
+    position, rotation = forward_kinematics(angles)
+    return NumpyJSONResponse({
+        "currentAngles": angles,
+        "position": position,
+        "quaternion": rotation_to_quaternion(rotation)
+    })
+
+@robot_router.post("/angles")
+async def set_joint_angles(request: SetAnglesRequest, robot: RobotArm = Depends(get_robot)):
     """
     Set the joint angles of the robot.
     This endpoint allows the frontend to set the joint angles of the robot.
+    With `expectedVersion` the write only goes through if nothing changed the state since the client read it.
     
     Args:
         request (SetAnglesRequest): Contains the joint angles to set or a specific value and index.
     
     Returns:
-        dict: A dictionary containing the success status and the current angles of the robot.
+        dict: A dictionary containing the success status, the current angles of the robot and the new state version.
     
     Raises:
-        HTTPException: If the request is invalid or if an error occurs.
+        HTTPException: 409 if the state moved past `expectedVersion`, 400 if the request is invalid or if an error occurs.
     """
     try:
         if request.joint_angles is not None:
             if len(request.joint_angles) != 6:
                 raise HTTPException(status_code=400, detail="Must provide 6 joint angles.")
-            robot.currentAngles = request.joint_angles
+            state = robot.update(expected_version=request.expectedVersion, currentAngles=request.joint_angles)
         else:
             raise HTTPException(status_code=400, detail="Provide either joint_angles or value and index.")
-        return {"success": True, "currentAngles": robot.currentAngles}
+        return {"success": True, "currentAngles": state["currentAngles"], "version": state["version"]}
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/moving")
-def set_moving_state(request: MovingStateRequest):
+@robot_router.post("/moving")
+async def set_moving_state(request: MovingStateRequest, robot: RobotArm = Depends(get_robot)):
     """
     Set the moving state of the robot.
     This endpoint allows the frontend to set the moving state of the robot.
@@ -229,18 +705,24 @@ def set_moving_state(request: MovingStateRequest):
     robot.isMoving = request.is_moving
     return {"success": True, "isMoving": robot.isMoving}
 
-@app.post("/interpolate")
-def interpolate_path_to_move(request: InterpolateRequest, steps: int = 20):
+@app.post("/interpolate", response_class=NumpyJSONResponse)
+def interpolate_path_to_move(request: InterpolateRequest, steps: int = 20, accept: Optional[str] = Header(None)):
     """
     Returns a list of interpolated joint positions from current to target angles to the frontend for it to visualize the path.
-    The path is generated by the robot's interpolation method.
+    The path is generated by the robot's interpolation method. Encoded responses are cached on the start and
+    target angles (rounded to 0.001°), the step count and the response format, so repeated moves between the
+    same poses are served without recomputing or re-encoding the path.
+    Clients sending `Accept: application/x-yanibot-matrix` (optionally `;dtype=float32`) get the steps as a
+    packed binary matrix instead of JSON.
     
     Args:
         request (InterpolateRequest): Contains start and target angles for interpolation.
         steps (int): Number of steps for interpolation, default is 20.
+        accept (str, optional): Accept header, selects JSON or the binary matrix format.
     
     Returns:
-        dict: A dictionary containing the success status, interpolated steps, and a message.
+        dict: A dictionary containing the success status, interpolated steps, and a message,
+        or the steps alone as a binary matrix.
     
     Raises:
         HTTPException: If the interpolation fails or if the angles are invalid.
@@ -255,17 +737,377 @@ def interpolate_path_to_move(request: InterpolateRequest, steps: int = 20):
             steps = 30  # Use your specific number for small moves
         else:
             steps = max(min_steps, int(scale * max_diff))
-        path = list(interpolate_path(request.startAngles, request.targetAngles, steps=steps))
+        matrix_dtype = negotiate_matrix(accept)
+        key = quantize_key(request.startAngles, request.targetAngles) + (steps, matrix_dtype or "json")
+        with profiler.phase("cache"):
+            body = interpolate_cache.get(key)
+        if body is None:
+            with profiler.phase("compute"):
+                path = interpolate_path(request.startAngles, request.targetAngles, steps=steps)
+            with profiler.phase("encode"):
+                if matrix_dtype is None:
+                    body = NumpyJSONResponse({
+                        "success": True,
+                        "steps": path,
+                        "message": f"Interpolated path from {request.startAngles} to {request.targetAngles} in {steps} steps"
+                    }).body
+                else:
+                    body = encode_matrix(path, matrix_dtype)
+            interpolate_cache.put(key, body)
+        media_type = "application/json" if matrix_dtype is None else MATRIX_MEDIA_TYPE
+        return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Plan-and-check rounds of a /move whose start pose keeps changing under a running move, before giving up with 409
+MOVE_CHECK_ATTEMPTS = 3
+
+def checked_move_path(executor, start, target, duration):
+    """Plan a move as the executor will run it and find its first collision, including the motion from `start`."""
+    path = executor.plan(start, target, duration)
+    return path, collision_checker.first_collision(np.vstack([start, path]))
+
+@robot_router.post("/move")
+async def start_move(
+    request: MoveRequest,
+    robot: RobotArm = Depends(get_robot),
+    executor: MotionExecutor = Depends(get_executor)
+):
+    """
+    Start a server-side move to the target angles.
+    The backend executor steps the robot along the path at its control rate, so the client only
+    starts the move and watches it through `GET /move/{move_id}`. The planned path is checked for
+    collisions first; a colliding move is not started.
+    
+    Args:
+        request (MoveRequest): Target angles, duration in milliseconds (omitted for a time-optimal move),
+            optional start angles and manual intervention flag.
+    
+    Returns:
+        dict: A dictionary containing the success status and the scheduled move.
+    
+    Raises:
+        HTTPException: 409 if the state moved past `expectedVersion` or the arm kept moving while the move was
+            checked, 400 if the move cannot be started.
+    """
+    if request.expectedVersion is not None and request.expectedVersion != robot.version:
+        raise HTTPException(status_code=409, detail=str(VersionConflict(request.expectedVersion, robot.version)))
+    for angles in (request.startAngles, request.targetAngles):
+        if angles is not None and not robot.within_limits(angles):
+            return {
+                "success": False,
+                "message": f"Joint angles out of limits: {angles}",
+                "targetAngles": request.targetAngles
+            }
+    duration = request.duration / 1000.0 if request.duration is not None else None
+    for _ in range(MOVE_CHECK_ATTEMPTS):
+        start = request.startAngles if request.startAngles is not None else robot.currentAngles
+        try:
+            # Planning and checking grow with the move's duration; off the event loop, the control ticks keep going
+            path, collision = await asyncio.to_thread(
+                checked_move_path, executor, start, request.targetAngles, duration
+            )
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # A running move may have stepped the arm meanwhile; the checked path must start where the arm is
+        if request.startAngles is not None or robot.currentAngles == start:
+            break
+    else:
+        raise HTTPException(status_code=409, detail="Robot kept moving while the move was checked; retry")
+    if collision is not None:
         return {
-            "success": True,
-            "steps": path,
-            "message": f"Interpolated path from {request.startAngles} to {request.targetAngles} in {steps} steps"
+            "success": False,
+            "message": f"Move collides: {collision['link']} hits {collision['obstacle']}",
+            "collision": collision,
+            "targetAngles": request.targetAngles
         }
+    try:
+        move = executor.start(
+            request.targetAngles,
+            duration,
+            startAngles=request.startAngles,
+            manual=request.manualIntervention,
+            path=path
+        )
+        return {"success": True, "move": move.to_dict()}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@robot_router.get("/move/{move_id}")
+async def get_move(
+    move_id: int,
+    robot: RobotArm = Depends(get_robot),
+    executor: MotionExecutor = Depends(get_executor)
+):
+    """
+    Retrieve the progress of a move started with `POST /move`.
+    
+    Args:
+        move_id (int): Identifier returned when the move was started.
+    
+    Returns:
+        dict: The move status together with the robot's current angles.
+    
+    Raises:
+        HTTPException: If the move is unknown.
+    """
+    move = executor.get(move_id)
+    if move is None:
+        raise HTTPException(status_code=404, detail=f"Unknown move {move_id}")
+    return {**move.to_dict(), "currentAngles": robot.currentAngles, "isMoving": robot.isMoving}
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Export the service metrics in the Prometheus text format.
+    Covers request counts and latency histograms per route template, control tick lateness of the motion
+    executors, active moves, robots, state stream clients and the `/interpolate` cache counters.
+    
+    Returns:
+        Response: The metrics as `text/plain; version=0.0.4`.
+    """
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/admin/profiling")
+def get_profiling_report():
+    """
+    Get the profiling report collected so far.
+    Per route template, the mean, max and total time of each timed phase (`compute`, `encode`, `cache`) and of
+    the rest of the request (`framework`: body parsing, validation, dependencies, response), plus the most
+    frequently sampled stacks.
+    
+    Returns:
+        dict: The profiling state and report.
+    """
+    return profiler.report()
+
+@app.get("/admin/persistence")
+def get_persistence():
+    """
+    Get the state journal's status.
+    With `STATE_DIR` set, robot states are journaled there in batches and restored on startup.
+    
+    Returns:
+        dict: Whether persistence is on and, if so, the journal size, record, batch and compaction counts, and how
+        long the startup restore took.
+    """
+    if persistence is None:
+        return {"success": True, "enabled": False}
+    return {"success": True, "enabled": True, **persistence.info()}
+
+@app.post("/admin/profiling")
+def set_profiling(request: ProfilingRequest):
+    """
+    Switch profiling on or off.
+    Switching it off writes the collapsed stacks and the phase report to `YANIBOT_PROFILE_DIR` (default
+    `profiles/`).
+    
+    Args:
+        request (ProfilingRequest): Whether to profile, and whether to drop the data collected so far.
+    
+    Returns:
+        dict: The success status, the profiling state and the report files written, if any.
+    """
+    if request.reset:
+        profiler.reset()
+    files = None
+    if request.enabled:
+        profiler.start()
+    elif profiler.enabled:
+        profiler.stop()
+        files = profiler.write()
+    return {"success": True, "enabled": profiler.enabled, "files": files}
+
+@app.post("/admin/profiling/dump")
+def dump_profiling():
+    """
+    Write the collapsed stacks and the phase report collected so far, without stopping the profiler.
+    
+    Returns:
+        dict: The success status and the paths of the `stacks` and `phases` files.
+    
+    Raises:
+        HTTPException: If the reports cannot be written.
+    """
+    try:
+        return {"success": True, "files": profiler.write()}
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/interpolate/cache")
+def get_interpolate_cache_stats():
+    """
+    Retrieve the statistics of the `/interpolate` response cache.
+    
+    Returns:
+        dict: Size, capacity, hit, miss and eviction counters and the hit rate.
+    """
+    return interpolate_cache.stats()
+
+@robot_router.post("/trajectory", response_class=NumpyJSONResponse)
+def generate_trajectory(
+    request: TrajectoryRequest,
+    robot: RobotArm = Depends(get_robot),
+    accept: Optional[str] = Header(None)
+):
+    """
+    Returns a time-optimal trajectory from start to target angles.
+    The joints follow a synchronized trapezoidal velocity profile limited by the robot's per-joint velocity and
+    acceleration limits, sampled every `period` seconds.
+    Binary clients (see `/interpolate`) get the joint angles as a matrix, with the duration and period in the
+    `X-Trajectory-Duration` and `X-Trajectory-Period` headers; sample i is at `i * period`, the last at the duration.
+    
+    Args:
+        request (TrajectoryRequest): Contains start and target angles and the sampling period.
+        accept (str, optional): Accept header, selects JSON or the binary matrix format.
+    
+    Returns:
+        dict: The success status, the move duration in seconds, the sample times and the joint angles at each sample.
+    
+    Raises:
+        HTTPException: If the trajectory cannot be generated.
+    """
+    try:
+        with profiler.phase("compute"):
+            times, path = trapezoidal_profile(
+                request.startAngles, request.targetAngles, robot.max_velocity, robot.max_acceleration, request.period
+            )
+        matrix_dtype = negotiate_matrix(accept)
+        with profiler.phase("encode"):
+            if matrix_dtype is not None:
+                return MatrixResponse(path, dtype=matrix_dtype, headers={
+                    "Vary": "Accept",
+                    "X-Trajectory-Duration": repr(float(times[-1])),
+                    "X-Trajectory-Period": repr(request.period)
+                })
+            return NumpyJSONResponse({
+                "success": True,
+                "duration": float(times[-1]),
+                "period": request.period,
+                "times": times,
+                "steps": path
+            })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/stop")
-def set_stop_state(request: StopRequest):
+@app.put("/programs/{name}")
+def define_program(name: str, request: ProgramRequest):
+    """
+    Define a motion program and compile its full blended trajectory.
+    The program is a cycle: waypoints are visited in order and the last segment returns to the first waypoint.
+    Compilation happens once here; running the program replays the cached trajectory.
+    
+    Args:
+        name (str): Program name, replaces any existing program with the same name.
+        request (ProgramRequest): Waypoints with per-segment durations, pick/drop events and dwells in milliseconds.
+    
+    Returns:
+        dict: The success status, a summary of the compiled program and the first collision along its path in
+        the default cell, if any.
+    
+    Raises:
+        HTTPException: If a waypoint is out of limits or the program cannot be compiled.
+    """
+    for index, waypoint in enumerate(request.waypoints):
+        if not registry.default.robot.within_limits(waypoint.angles):
+            raise HTTPException(status_code=400, detail=f"Waypoint {index} out of joint limits: {waypoint.angles}")
+    try:
+        waypoints = [
+            {
+                "angles": waypoint.angles,
+                "duration": waypoint.duration / 1000.0,
+                "event": waypoint.event,
+                "dwell": waypoint.dwell / 1000.0
+            }
+            for waypoint in request.waypoints
+        ]
+        programs[name] = MotionProgram(name, waypoints, registry.period, blend=request.blend)
+        # Reported, not enforced: programs may be defined for cells other than the default one. Like compiling, the
+        # check runs in FastAPI's thread pool (a plain `def` route), off the event loop driving the control ticks
+        collision = collision_checker.first_collision(programs[name].path)
+        return {"success": True, "program": programs[name].summary(), "collision": collision}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/programs")
+def list_programs():
+    """
+    List the compiled motion programs.
+    
+    Returns:
+        dict: Summaries of all defined programs.
+    """
+    return {"programs": [program.summary() for program in programs.values()]}
+
+def get_program_or_404(name):
+    program = programs.get(name)
+    if program is None:
+        raise HTTPException(status_code=404, detail=f"Unknown program {name}")
+    return program
+
+@app.get("/programs/{name}", response_class=NumpyJSONResponse)
+def get_program(name: str, trajectory: bool = False):
+    """
+    Retrieve a compiled motion program.
+    
+    Args:
+        name (str): Program name.
+        trajectory (bool): Also return the compiled sample times and joint angles.
+    
+    Returns:
+        dict: The program summary, optionally with its trajectory.
+    
+    Raises:
+        HTTPException: If the program is unknown.
+    """
+    program = get_program_or_404(name)
+    content = program.summary()
+    if trajectory:
+        content["times"] = program.times
+        content["steps"] = program.path
+    return NumpyJSONResponse(content)
+
+@app.delete("/programs/{name}")
+def delete_program(name: str):
+    """
+    Delete a motion program.
+    
+    Args:
+        name (str): Program name.
+    
+    Returns:
+        dict: The success status.
+    
+    Raises:
+        HTTPException: If the program is unknown.
+    """
+    get_program_or_404(name)
+    del programs[name]
+    return {"success": True}
+
+@robot_router.post("/programs/{name}/run")
+async def run_program(name: str, request: RunProgramRequest, executor: MotionExecutor = Depends(get_executor)):
+    """
+    Run a compiled motion program on the robot.
+    The robot moves to the first waypoint and then replays the cached cycle trajectory, firing pick/drop
+    events as `lastEvent` on the move. Pause, emergency, safety and stop apply as for any other move.
+    
+    Args:
+        name (str): Program name.
+        request (RunProgramRequest): Number of cycles to run.
+    
+    Returns:
+        dict: The success status and the scheduled move.
+    
+    Raises:
+        HTTPException: If the program is unknown.
+    """
+    program = get_program_or_404(name)
+    move = executor.run_program(program, cycles=request.cycles)
+    return {"success": True, "move": move.to_dict()}
+
+@robot_router.post("/stop")
+async def set_stop_state(request: StopRequest, robot: RobotArm = Depends(get_robot)):
     """
     Stop the robot's movement.
     This endpoint is used to stop the robot's current movement.
@@ -282,8 +1124,34 @@ def set_stop_state(request: StopRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/pause")
-def set_pause_state(request: PauseRequest):
+@app.get("/stop/latency")
+def get_stop_latency():
+    """
+    Retrieve the stop latency across all robots: the time from a stop, emergency, safety or pause write to the
+    running move halting. Those writes interrupt the executor's control tick wait, so a move halts without
+    waiting for its next tick.
+    
+    Returns:
+        dict: The number of halts, the mean and maximum latency and the p50, p99 and p999 latencies in
+        milliseconds. Quantiles are upper bounds of the histogram buckets; all are None before the first halt.
+    """
+    histogram = registry.stop_latency
+    _, total, count = histogram.snapshot()
+
+    def milliseconds(value):
+        return value * 1000.0 if value is not None else None
+
+    return {
+        "count": count,
+        "meanMs": total / count * 1000.0 if count else None,
+        "maxMs": milliseconds(histogram.max),
+        "p50Ms": milliseconds(histogram.quantile(0.5)),
+        "p99Ms": milliseconds(histogram.quantile(0.99)),
+        "p999Ms": milliseconds(histogram.quantile(0.999)),
+    }
+
+@robot_router.post("/pause")
+async def set_pause_state(request: PauseRequest, robot: RobotArm = Depends(get_robot)):
     """
     Pause the robot's movement.
     This endpoint is used to pause the robot's current movement.
@@ -300,8 +1168,8 @@ def set_pause_state(request: PauseRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/emergency")
-def set_emergency_state(request: EmergencyStateRequest):
+@robot_router.post("/emergency")
+async def set_emergency_state(request: EmergencyStateRequest, robot: RobotArm = Depends(get_robot)):
     """
     Set the emergency state of the robot.
     This endpoint allows the frontend to set the emergency state of the robot.
@@ -315,8 +1183,8 @@ def set_emergency_state(request: EmergencyStateRequest):
     robot.isEmergencyMode = request.is_emergency
     return {"success": True, "isEmergencyMode": robot.isEmergencyMode}
 
-@app.post("/safety")
-def set_safety_mode(request: EmergencyStateRequest):
+@robot_router.post("/safety")
+async def set_safety_mode(request: EmergencyStateRequest, robot: RobotArm = Depends(get_robot)):
     """
     Set the safety mode of the robot.
     This endpoint allows the frontend to set the safety mode of the robot.
@@ -330,8 +1198,209 @@ def set_safety_mode(request: EmergencyStateRequest):
     robot.isSafetyMode = request.is_emergency
     return {"success": True, "isSafetyMode": robot.isSafetyMode}
 
+# State field written by each flag command of `POST /commands`, named after its single-flag endpoint
+COMMAND_FLAGS = {
+    "moving": "isMoving",
+    "pause": "isPaused",
+    "stop": "isStopped",
+    "emergency": "isEmergencyMode",
+    "safety": "isSafetyMode",
+}
+
+def command_fields(commands, robot):
+    """
+    Fold a list of state commands into the state fields they write, later commands winning.
+
+    Args:
+        commands (list of StateCommand): Commands in the order they are applied.
+        robot (RobotArm): Robot whose home pose `reset` returns to. `reset` also refills the bins.
+
+    Returns:
+        dict: State field names to their new values.
+
+    Raises:
+        ValueError: If a command is missing its value, joint angles or bin counts.
+    """
+    fields = {}
+    for index, command in enumerate(commands):
+        if command.command == "reset":
+            fields["currentAngles"] = robot.homeAngles
+            fields.update((field, False) for field in COMMAND_FLAGS.values())
+            fields.update(INITIAL_BIN_COUNTS)
+        elif command.command == "bins":
+            if command.left is None and command.right is None:
+                raise ValueError(f"Command {index} (bins) needs left or right")
+            if command.left is not None:
+                fields["leftBinCount"] = command.left
+            if command.right is not None:
+                fields["rightBinCount"] = command.right
+        elif command.command == "angles":
+            if command.joint_angles is None:
+                raise ValueError(f"Command {index} (angles) needs joint_angles")
+            fields["currentAngles"] = command.joint_angles
+        else:
+            if command.value is None:
+                raise ValueError(f"Command {index} ({command.command}) needs a value")
+            fields[COMMAND_FLAGS[command.command]] = command.value
+    return fields
+
+@robot_router.post("/commands")
+async def apply_commands(request: CommandBatchRequest, robot: RobotArm = Depends(get_robot)):
+    """
+    Apply a batch of state changes in one transaction.
+    Replaces chains of `/angles`, `/moving`, `/pause`, `/stop`, `/emergency` and `/safety` calls with one request:
+    the commands are applied in order as a single state update, so other clients never see the states in between.
+    `reset` puts the robot back in its home pose with every flag cleared and the bins refilled, and `bins` records
+    the objects in each bin. Either every command is applied or none.
+    
+    Args:
+        request (CommandBatchRequest): The commands and an optional `expectedVersion`.
+    
+    Returns:
+        dict: The success status and the state snapshot after the batch, with its version.
+    
+    Raises:
+        HTTPException: 409 if the state moved past `expectedVersion`, 400 if a command is invalid.
+    """
+    try:
+        state = robot.update(expected_version=request.expectedVersion, **command_fields(request.commands, robot))
+        return {"success": True, "state": state}
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def telemetry_window(unit, start=None, end=None, last=None):
+    """Select a robot's telemetry samples by absolute time range or by the last `last` seconds."""
+    if last is not None:
+        start = unit.telemetry.clock() - last
+    return unit.telemetry.samples(start, end)
+
+@robot_router.get("/telemetry")
+async def get_telemetry(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    last: Optional[float] = None,
+    unit: RobotUnit = Depends(get_unit),
+    accept: Optional[str] = Header(None)
+):
+    """
+    Get the robot's recorded state samples, oldest first.
+    Every state change is recorded with its time, state version, joint angles and state flags.
+    JSON clients get newline-delimited JSON, streamed in chunks; binary clients (see `/interpolate`) get one
+    matrix with the columns time, a1..a6, flags (bitmask) and version.
+    
+    Args:
+        start (float, optional): Earliest sample time, in seconds since the epoch.
+        end (float, optional): Latest sample time, in seconds since the epoch.
+        last (float, optional): Only the last `last` seconds, instead of `start`.
+        accept (str, optional): Accept header, selects NDJSON or the binary matrix format.
+    
+    Returns:
+        StreamingResponse: One JSON object per sample, or the samples as a matrix.
+    """
+    samples = telemetry_window(unit, start, end, last)
+    matrix_dtype = negotiate_matrix(accept)
+    if matrix_dtype is not None:
+        return MatrixResponse(as_matrix(samples), dtype=matrix_dtype, headers={"Vary": "Accept"})
+    return StreamingResponse(iter_ndjson(samples), media_type="application/x-ndjson", headers={"Vary": "Accept"})
+
+@robot_router.get("/telemetry/info")
+async def get_telemetry_info(unit: RobotUnit = Depends(get_unit)):
+    """
+    Get the size and time span of the robot's telemetry recording.
+    
+    Returns:
+        dict: The ring buffer capacity, sample count, oldest and newest sample times and backing file.
+    """
+    return {"success": True, **unit.telemetry.info()}
+
+@robot_router.post("/telemetry/replay")
+async def replay_telemetry(request: TelemetryReplayRequest, unit: RobotUnit = Depends(get_unit)):
+    """
+    Replay a stretch of the robot's recording as an automated move.
+    The recorded poses are resampled onto the control period, sped up or slowed down by `speed`, and followed
+    from the first recorded pose. Pause, emergency, safety and stop apply as for any other move.
+    
+    Args:
+        request (TelemetryReplayRequest): Time range to replay and playback speed.
+    
+    Returns:
+        dict: The success status, the number of replayed samples and the scheduled move.
+    
+    Raises:
+        HTTPException: If the range holds no samples.
+    """
+    samples = telemetry_window(unit, request.start, request.end, request.last)
+    try:
+        path = replay_path(samples, unit.executor.period, request.speed)
+        move = unit.executor.follow(path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "samples": len(samples), "move": move.to_dict()}
+
+@app.get("/robots")
+async def list_robots():
+    """
+    List the robots simulated by this process.
+    
+    Returns:
+        dict: The robot count and, for every robot, its ID and `/state` snapshot.
+    """
+    return {
+        "count": len(registry),
+        "robots": [{"id": unit.id, **unit.robot.snapshot()} for unit in registry]
+    }
+
+@app.post("/robots")
+async def create_robot(request: CreateRobotRequest):
+    """
+    Add a robot to the fleet. It starts in its home pose and is then controlled through the
+    same routes as the default robot, prefixed with `/robots/{robot_id}`.
+    
+    Args:
+        request (CreateRobotRequest): The new robot's ID.
+    
+    Returns:
+        dict: The success status, the robot ID and its state.
+    
+    Raises:
+        HTTPException: If the ID is already taken or the fleet is full.
+    """
+    try:
+        unit = registry.create(request.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, "id": unit.id, "state": unit.robot.snapshot()}
+
+@app.delete("/robots/{robot_id}")
+async def delete_robot(robot_id: str):
+    """
+    Remove a robot from the fleet, cancelling its moves.
+    
+    Args:
+        robot_id (str): Robot ID.
+    
+    Returns:
+        dict: The success status and the removed robot ID.
+    
+    Raises:
+        HTTPException: If the robot is unknown or is the default robot.
+    """
+    try:
+        registry.remove(robot_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown robot {robot_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "id": robot_id}
+
+app.include_router(robot_router)
+app.include_router(robot_router, prefix="/robots/{robot_id}", dependencies=[Depends(select_unit)])
+
 # For development server
 if __name__ == "__main__":
+    import uvicorn  # Only for this entry point; servers import the app through their own uvicorn
 
     port = int(os.environ.get('PORT', 8000))
     debug = os.environ.get('DEBUG', 'false').lower() == 'true'
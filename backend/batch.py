@@ -0,0 +1,186 @@
+# backend/batch.py
+"""
+Parallel batch runner for headless pick-and-place simulations.
+
+Expands a grid of scenario parameters into every combination and runs them
+across a process pool. Each worker builds its RobotArm once and keeps the
+compiled motion programs between scenarios, so a sweep only pays for the
+pose combinations it has not compiled yet. Results are yielded as each chunk
+of scenarios finishes, not when the whole sweep is done.
+
+Usage (from backend/):
+    python batch.py grid.json --workers 8 --csv results.csv
+
+where grid.json maps PickAndPlaceSimulation parameters to lists of values, e.g.
+    {"strategy": ["left-to-right", "bidirectional"], "cycle_delay": [0, 2.0],
+     "duration_scale": [0.8, 1.0], "positions": [{}, {"leftBinPick": [-45, 70, 55, 0, 35, 10]}]}
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from robot import RobotArm
+from simulation import PickAndPlaceSimulation
+
+# Parameters a scenario may set; everything else in a grid is rejected
+SCENARIO_PARAMETERS = (
+    "strategy", "positions", "left", "right", "cycle_delay", "blend", "duration_scale", "velocity_scale",
+    "max_cycles", "max_duration",
+)
+TABLE_COLUMNS = ("index", "strategy", "cycles", "meanCycleTime", "cyclesPerHour", "left", "right", "error")
+
+_worker = {}
+
+
+def expand_grid(grid):
+    """
+    Expand a parameter grid into a list of scenarios.
+
+    Args:
+        grid (dict): Parameter name to a list of values. A scalar value is used as-is for every scenario.
+
+    Returns:
+        list of dict: One scenario per combination, in row-major order of the grid.
+
+    Raises:
+        ValueError: If the grid names an unknown parameter.
+    """
+    unknown = set(grid) - set(SCENARIO_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {sorted(unknown)}")
+    names = list(grid)
+    values = [value if isinstance(value, list) else [value] for value in grid.values()]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def _init_worker():
+    # Built once per process and reused by every scenario the worker runs, so a scenario must not leave listeners on it
+    _worker["robot"] = RobotArm()
+    _worker["programs"] = {}
+
+
+def run_scenario(scenario, robot=None, program_cache=None):
+    """
+    Run one scenario to completion.
+
+    Args:
+        scenario (dict): Simulation parameters, see `SCENARIO_PARAMETERS`.
+        robot (RobotArm, optional): Robot to reuse.
+        program_cache (dict, optional): Compiled programs shared between scenarios.
+
+    Returns:
+        dict: The simulation report, or an ``error`` entry if the scenario is invalid.
+    """
+    options = dict(scenario)
+    limits = {"max_cycles": options.pop("max_cycles", 100), "max_duration": options.pop("max_duration", None)}
+    try:
+        simulation = PickAndPlaceSimulation(robot=robot, program_cache=program_cache, **options)
+        return simulation.run(**limits)
+    except (ValueError, RuntimeError) as e:
+        return {"strategy": scenario.get("strategy"), "cycles": 0, "error": str(e)}
+
+
+def _run_chunk(chunk):
+    return [(index, run_scenario(scenario, _worker["robot"], _worker["programs"])) for index, scenario in chunk]
+
+
+def run_batch(scenarios, workers=None, chunksize=None):
+    """
+    Run scenarios across a process pool, yielding results as they finish.
+
+    Args:
+        scenarios (list of dict): Scenarios, e.g. from `expand_grid`.
+        workers (int, optional): Number of worker processes, one per CPU by default.
+        chunksize (int, optional): Scenarios sent to a worker at a time; by default about four chunks per worker.
+
+    Yields:
+        tuple: (index, scenario, report) in completion order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(scenarios) // (workers * 4))
+    indexed = list(enumerate(scenarios))
+    chunks = [indexed[start:start + chunksize] for start in range(0, len(indexed), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for index, report in future.result():
+                yield index, scenarios[index], report
+
+
+def table_row(index, scenario, report):
+    """Flatten a result into one row of the results table."""
+    bins = report.get("bins", {})
+    return {
+        "index": index,
+        "strategy": report.get("strategy"),
+        "cycles": report.get("cycles"),
+        "meanCycleTime": report.get("meanCycleTime"),
+        "cyclesPerHour": report.get("cyclesPerHour"),
+        "left": bins.get("left"),
+        "right": bins.get("right"),
+        "error": report.get("error"),
+        "scenario": json.dumps(scenario, sort_keys=True),
+    }
+
+
+def format_table(rows, limit=None):
+    """
+    Render result rows as a text table, best throughput first.
+
+    Args:
+        rows (list of dict): Rows from `table_row`.
+        limit (int, optional): Only show the best `limit` rows.
+
+    Returns:
+        str: The table.
+    """
+    ordered = sorted(rows, key=lambda row: -(row["cyclesPerHour"] or 0.0))
+    if limit is not None:
+        ordered = ordered[:limit]
+    lines = [f"{'#':>5} {'strategy':>15} {'cycles':>7} {'cycle (s)':>10} {'cycles/h':>9} {'left':>5} {'right':>5}  scenario"]
+    for row in ordered:
+        if row["error"]:
+            lines.append(f"{row['index']:>5} {row['strategy'] or '-':>15} {'error':>7}  {row['error']}")
+            continue
+        cycle_time = f"{row['meanCycleTime']:.2f}" if row["meanCycleTime"] is not None else "-"
+        lines.append(
+            f"{row['index']:>5} {row['strategy']:>15} {row['cycles']:>7} {cycle_time:>10} {row['cyclesPerHour']:>9.1f} "
+            f"{row['left']:>5} {row['right']:>5}  {row['scenario']}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a grid of headless pick-and-place simulations in parallel")
+    parser.add_argument("grid", help="JSON file mapping scenario parameters to lists of values")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, one per CPU by default")
+    parser.add_argument("--chunksize", type=int, default=None, help="Scenarios per task sent to a worker")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show in the final table")
+    parser.add_argument("--csv", help="Write every result to this CSV file")
+    args = parser.parse_args()
+
+    with open(args.grid) as f:
+        scenarios = expand_grid(json.load(f))
+    print(f"Running {len(scenarios)} scenarios", file=sys.stderr)
+    rows = []
+    for done, (index, scenario, report) in enumerate(run_batch(scenarios, args.workers, args.chunksize), start=1):
+        rows.append(table_row(index, scenario, report))
+        if report.get("error"):
+            print(f"[{done}/{len(scenarios)}] #{index} error: {report['error']}", file=sys.stderr)
+        else:
+            print(f"[{done}/{len(scenarios)}] #{index} {report['cyclesPerHour']:.1f} cycles/h", file=sys.stderr)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS + ("scenario",))
+            writer.writeheader()
+            writer.writerows(sorted(rows, key=lambda row: row["index"]))
+    print(format_table(rows, args.top))
+
+
+if __name__ == "__main__":
+    main()
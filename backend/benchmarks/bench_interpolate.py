@@ -0,0 +1,97 @@
+# backend/benchmarks/bench_interpolate.py
+"""
+Benchmark for `/interpolate` path generation and serialization.
+
+Compares the previous implementation (one NumPy array per step turned into a
+list of np.float64, encoded by FastAPI's generic encoder) with the vectorized
+`interpolate_path` encoded by `NumpyJSONResponse`, at 30, 300 and 3000 steps.
+Reports the best mean latency per call and the peak memory allocated during one call.
+Then compares the JSON encoding with the binary matrix format (float64 and float32):
+payload size, encode time and client-side decode time.
+
+Usage (from backend/):
+    python benchmarks/bench_interpolate.py
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import interpolate_path  # noqa: E402
+from encoding import NumpyJSONResponse, decode_matrix, encode_matrix  # noqa: E402
+
+START = [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+TARGET = [-45.0, 75.0, 55.0, 0.0, 35.0, 10.0]
+STEPS = (30, 300, 3000)
+
+
+def legacy_interpolate_path(startAngles, targetAngles, steps=20):
+    current = np.array(startAngles)
+    target = np.array(targetAngles)
+    return [list(current + alpha * (target - current)) for alpha in np.linspace(0, 1, steps)]
+
+
+def legacy_response(steps):
+    path = list(legacy_interpolate_path(START, TARGET, steps=steps))
+    content = jsonable_encoder({"success": True, "steps": path, "message": ""})
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def vectorized_response(steps):
+    path = interpolate_path(START, TARGET, steps=steps)
+    return NumpyJSONResponse({"success": True, "steps": path, "message": ""}).body
+
+
+def binary_response(dtype):
+    def encode(steps):
+        return encode_matrix(interpolate_path(START, TARGET, steps=steps), dtype)
+    return encode
+
+
+def best_time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def measure(func, steps, number):
+    seconds = min(timeit.repeat(lambda: func(steps), number=number, repeat=5)) / number
+    tracemalloc.start()
+    func(steps)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds * 1e6, peak
+
+
+def main():
+    print(f"{'steps':>6} {'implementation':>14} {'latency (us)':>13} {'peak alloc (KiB)':>17} {'bytes':>8}")
+    for steps in STEPS:
+        number = max(1, 3000 // steps)
+        for name, func in (("legacy", legacy_response), ("vectorized", vectorized_response)):
+            latency, peak = measure(func, steps, number)
+            size = len(func(steps))
+            print(f"{steps:>6} {name:>14} {latency:>13.1f} {peak / 1024:>17.1f} {size:>8}")
+
+    print()
+    print(f"{'steps':>6} {'format':>14} {'bytes':>8} {'bytes/angle':>12} {'encode (us)':>12} {'decode (us)':>12}")
+    for steps in STEPS:
+        number = max(1, 3000 // steps)
+        formats = (
+            ("json", vectorized_response, lambda body: np.asarray(json.loads(body)["steps"])),
+            ("float64", binary_response("float64"), decode_matrix),
+            ("float32", binary_response("float32"), decode_matrix),
+        )
+        for name, encode, decode in formats:
+            body = encode(steps)
+            encode_time = best_time(lambda: encode(steps), number)
+            decode_time = best_time(lambda: decode(body), number)
+            print(f"{steps:>6} {name:>14} {len(body):>8} {len(body) / (steps * 6):>12.1f} "
+                  f"{encode_time:>12.1f} {decode_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
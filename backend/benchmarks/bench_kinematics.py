@@ -0,0 +1,75 @@
+# backend/benchmarks/bench_kinematics.py
+"""
+Benchmark for the kinematics engine.
+
+Reports forward-kinematics throughput (poses per second) for single poses and
+for vectorized batches, and inverse-kinematics throughput (solves per second)
+with the convergence rate, both warm-started near the answer and cold-started
+from the home pose.
+
+Usage (from backend/):
+    python benchmarks/bench_kinematics.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinematics import forward_kinematics, inverse_kinematics  # noqa: E402
+from robot import RobotArm  # noqa: E402
+
+BATCH_SIZES = (1, 100, 10000, 100000)
+IK_BATCH_SIZES = (1, 100, 2000)
+WARM_START_SPREAD = 10.0  # Degrees between the seed and the pose that produced the target
+
+
+def random_poses(count, seed=0):
+    robot = RobotArm()
+    rng = np.random.default_rng(seed)
+    return rng.uniform(robot.lower_limits, robot.upper_limits, size=(count, 6))
+
+
+def bench_forward():
+    print(f"{'batch':>8} {'time/call (ms)':>15} {'poses/s':>12}")
+    for size in BATCH_SIZES:
+        poses = random_poses(size)
+        number = max(1, 20000 // size)
+        seconds = min(timeit.repeat(lambda: forward_kinematics(poses), number=number, repeat=5)) / number
+        print(f"{size:>8} {seconds * 1e3:>15.3f} {size / seconds:>12.0f}")
+
+
+def bench_inverse():
+    robot = RobotArm()
+    limits = {"lower_limits": robot.lower_limits, "upper_limits": robot.upper_limits}
+    print(f"{'batch':>8} {'seed':>6} {'time/call (ms)':>15} {'solves/s':>12} {'converged':>10}")
+    for size in IK_BATCH_SIZES:
+        poses = random_poses(size)
+        positions, rotations = forward_kinematics(poses)
+        rng = np.random.default_rng(1)
+        seeds = {
+            "warm": np.clip(poses + rng.uniform(-WARM_START_SPREAD, WARM_START_SPREAD, poses.shape),
+                            robot.lower_limits, robot.upper_limits),
+            "home": np.asarray(robot.homeAngles, dtype=np.float64),
+        }
+        for name, seed in seeds.items():
+            _, converged = inverse_kinematics(positions, rotations, seed, **limits)
+            number = max(1, 200 // size)
+            seconds = min(timeit.repeat(
+                lambda: inverse_kinematics(positions, rotations, seed, **limits), number=number, repeat=3
+            )) / number
+            print(f"{size:>8} {name:>6} {seconds * 1e3:>15.3f} {size / seconds:>12.0f} {converged.mean():>10.1%}")
+
+
+def main():
+    print("Forward kinematics")
+    bench_forward()
+    print()
+    print("Inverse kinematics (full pose)")
+    bench_inverse()
+
+
+if __name__ == "__main__":
+    main()
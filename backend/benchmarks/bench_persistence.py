@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_persistence.py
+"""
+Benchmark for the state journal.
+
+Measures what journaling adds to a state write (the `/angles` path) with the
+writer thread running, then the size of the journal a stream of writes leaves
+behind, and the time to restore a fleet from a snapshot plus a journal, as a
+restart after a crash would.
+
+Usage (from backend/):
+    python benchmarks/bench_persistence.py --robots 100 --writes 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import RobotRegistry  # noqa: E402
+from persistence import StatePersistence  # noqa: E402
+from robot import RobotArm  # noqa: E402
+
+
+def write_cost(robot, writes):
+    """Mean time of one angle write, in microseconds."""
+    angles = [[step % 90, 30.0, 55.0, 0.0, 0.0, 0.0] for step in range(writes)]
+    iterator = iter(angles)
+    return min(timeit.repeat(lambda: robot.update(currentAngles=next(iterator)), number=writes // 5, repeat=5)) \
+        / (writes // 5) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=100, help="Robots in the restored fleet")
+    parser.add_argument("--writes", type=int, default=20000, help="Angle writes per measurement")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain = write_cost(RobotArm(), options.writes)
+        persistence = StatePersistence(os.path.join(directory, "writes"))
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        journaled = write_cost(robot, options.writes)
+        time.sleep(persistence.flush_interval * 2)
+        print(f"angle write, plain:     {plain:.2f} us")
+        print(f"angle write, journaled: {journaled:.2f} us")
+        print(f"journal: {persistence.records} lines in {persistence.batches} batches for {options.writes} writes")
+        persistence.close()
+
+        # A fleet whose journal was compacted once and then grew until the crash
+        state_dir = os.path.join(directory, "fleet")
+        registry = RobotRegistry(max_robots=None, persistence=StatePersistence(state_dir))
+        units = [registry.default] + [registry.create(f"cell-{index}") for index in range(1, options.robots)]
+        registry.persistence.flush()
+        registry.persistence.compact()
+        for step in range(50):
+            for unit in units:
+                unit.robot.update(currentAngles=[step, 30.0, 55.0, 0.0, 0.0, 0.0], leftBinCount=step % 6)
+            registry.persistence.flush()
+        info = registry.persistence.info()
+        times, reads = [], []
+        for run in range(5):
+            # A fresh copy per run: the clean close below snapshots the copy, not the crashed directory
+            copy = shutil.copytree(state_dir, os.path.join(directory, f"restart-{run}"))
+            started = time.perf_counter()
+            restarted = RobotRegistry(max_robots=None, persistence=StatePersistence(copy))
+            times.append(time.perf_counter() - started)
+            reads.append(restarted.persistence.restore_seconds)
+            restarted.persistence.close()
+        print()
+        print(f"restore of {options.robots} robots from a snapshot and a {info['journalBytes'] / 1024:.0f} KiB journal: "
+              f"{min(reads) * 1000:.1f} ms to read, {min(times) * 1000:.1f} ms to rebuild the fleet")
+        registry.persistence.close()
+
+
+if __name__ == "__main__":
+    main()
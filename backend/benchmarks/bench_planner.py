@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_planner.py
+"""
+Benchmark for the collision-free path planner.
+
+For each move of the pick-and-place cycle that the automation routes through
+`intermediate1`, compares the fixed route with the planned one: number of
+waypoints, joint-space path length, duration of the trajectory (stopping at
+every waypoint) and whether it is collision-free. Plan times are the mean and
+worst cold plans over several seeds and the cached lookup. The last rows sum
+the durations over a whole left-to-right cycle, back to its first pose.
+
+Usage (from backend/):
+    python benchmarks/bench_planner.py
+"""
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collision import CollisionChecker  # noqa: E402
+from planner import PathPlanner, path_length, time_parametrize  # noqa: E402
+from robot import RobotArm  # noqa: E402
+from simulation import PRESET_POSITIONS as POSES  # noqa: E402
+
+PERIOD = 0.02
+SEEDS = range(10)
+# (name, fixed waypoints) of the cycle moves that go through intermediate1
+MOVES = (
+    ("home -> leftBinPick", ("home", "leftBinApproach", "leftBinPick")),
+    ("leftBinLift -> rightBinApproach", ("leftBinLift", "intermediate1", "rightBinApproach")),
+    ("rightBinLift -> leftBinApproach", ("rightBinLift", "intermediate1", "leftBinApproach")),
+    ("leftBinPick -> rightBinDrop", ("leftBinPick", "leftBinLift", "intermediate1", "rightBinApproach", "rightBinDrop")),
+)
+# One left-to-right cycle as the automation runs it; the planned cycle visits the same poses but intermediate1
+FIXED_CYCLE = ("intermediate1", "leftBinApproach", "leftBinPick", "leftBinLift", "intermediate1",
+               "rightBinApproach", "rightBinDrop", "rightBinLift")
+PLANNED_CYCLE = tuple(pose for pose in FIXED_CYCLE if pose != "intermediate1")
+
+
+def trajectory(robot, waypoints):
+    return time_parametrize(waypoints, robot.max_velocity, robot.max_acceleration, PERIOD)
+
+
+def make_planner(robot, checker, seed):
+    return PathPlanner(checker, robot.lower_limits, robot.upper_limits, seed=seed)
+
+
+def route(robot, checker, waypoints):
+    path = trajectory(robot, waypoints)
+    return len(waypoints), path_length(waypoints), (len(path) - 1) * PERIOD, checker.first_collision(path) is None
+
+
+def main():
+    robot = RobotArm()
+    checker = CollisionChecker()
+    print(f"{'move':>32} {'route':>7} {'waypoints':>9} {'length (deg)':>12} {'duration (s)':>12} "
+          f"{'clear':>6} {'plan mean (ms)':>14} {'plan max (ms)':>13} {'cached (us)':>11}")
+    for name, fixed in MOVES:
+        fixed_waypoints = np.array([POSES[pose] for pose in fixed])
+        count, length, duration, clear = route(robot, checker, fixed_waypoints)
+        print(f"{name:>32} {'fixed':>7} {count:>9} {length:>12.1f} {duration:>12.2f} {str(clear):>6}")
+
+        start, goal = POSES[fixed[0]], POSES[fixed[-1]]
+        times, results = [], []
+        for seed in SEEDS:
+            planner = make_planner(robot, checker, seed)
+            started = time.perf_counter()
+            waypoints, _ = planner.plan(start, goal)
+            times.append(time.perf_counter() - started)
+            results.append(route(robot, checker, waypoints))
+        cached = min(timeit.repeat(lambda: planner.plan(start, goal), number=1000, repeat=5)) / 1000
+        count, length, duration = (np.mean([result[i] for result in results]) for i in range(3))
+        clear = all(result[3] for result in results)
+        print(f"{name:>32} {'planned':>7} {count:>9.1f} {length:>12.1f} {duration:>12.2f} {str(clear):>6} "
+              f"{np.mean(times) * 1000:>14.1f} {max(times) * 1000:>13.1f} {cached * 1e6:>11.1f}")
+
+    print()
+    fixed = np.array([POSES[pose] for pose in FIXED_CYCLE + FIXED_CYCLE[:1]])
+    print(f"cycle motion, fixed:   {route(robot, checker, fixed)[2]:.2f} s")
+    planner = make_planner(robot, checker, 0)
+    poses = PLANNED_CYCLE + PLANNED_CYCLE[:1]
+    legs = [planner.plan(POSES[a], POSES[b])[0] for a, b in zip(poses[:-1], poses[1:])]
+    planned = np.concatenate([legs[0]] + [leg[1:] for leg in legs[1:]])
+    print(f"cycle motion, planned: {route(robot, checker, planned)[2]:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# backend/benchmarks/bench_startup.py
+"""
+Benchmark for the backend's cold start.
+
+Imports the API in fresh interpreters and reports the import time, the
+resident memory after the import and after `warm_up`, and the warm-up time.
+Then starts uvicorn with `--workers` processes (the production command, with
+YANIBOT_WARMUP=1 unless `--no-warmup`), and reports the time until `/health`
+answers and the resident memory of every worker. Linux only (reads /proc).
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py --runs 5 --workers 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from load_test import BACKEND_DIR, free_port
+
+PROBE = """
+import json, time
+def rss():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+started = time.perf_counter()
+import api
+result = {"importTime": time.perf_counter() - started, "importRss": rss()}
+result["warmUpTime"] = api.warm_up()["seconds"]
+result["warmRss"] = rss()
+print(json.dumps(result))
+"""
+
+
+def rss(pid):
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def probe():
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def serve(workers, warmup):
+    """Start the production command and time it until /health answers; returns (process, seconds)."""
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), YANIBOT_WARMUP="1" if warmup else "0")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.time() + 60.0
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return server, time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 60 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to import the API in")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--no-warmup", action="store_true", help="Serve without YANIBOT_WARMUP")
+    options = parser.parse_args()
+
+    results = [probe() for _ in range(options.runs)]
+    print(f"{'':>16} {'median':>8} {'min':>8} {'max':>8}")
+    for key, label, unit in (
+        ("importTime", "import", "s"), ("importRss", "rss import", "MiB"),
+        ("warmUpTime", "warm-up", "s"), ("warmRss", "rss warm", "MiB"),
+    ):
+        values = [result[key] for result in results]
+        print(f"{label + ' (' + unit + ')':>16} {statistics.median(values):>8.2f} {min(values):>8.2f} {max(values):>8.2f}")
+
+    server, ready = serve(options.workers, not options.no_warmup)
+    try:
+        # Workers may still be importing when the first of them answers
+        time.sleep(1.0)
+        workers = children(server.pid)
+        print()
+        print(f"uvicorn with {options.workers} worker(s) healthy after {ready:.2f} s")
+        print(f"supervisor rss: {rss(server.pid):.1f} MiB")
+        # The children are the workers plus multiprocessing's resource tracker, the small one
+        for pid in workers:
+            print(f"child {pid} rss: {rss(pid):.1f} MiB")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
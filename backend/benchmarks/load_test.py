@@ -0,0 +1,344 @@
+# backend/benchmarks/load_test.py
+"""
+Load test for the backend API, replaying the frontend's traffic patterns.
+
+Starts the API under uvicorn on a free local port (or targets `--url`) and runs
+N simulated clients, each on its own robot in the fleet, for a fixed time per
+scenario:
+
+- waypoints:   the original per-waypoint `moveTo` loop: `/interpolate`, then for
+               every step the pause wait (`GET /state`), the pose check
+               (`GET /state`), `POST /limits` and `POST /angles`.
+- polling:     the original pause wait while the robot is paused, `GET /state` every
+               `--poll-interval` ms (0 for back-to-back requests).
+- moves:       the current `moveTo`: `POST /move`, then `GET /move/{id}` every
+               50 ms until the move ends.
+- automation:  pick-and-place cycles as a program, `POST /programs/{name}/run`
+               and the 50 ms `GET /move/{id}` watch loop, as in automation.js.
+- stops:       `POST /move`, then `POST /stop` while the move runs; reports the
+               server-side stop latency (`GET /stop/latency`) under that load.
+
+Reports p50/p99 latency and requests per second per scenario and endpoint.
+`--save` writes the results as a JSON baseline; `--baseline` compares against
+one and exits non-zero if p99 latency or throughput regressed by more than
+`--tolerance`.
+
+Usage (from backend/):
+    python benchmarks/load_test.py --clients 20 --duration 10 --save baseline.json
+    python benchmarks/load_test.py --clients 20 --duration 10 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from simulation import PRESET_POSITIONS, program_waypoints  # noqa: E402
+
+SCENARIOS = ("waypoints", "polling", "moves", "automation", "stops")
+HOME = [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+# Poses from AutomationManager.getPresetPositions in frontend/js/automation.js
+POSES = [PRESET_POSITIONS[name] for name in ("leftBinApproach", "home", "rightBinApproach")]
+WATCH_INTERVAL = 0.05  # robot.js watchInterval
+# The left-to-right cycle of AutomationManager.buildProgramWaypoints, from the same definition as the headless
+# simulation; PUT /programs takes durations and dwells in milliseconds
+CYCLE_PROGRAM = [
+    {**waypoint, **{key: round(waypoint[key] * 1000) for key in ("duration", "dwell") if key in waypoint}}
+    for waypoint in program_waypoints(PRESET_POSITIONS, "left", "right")
+]
+
+
+class Recorder:
+    """Request latencies of one scenario, keyed by endpoint label, and completed automation cycles."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = 0
+        self.cycles = 0
+
+    async def request(self, client, label, method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors += 1
+        return response
+
+    def summary(self, elapsed):
+        """
+        Returns:
+            dict: Per endpoint and in total: request count, requests per second, p50 and p99 latency in ms.
+        """
+        def stats(values):
+            values = np.asarray(values) * 1000.0
+            return {
+                "requests": len(values),
+                "rps": len(values) / elapsed,
+                "p50": float(np.percentile(values, 50)),
+                "p99": float(np.percentile(values, 99)),
+            }
+
+        endpoints = {label: stats(values) for label, values in sorted(self.latencies.items())}
+        every = [value for values in self.latencies.values() for value in values]
+        return {
+            "elapsed": elapsed,
+            "errors": self.errors,
+            "total": stats(every) if every else None,
+            "endpoints": endpoints,
+        }
+
+
+async def waypoints_client(client, prefix, recorder, deadline, options):
+    target_index = 0
+    while time.perf_counter() < deadline:
+        target = POSES[target_index % len(POSES)]
+        target_index += 1
+        state = (await recorder.request(client, "GET /state", "GET", f"{prefix}/state")).json()
+        path = (await recorder.request(client, "POST /interpolate", "POST", "/interpolate", json={
+            "startAngles": state["currentAngles"], "targetAngles": target
+        })).json()["steps"]
+        for step in path:
+            if time.perf_counter() >= deadline:
+                return
+            await recorder.request(client, "GET /state", "GET", f"{prefix}/state")  # pause wait
+            await recorder.request(client, "GET /state", "GET", f"{prefix}/state")  # moved-during-pause check
+            await recorder.request(client, "POST /limits", "POST", f"{prefix}/limits", json={"joint_angles": step})
+            await recorder.request(client, "POST /angles", "POST", f"{prefix}/angles", json={"joint_angles": step})
+
+
+async def polling_client(client, prefix, recorder, deadline, options):
+    await client.post(f"{prefix}/pause", json={"is_paused": True})
+    try:
+        while time.perf_counter() < deadline:
+            await recorder.request(client, "GET /state", "GET", f"{prefix}/state")
+            if options.poll_interval:
+                await asyncio.sleep(options.poll_interval / 1000.0)
+    finally:
+        await client.post(f"{prefix}/pause", json={"is_paused": False})
+
+
+async def watch_move(client, prefix, recorder, move_id, deadline):
+    while time.perf_counter() < deadline:
+        move = (await recorder.request(client, "GET /move/{id}", "GET", f"{prefix}/move/{move_id}")).json()
+        if move["status"] in ("completed", "stopped", "cancelled", "failed"):
+            return move
+        await asyncio.sleep(WATCH_INTERVAL)
+    return None
+
+
+async def moves_client(client, prefix, recorder, deadline, options):
+    target_index = 0
+    while time.perf_counter() < deadline:
+        target = POSES[target_index % len(POSES)]
+        target_index += 1
+        response = await recorder.request(client, "POST /move", "POST", f"{prefix}/move", json={
+            "targetAngles": target, "duration": options.move_duration
+        })
+        await watch_move(client, prefix, recorder, response.json()["move"]["id"], deadline)
+
+
+async def automation_client(client, prefix, recorder, deadline, options):
+    while time.perf_counter() < deadline:
+        response = await recorder.request(
+            client, "POST /programs/{name}/run", "POST", f"{prefix}/programs/load-test-cycle/run", json={"cycles": 1}
+        )
+        move = await watch_move(client, prefix, recorder, response.json()["move"]["id"], deadline)
+        if move is not None and move["status"] == "completed":
+            recorder.cycles += 1
+
+
+async def stops_client(client, prefix, recorder, deadline, options):
+    target_index = 0
+    while time.perf_counter() < deadline:
+        target = POSES[target_index % len(POSES)]
+        target_index += 1
+        response = await recorder.request(client, "POST /move", "POST", f"{prefix}/move", json={
+            "targetAngles": target, "duration": options.move_duration
+        })
+        await asyncio.sleep(options.move_duration / 4000.0)
+        await recorder.request(client, "POST /stop", "POST", f"{prefix}/stop", json={"is_stopped": True})
+        await watch_move(client, prefix, recorder, response.json()["move"]["id"], deadline)
+        await recorder.request(client, "POST /stop", "POST", f"{prefix}/stop", json={"is_stopped": False})
+
+
+CLIENTS = {
+    "waypoints": waypoints_client,
+    "polling": polling_client,
+    "moves": moves_client,
+    "automation": automation_client,
+    "stops": stops_client,
+}
+
+
+async def run_scenario(base_url, scenario, options):
+    """
+    Run one scenario with `options.clients` concurrent clients, each on its own robot.
+
+    Returns:
+        dict: The latency summary of the scenario.
+    """
+    limits = httpx.Limits(max_connections=options.clients * 2, max_keepalive_connections=options.clients * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        robot_ids = [f"load-{scenario}-{index}" for index in range(options.clients)]
+        for robot_id in robot_ids:
+            await client.post("/robots", json={"id": robot_id})
+        if scenario == "automation":
+            await client.put("/programs/load-test-cycle", json={"waypoints": CYCLE_PROGRAM})
+        stops_before = (await client.get("/stop/latency")).json()["count"]
+        recorder = Recorder()
+        start = time.perf_counter()
+        deadline = start + options.duration
+        try:
+            await asyncio.gather(*(
+                CLIENTS[scenario](client, f"/robots/{robot_id}", recorder, deadline, options) for robot_id in robot_ids
+            ))
+        finally:
+            elapsed = time.perf_counter() - start
+            stop_latency = (await client.get("/stop/latency")).json()
+            for robot_id in robot_ids:
+                await client.delete(f"/robots/{robot_id}")
+            if scenario == "automation":
+                await client.delete("/programs/load-test-cycle")
+    summary = recorder.summary(elapsed)
+    if scenario == "automation":
+        summary["cyclesPerHour"] = recorder.cycles / elapsed * 3600.0
+    if stop_latency["count"] > stops_before:
+        # The server's histogram covers its whole lifetime; exact for a server started by this run
+        summary["stopLatency"] = stop_latency
+    return summary
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers=1):
+    """Start the API under uvicorn and wait until `/health` answers."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR
+    )
+    deadline = time.time() + 30.0
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 s")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Scenario name to summary, from this run.
+        baseline (dict): Scenario name to summary, from a saved run.
+        tolerance (float): Allowed relative regression, 0.2 for 20 %.
+
+    Returns:
+        list of str: One message per regressed scenario and endpoint.
+    """
+    regressions = []
+    for scenario, summary in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+        for label, current in summary["endpoints"].items():
+            before = previous["endpoints"].get(label)
+            if before is None:
+                continue
+            if current["p99"] > before["p99"] * (1.0 + tolerance):
+                regressions.append(f"{scenario} {label}: p99 {before['p99']:.2f} -> {current['p99']:.2f} ms")
+            if current["rps"] < before["rps"] * (1.0 - tolerance):
+                regressions.append(f"{scenario} {label}: {before['rps']:.0f} -> {current['rps']:.0f} req/s")
+    return regressions
+
+
+def print_summary(scenario, summary):
+    print(f"{scenario}: {summary['errors']} errors in {summary['elapsed']:.1f} s", end="")
+    if "cyclesPerHour" in summary:
+        print(f", {summary['cyclesPerHour']:.0f} cycles/h", end="")
+    print()
+    print(f"  {'endpoint':<26} {'requests':>9} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    rows = list(summary["endpoints"].items())
+    if summary["total"] is not None:
+        rows.append(("total", summary["total"]))
+    for label, stats in rows:
+        print(f"  {label:<26} {stats['requests']:>9} {stats['rps']:>9.1f} {stats['p50']:>9.2f} {stats['p99']:>9.2f}")
+    if "stopLatency" in summary:
+        latency = summary["stopLatency"]
+        print(f"  stop latency: {latency['count']} halts, mean {latency['meanMs']:.3f} ms, "
+              f"p99 <= {latency['p99Ms']:.3f} ms, max {latency['maxMs']:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend API with simulated frontend clients")
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent simulated clients per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--poll-interval", type=float, default=100.0, help="ms between polls in the polling scenario")
+    parser.add_argument("--move-duration", type=float, default=500.0, help="ms per move in the moves scenario")
+    parser.add_argument("--save", help="Write the results to this JSON baseline")
+    parser.add_argument("--baseline", help="Compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline")
+    options = parser.parse_args()
+
+    server = None
+    base_url = options.url
+    if base_url is None:
+        port = free_port()
+        server = start_server(port, options.workers)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        results = {}
+        for scenario in options.scenarios:
+            results[scenario] = asyncio.run(run_scenario(base_url, scenario, options))
+            print_summary(scenario, results[scenario])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if options.save:
+        with open(options.save, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+                "options": {"clients": options.clients, "duration": options.duration, "workers": options.workers,
+                            "pollInterval": options.poll_interval, "moveDuration": options.move_duration},
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved baseline to {options.save}")
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, options.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {options.tolerance:.0%} against {options.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# backend/cache.py
+import threading
+from collections import OrderedDict
+
+
+def quantize_key(*poses, resolution=1e-3):
+    """
+    Build a hashable cache key from joint poses, rounding angles to `resolution` degrees.
+
+    Poses that differ by less than the resolution share a key, so the float noise of
+    poses read back from the robot state does not defeat the cache.
+
+    Args:
+        *poses (list of float): Joint poses to include in the key.
+        resolution (float): Quantization step in degrees.
+
+    Returns:
+        tuple: Tuple of integer tuples, one per pose.
+    """
+    return tuple(tuple(int(round(angle / resolution)) for angle in pose) for pose in poses)
+
+
+class LRUCache:
+    """
+    Thread-safe bounded least-recently-used cache with hit, miss and eviction counters.
+    """
+
+    def __init__(self, maxsize=256):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store `value` under `key`, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Current size, capacity, hit/miss/eviction counters and the hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0
+            }
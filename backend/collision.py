@@ -0,0 +1,249 @@
+# backend/collision.py
+import numpy as np
+from kinematics import joint_positions
+
+# Links as capsules between two points of `kinematics.joint_positions`:
+# 0 base, 1 A1, 2 A2, 3 A3, 4 A4, 5 A5, 6 A6, 7 TCP. Radii in metres, from frontend/js/build_robot.js.
+LINKS = (
+    ("base", 0, 1, 0.30),
+    ("shoulder", 1, 2, 0.22),
+    ("upperArm", 2, 3, 0.15),
+    ("forearm", 3, 4, 0.12),
+    ("wrist", 4, 5, 0.08),
+    ("tool", 5, 7, 0.04),
+)
+# Link pairs far enough apart in the chain to collide with each other
+SELF_COLLISION_PAIRS = (
+    ("base", "forearm"),
+    ("base", "wrist"),
+    ("base", "tool"),
+    ("shoulder", "wrist"),
+    ("shoulder", "tool"),
+    ("upperArm", "tool"),
+)
+# Links allowed to touch the floor and the cell fixtures: the base stands on the floor
+GROUNDED_LINKS = ("base",)
+
+
+def _bin_boxes(name, x, y, top=0.85, width=0.6, depth=0.4, height=0.3, wall=0.05):
+    # Bin bottom and four walls as in WorkstationManager.createBin (frontend/js/scene.js),
+    # with scene (x, y, z) mapped to robot base coordinates (x, -z, y)
+    floor = top + wall
+    return [
+        (f"{name}Bottom", (x - width / 2, y - depth / 2, top), (x + width / 2, y + depth / 2, floor)),
+        (f"{name}Front", (x - width / 2, y + depth / 2 - wall / 2, floor), (x + width / 2, y + depth / 2 + wall / 2, floor + height)),
+        (f"{name}Back", (x - width / 2, y - depth / 2 - wall / 2, floor), (x + width / 2, y - depth / 2 + wall / 2, floor + height)),
+        (f"{name}Left", (x - width / 2 - wall / 2, y - depth / 2, floor), (x - width / 2 + wall / 2, y + depth / 2, floor + height)),
+        (f"{name}Right", (x + width / 2 - wall / 2, y - depth / 2, floor), (x + width / 2 + wall / 2, y + depth / 2, floor + height)),
+    ]
+
+
+def _table_box(name, x, y, top=0.85, width=1.5, depth=1.0):
+    # The table top and the space under it, legs included, as one solid block
+    return (name, (x - width / 2, y - depth / 2, 0.0), (x + width / 2, y + depth / 2, top))
+
+
+# The default cell: two tables with a bin on each, as built by frontend/js/scene.js
+DEFAULT_OBSTACLES = [
+    _table_box("leftTable", -1.0, -1.0),
+    _table_box("rightTable", 1.0, -1.0),
+    *_bin_boxes("leftBin", -1.0, -1.0),
+    *_bin_boxes("rightBin", 1.0, -1.0),
+]
+WORKSPACE_RADIUS = 3.0  # Red workspace circle around the base in scene.js
+
+
+def segment_distances(p1, q1, p2, q2):
+    """
+    Closest distance between pairs of 3-D segments, vectorized over any leading dimensions.
+
+    Args:
+        p1, q1 (numpy.ndarray): (..., 3) endpoints of the first segments.
+        p2, q2 (numpy.ndarray): (..., 3) endpoints of the second segments.
+
+    Returns:
+        numpy.ndarray: (...) distances.
+    """
+    d1 = q1 - p1
+    d2 = q2 - p2
+    r = p1 - p2
+    a = np.einsum("...i,...i", d1, d1)
+    e = np.einsum("...i,...i", d2, d2)
+    f = np.einsum("...i,...i", d2, r)
+    c = np.einsum("...i,...i", d1, r)
+    b = np.einsum("...i,...i", d1, d2)
+    denominator = a * e - b * b
+    # Closest point parameters, clamped to the segments; parallel segments fall back to s = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(denominator > 1e-12, np.clip((b * f - c * e) / denominator, 0.0, 1.0), 0.0)
+        t = np.where(e > 1e-12, (b * s + f) / e, 0.0)
+        s = np.where(t < 0.0, np.where(a > 1e-12, np.clip(-c / a, 0.0, 1.0), 0.0), s)
+        s = np.where(t > 1.0, np.where(a > 1e-12, np.clip((b - c) / a, 0.0, 1.0), 0.0), s)
+    t = np.clip(t, 0.0, 1.0)
+    closest = (p1 + s[..., None] * d1) - (p2 + t[..., None] * d2)
+    return np.linalg.norm(closest, axis=-1)
+
+
+def densify(path, max_step=2.0):
+    """
+    Insert intermediate poses so no joint moves more than `max_step` degrees between consecutive poses.
+
+    Args:
+        path (numpy.ndarray): (N, 6) joint angles.
+        max_step (float): Largest joint change between checked poses, in degrees.
+
+    Returns:
+        tuple: (dense, index) where `dense` is the (M, 6) densified path and `index` maps every dense pose to the
+        first original step at or after it.
+    """
+    path = np.asarray(path, dtype=np.float64)
+    if len(path) < 2:
+        return path, np.arange(len(path))
+    jumps = np.abs(np.diff(path, axis=0)).max(axis=1)
+    splits = np.maximum(1, np.ceil(jumps / max_step).astype(int))
+    fractions = np.concatenate([np.arange(1, count + 1) / count for count in splits])
+    segment = np.repeat(np.arange(len(splits)), splits)
+    dense = np.empty((len(fractions) + 1, path.shape[1]))
+    dense[0] = path[0]
+    dense[1:] = path[segment] + fractions[:, None] * (path[segment + 1] - path[segment])
+    return dense, np.concatenate(([0], segment + 1))
+
+
+class CollisionChecker:
+    """
+    Collision and workspace checks for the arm in its cell.
+
+    Links are capsules around the joint chain; the tables and bins are
+    axis-aligned boxes in the robot base frame, the floor is the plane z = 0.
+    A whole trajectory is checked in one vectorized pass: forward kinematics
+    for every pose, a bounding-box test of every link against every obstacle,
+    exact distances only for the links that pass it, and the self-collision
+    pairs against each other. Consecutive poses are first densified so that a
+    link cannot jump through a thin bin wall between two steps.
+
+    Link-box distances are measured from points sampled along the link at most
+    `sample_spacing` apart. Between two samples a box edge can cut into a link
+    by at most ``radius - sqrt(radius**2 - (sample_spacing / 2)**2)`` without
+    being reported, under 1 cm for the tool at the default spacing.
+    """
+
+    def __init__(self, obstacles=None, links=LINKS, self_pairs=SELF_COLLISION_PAIRS,
+                 workspace_radius=WORKSPACE_RADIUS, clearance=0.0, sample_spacing=0.05, max_step=2.0):
+        """
+        Args:
+            obstacles (list of tuple, optional): (name, (xmin, ymin, zmin), (xmax, ymax, zmax)) boxes,
+                the default cell if None.
+            links (tuple): (name, start point, end point, radius) capsules.
+            self_pairs (tuple): Pairs of link names checked against each other.
+            workspace_radius (float): Horizontal distance from the base every link point must stay within.
+            clearance (float): Extra margin added to every link radius, in metres.
+            sample_spacing (float): Largest distance between sampled points along a link, in metres.
+            max_step (float): Largest joint change between checked poses, in degrees.
+        """
+        obstacles = DEFAULT_OBSTACLES if obstacles is None else obstacles
+        self.obstacle_names = [name for name, _, _ in obstacles]
+        lower = np.array([low for _, low, _ in obstacles], dtype=np.float64).reshape(-1, 3)
+        upper = np.array([high for _, _, high in obstacles], dtype=np.float64).reshape(-1, 3)
+        self.box_lower = lower
+        self.box_upper = upper
+        self.box_centers = (lower + upper) / 2
+        self.box_halves = (upper - lower) / 2
+        self.link_names = [name for name, _, _, _ in links]
+        self.radii = np.array([radius for _, _, _, radius in links]) + clearance
+        self.starts = np.array([start for _, start, _, _ in links])
+        self.ends = np.array([end for _, _, end, _ in links])
+        self.grounded = np.array([name in GROUNDED_LINKS for name in self.link_names])
+        index = {name: i for i, name in enumerate(self.link_names)}
+        self.pairs = np.array([(index[a], index[b]) for a, b in self_pairs], dtype=int).reshape(-1, 2)
+        self.workspace_radius = workspace_radius
+        self.sample_spacing = sample_spacing
+        self.max_step = max_step
+
+    def _box_hits(self, starts, ends):
+        # Broad phase: capsule bounding boxes against the obstacles, (N, links, boxes)
+        radii = self.radii[None, :, None, None]
+        low = np.minimum(starts, ends)[:, :, None] - radii
+        high = np.maximum(starts, ends)[:, :, None] + radii
+        overlap = ((low < self.box_upper) & (high > self.box_lower)).all(axis=-1) & ~self.grounded[None, :, None]
+        pose, link, box = np.nonzero(overlap)
+        if len(pose) == 0:
+            return overlap
+        # Narrow phase: points sampled along the candidate links against their box
+        segment = ends[pose, link] - starts[pose, link]
+        count = max(2, int(np.ceil(np.linalg.norm(segment, axis=-1).max() / self.sample_spacing)) + 1)
+        samples = starts[pose, link][:, None] + np.linspace(0.0, 1.0, count)[None, :, None] * segment[:, None]
+        offsets = np.abs(samples - self.box_centers[box][:, None]) - self.box_halves[box][:, None]
+        distances = np.linalg.norm(np.maximum(offsets, 0.0), axis=-1) + np.minimum(offsets.max(axis=-1), 0.0)
+        overlap[pose, link, box] = (distances < self.radii[link][:, None]).any(axis=1)
+        return overlap
+
+    def check_poses(self, poses):
+        """
+        Check individual poses.
+
+        Args:
+            poses (array-like): (N, 6) joint angles in degrees.
+
+        Returns:
+            dict: ``colliding`` (N,) bool, plus for the first colliding pose its ``index``, the ``link`` and the
+            ``obstacle`` (an obstacle name, another link, ``"floor"`` or ``"workspace"``), or ``index`` None.
+        """
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+        points = joint_positions(poses)
+        starts = points[:, self.starts]
+        ends = points[:, self.ends]
+        hits = []  # (N, links, targets) bool arrays with the names of the targets
+
+        # Floor at z = 0 and the workspace cylinder: a segment's lowest and farthest points are its endpoints
+        floor = (np.minimum(starts[..., 2], ends[..., 2]) < self.radii) & ~self.grounded
+        hits.append((floor[:, :, None], ["floor"]))
+        reach = np.maximum(np.linalg.norm(starts[..., :2], axis=-1), np.linalg.norm(ends[..., :2], axis=-1))
+        hits.append(((reach + self.radii > self.workspace_radius)[:, :, None], ["workspace"]))
+
+        if len(self.obstacle_names):
+            hits.append((self._box_hits(starts, ends), self.obstacle_names))
+
+        # Self collision between non-adjacent links
+        if len(self.pairs):
+            first, second = self.pairs[:, 0], self.pairs[:, 1]
+            gaps = segment_distances(
+                points[:, self.starts[first]], points[:, self.ends[first]],
+                points[:, self.starts[second]], points[:, self.ends[second]]
+            )
+            touching = gaps < self.radii[first] + self.radii[second]
+            links = np.zeros((len(poses), len(self.link_names), len(self.pairs)), dtype=bool)
+            links[:, first, np.arange(len(self.pairs))] = touching
+            hits.append((links, [self.link_names[b] for b in second]))
+
+        colliding = np.zeros(len(poses), dtype=bool)
+        for hit, _ in hits:
+            colliding |= hit.any(axis=(1, 2))
+        result = {"colliding": colliding, "index": None, "link": None, "obstacle": None}
+        if colliding.any():
+            index = int(np.argmax(colliding))
+            for hit, names in hits:
+                link, target = np.nonzero(hit[index])
+                if len(link):
+                    result.update(index=index, link=self.link_names[link[0]], obstacle=names[target[0]])
+                    break
+        return result
+
+    def first_collision(self, path):
+        """
+        Find the first step of a trajectory at or before which the arm collides.
+
+        Motion between consecutive steps is checked too: if the arm collides on the way from
+        step i - 1 to step i, step i is reported.
+
+        Args:
+            path (array-like): (N, 6) joint angles in degrees.
+
+        Returns:
+            dict or None: None if the whole trajectory is clear, otherwise the ``step``, the ``link`` and the
+            ``obstacle`` it hits.
+        """
+        dense, steps = densify(path, self.max_step)
+        result = self.check_poses(dense)
+        if result["index"] is None:
+            return None
+        return {"step": int(steps[result["index"]]), "link": result["link"], "obstacle": result["obstacle"]}
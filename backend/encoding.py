@@ -0,0 +1,112 @@
+# backend/encoding.py
+import struct
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+# Packed binary matrix: a 16-byte little-endian header followed by the rows, also little-endian.
+# Header: magic, steps (uint32), joints (uint32), dtype code (uint8) and 3 padding bytes, so the
+# payload starts 8-byte aligned and clients can view it in place (e.g. a JS Float64Array).
+MATRIX_MEDIA_TYPE = "application/x-yanibot-matrix"
+MATRIX_MAGIC = b"YBMX"
+MATRIX_HEADER = struct.Struct("<4sIIB3x")
+MATRIX_DTYPES = {"float32": (1, np.dtype("<f4")), "float64": (2, np.dtype("<f8"))}
+_DTYPE_NAMES = {code: name for name, (code, _) in MATRIX_DTYPES.items()}
+
+
+class NumpyJSONResponse(JSONResponse):
+    """
+    JSON response that serializes NumPy arrays straight from their buffers.
+
+    FastAPI's default response runs every value through `jsonable_encoder`,
+    which walks a trajectory one float at a time. orjson writes contiguous
+    float arrays natively, so paths can be returned as `(steps, 6)` arrays.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode_matrix(array, dtype="float64"):
+    """
+    Pack a 2-D array into the binary matrix format.
+
+    The rows are copied once, straight from the array buffer; no element is converted on its own.
+
+    Args:
+        array (array-like): (steps, joints) matrix.
+        dtype (str): "float32" or "float64".
+
+    Returns:
+        bytes: Header followed by the row-major little-endian values.
+    """
+    code, wire_dtype = MATRIX_DTYPES[dtype]
+    matrix = np.ascontiguousarray(array, dtype=wire_dtype)
+    if matrix.ndim != 2:
+        raise ValueError("Only 2-D matrices can be encoded")
+    steps, joints = matrix.shape
+    return b"".join((MATRIX_HEADER.pack(MATRIX_MAGIC, steps, joints, code), matrix.data))
+
+
+def decode_matrix(body):
+    """
+    Unpack a binary matrix without copying the values.
+
+    Args:
+        body (bytes): Payload produced by `encode_matrix`.
+
+    Returns:
+        numpy.ndarray: Read-only (steps, joints) view on `body`.
+
+    Raises:
+        ValueError: If the payload is not a well-formed matrix.
+    """
+    if len(body) < MATRIX_HEADER.size:
+        raise ValueError("Payload shorter than the matrix header")
+    magic, steps, joints, code = MATRIX_HEADER.unpack_from(body)
+    if magic != MATRIX_MAGIC or code not in _DTYPE_NAMES:
+        raise ValueError("Not a binary matrix payload")
+    wire_dtype = MATRIX_DTYPES[_DTYPE_NAMES[code]][1]
+    if len(body) != MATRIX_HEADER.size + steps * joints * wire_dtype.itemsize:
+        raise ValueError("Matrix payload size does not match its header")
+    return np.frombuffer(body, dtype=wire_dtype, offset=MATRIX_HEADER.size).reshape(steps, joints)
+
+
+def negotiate_matrix(accept):
+    """
+    Pick the matrix encoding requested by an Accept header.
+
+    Clients opt into the binary format with ``Accept: application/x-yanibot-matrix``,
+    optionally with a ``dtype=float32`` parameter; anything else gets JSON.
+
+    Args:
+        accept (str or None): Value of the Accept header.
+
+    Returns:
+        str or None: "float32" or "float64" for the binary format, None for JSON.
+    """
+    for media_range in (accept or "").split(","):
+        media_type, *parameters = [part.strip() for part in media_range.split(";")]
+        if media_type.lower() != MATRIX_MEDIA_TYPE:
+            continue
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "dtype" and value.strip() in MATRIX_DTYPES:
+                return value.strip()
+        return "float64"
+    return None
+
+
+class MatrixResponse(Response):
+    """Response carrying one (steps, joints) matrix in the binary matrix format."""
+
+    media_type = MATRIX_MEDIA_TYPE
+
+    def __init__(self, content, dtype="float64", **kwargs):
+        self.dtype = dtype
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode_matrix(content, self.dtype)
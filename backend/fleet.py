@@ -0,0 +1,162 @@
+# backend/fleet.py
+import os
+import threading
+from metrics import JITTER_BUCKETS, STOP_LATENCY_BUCKETS, Histogram
+from robot import RobotArm, MotionExecutor
+from stream import StateBroadcaster
+from telemetry import DEFAULT_CAPACITY as TELEMETRY_CAPACITY, TelemetryRecorder
+
+DEFAULT_ROBOT_ID = "default"
+
+
+class RobotUnit:
+    """
+    One simulated arm: its state, its motion executor, its state stream and its telemetry recorder.
+
+    Nothing here runs while the arm is idle. The executor only has a task
+    while a move is in progress, and the broadcaster and the recorder only act
+    on state changes, so an idle unit costs its memory and nothing else.
+    """
+
+    def __init__(self, robot_id, control_rate=50.0, telemetry_capacity=TELEMETRY_CAPACITY, telemetry_path=None,
+                 tick_jitter=None, stop_latency=None, restored=None, collision_checker=None):
+        self.id = robot_id
+        self.robot = RobotArm(isEmergencyMode=False, isPaused=False, isMoving=False)
+        if restored is not None:
+            # Before the recorder is attached, so its first sample is the restored state
+            self.robot.restore(restored["version"], **restored["state"])
+        self.executor = MotionExecutor(self.robot, control_rate, tick_jitter, stop_latency, collision_checker)
+        self.broadcaster = StateBroadcaster(self.robot, self.state)
+        self.telemetry = TelemetryRecorder(self.robot, telemetry_capacity, telemetry_path)
+
+    def state(self):
+        """
+        Snapshot pushed to `/ws/state` subscribers: the `/state` payload plus the latest moves.
+        """
+        return {**self.robot.snapshot(), "moves": self.executor.active()}
+
+    def close(self):
+        """Cancel the unit's moves and detach its executor, stream and recorder from the robot."""
+        self.executor.close()
+        self.broadcaster.close()
+        self.telemetry.close()
+
+
+class RobotRegistry:
+    """
+    The robots simulated by this process, keyed by robot ID.
+
+    A default robot always exists so the unprefixed routes keep working for
+    single-arm clients. With a `StatePersistence`, the robots and states saved
+    by the previous process are restored before the first request, and every
+    later state change is journaled.
+    """
+
+    def __init__(self, control_rate=50.0, max_robots=None, telemetry_capacity=TELEMETRY_CAPACITY, telemetry_dir=None,
+                 persistence=None, collision_checker=None):
+        """
+        Args:
+            control_rate (float): Control rate of every robot's executor, in Hz.
+            max_robots (int, optional): Maximum number of robots, unlimited if None.
+            telemetry_capacity (int): Telemetry samples kept per robot.
+            telemetry_dir (str, optional): Directory of the memory-mapped telemetry files, one per robot.
+                Telemetry is kept in memory only if None.
+            persistence (StatePersistence, optional): Journal the robot states are restored from and saved to.
+                States are lost on restart if None.
+            collision_checker (collision.CollisionChecker, optional): Checks the paths every robot's executor plans
+                itself, e.g. a re-plan after a manual intervention.
+        """
+        self.control_rate = control_rate
+        self.period = 1.0 / control_rate
+        self.max_robots = max_robots
+        self.telemetry_capacity = telemetry_capacity
+        self.telemetry_dir = telemetry_dir
+        # Control tick lateness of every robot's executor, in seconds
+        self.tick_jitter = Histogram(JITTER_BUCKETS)
+        # Time from a stop, emergency, safety or pause write to the move halting, across all robots, in seconds
+        self.stop_latency = Histogram(STOP_LATENCY_BUCKETS)
+        self.persistence = persistence
+        self.collision_checker = collision_checker
+        self._units = {}
+        self._lock = threading.Lock()
+        self._restored = persistence.restore() if persistence is not None else {}
+        self.default = self.create(DEFAULT_ROBOT_ID)
+        for robot_id in list(self._restored):
+            self.create(robot_id)
+        if persistence is not None:
+            persistence.start()
+
+    def create(self, robot_id):
+        """
+        Add a robot in its home pose, or in its restored state if it was saved by the previous process.
+
+        Args:
+            robot_id (str): New robot ID.
+
+        Returns:
+            RobotUnit: The new robot.
+
+        Raises:
+            ValueError: If the ID is taken or the registry is full.
+        """
+        with self._lock:
+            if robot_id in self._units:
+                raise ValueError(f"Robot {robot_id} already exists")
+            if self.max_robots is not None and len(self._units) >= self.max_robots:
+                raise ValueError(f"Robot limit of {self.max_robots} reached")
+            telemetry_path = None
+            if self.telemetry_dir is not None:
+                telemetry_path = os.path.join(self.telemetry_dir, f"{robot_id}.telemetry")
+            unit = RobotUnit(
+                robot_id, self.control_rate, self.telemetry_capacity, telemetry_path, self.tick_jitter, self.stop_latency,
+                self._restored.pop(robot_id, None), self.collision_checker
+            )
+            self._units[robot_id] = unit
+            if self.persistence is not None:
+                self.persistence.attach(robot_id, unit.robot)
+            return unit
+
+    def get(self, robot_id):
+        """
+        Args:
+            robot_id (str): Robot ID.
+
+        Returns:
+            RobotUnit: The robot with that ID.
+
+        Raises:
+            KeyError: If there is no such robot.
+        """
+        return self._units[robot_id]
+
+    def remove(self, robot_id):
+        """
+        Remove a robot, cancelling its moves.
+
+        Raises:
+            KeyError: If there is no such robot.
+            ValueError: If `robot_id` is the default robot.
+        """
+        if robot_id == DEFAULT_ROBOT_ID:
+            raise ValueError("The default robot cannot be removed")
+        with self._lock:
+            unit = self._units.pop(robot_id)
+        if self.persistence is not None:
+            self.persistence.detach(robot_id, unit.robot)
+        unit.close()
+
+    def active_moves(self):
+        """Return the number of unfinished moves across all robots."""
+        return sum(unit.executor.running() for unit in self)
+
+    def ids(self):
+        return list(self._units)
+
+    def __contains__(self, robot_id):
+        return robot_id in self._units
+
+    def __len__(self):
+        return len(self._units)
+
+    def __iter__(self):
+        return iter(list(self._units.values()))
@@ -0,0 +1,274 @@
+# backend/kinematics.py
+import numpy as np
+
+# Fixed-transform chain of the simulated IRB 6600, matching frontend/js/build_robot.js.
+# Coordinates are in the robot base frame (metres, z up); the frontend places this frame
+# at the scene origin rotated so that robot z is scene y.
+# Each joint is a fixed translation from its parent followed by a rotation about one local axis.
+JOINT_OFFSETS = np.array([
+    [0.0, 0.0, 1.0],   # A1: top of the base column
+    [0.0, 0.0, 0.5],   # A2: shoulder
+    [0.0, 0.0, 0.8],   # A3: elbow, end of the upper arm
+    [0.0, 0.0, 0.6],   # A4: end of the forearm
+    [0.0, 0.0, 0.2],   # A5: wrist
+    [0.0, 0.0, 0.05],  # A6: flange
+])
+JOINT_AXES = ("z", "x", "x", "z", "x", "z")
+TOOL_OFFSET = np.array([0.0, 0.0, 0.1])  # TCP between the gripper fingers
+
+
+def _axis_rotations(axis, theta):
+    """(N, 3, 3) rotation matrices about a local axis."""
+    c = np.cos(theta)
+    s = np.sin(theta)
+    rotations = np.zeros(theta.shape + (3, 3))
+    if axis == "x":
+        rotations[:, 0, 0] = 1.0
+        rotations[:, 1, 1] = c
+        rotations[:, 1, 2] = -s
+        rotations[:, 2, 1] = s
+        rotations[:, 2, 2] = c
+    elif axis == "y":
+        rotations[:, 0, 0] = c
+        rotations[:, 0, 2] = s
+        rotations[:, 1, 1] = 1.0
+        rotations[:, 2, 0] = -s
+        rotations[:, 2, 2] = c
+    else:
+        rotations[:, 0, 0] = c
+        rotations[:, 0, 1] = -s
+        rotations[:, 1, 0] = s
+        rotations[:, 1, 1] = c
+        rotations[:, 2, 2] = 1.0
+    return rotations
+
+
+def _chain(angles):
+    """Walk the chain for a batch of poses, yielding (position, rotation) after each joint and at the TCP."""
+    theta = np.radians(angles)
+    count = theta.shape[0]
+    position = np.zeros((count, 3))
+    rotation = np.broadcast_to(np.eye(3), (count, 3, 3))
+    for joint, (offset, axis) in enumerate(zip(JOINT_OFFSETS, JOINT_AXES)):
+        position = position + rotation @ offset
+        rotation = rotation @ _axis_rotations(axis, theta[:, joint])
+        yield position, rotation
+    yield position + rotation @ TOOL_OFFSET, rotation
+
+
+def _as_batch(angles):
+    poses = np.asarray(angles, dtype=np.float64)
+    single = poses.ndim == 1
+    poses = poses.reshape(-1, 6)
+    return poses, single
+
+
+def forward_kinematics(angles):
+    """
+    Compute the TCP pose for one or many joint configurations.
+
+    Args:
+        angles (array-like): A single pose of 6 joint angles or an (N, 6) batch, in degrees.
+
+    Returns:
+        tuple: (positions, rotations) in the robot base frame, shaped (3,) and (3, 3) for a single pose or
+        (N, 3) and (N, 3, 3) for a batch.
+    """
+    poses, single = _as_batch(angles)
+    for position, rotation in _chain(poses):
+        pass
+    if single:
+        return position[0], rotation[0]
+    return position, rotation
+
+
+def joint_positions(angles):
+    """
+    Compute the origin of every link of the chain for one or many joint configurations.
+
+    Args:
+        angles (array-like): A single pose of 6 joint angles or an (N, 6) batch, in degrees.
+
+    Returns:
+        numpy.ndarray: (8, 3) or (N, 8, 3) points: the base origin, the six joint origins and the TCP.
+    """
+    poses, single = _as_batch(angles)
+    points = np.empty((poses.shape[0], 8, 3))
+    points[:, 0] = 0.0
+    for index, (position, _) in enumerate(_chain(poses), start=1):
+        points[:, index] = position
+    return points[0] if single else points
+
+
+def rotation_to_quaternion(rotations):
+    """
+    Convert rotation matrices to unit quaternions.
+
+    Args:
+        rotations (numpy.ndarray): (3, 3) or (N, 3, 3) rotation matrices.
+
+    Returns:
+        numpy.ndarray: (4,) or (N, 4) quaternions ordered (w, x, y, z) with w >= 0.
+    """
+    r = np.asarray(rotations, dtype=np.float64)
+    single = r.ndim == 2
+    r = r.reshape(-1, 3, 3)
+    trace = r[:, 0, 0] + r[:, 1, 1] + r[:, 2, 2]
+    quaternions = 0.5 * np.sqrt(np.maximum(0.0, np.stack([
+        1.0 + trace,
+        1.0 + r[:, 0, 0] - r[:, 1, 1] - r[:, 2, 2],
+        1.0 - r[:, 0, 0] + r[:, 1, 1] - r[:, 2, 2],
+        1.0 - r[:, 0, 0] - r[:, 1, 1] + r[:, 2, 2],
+    ], axis=1)))
+    quaternions[:, 1] = np.copysign(quaternions[:, 1], r[:, 2, 1] - r[:, 1, 2])
+    quaternions[:, 2] = np.copysign(quaternions[:, 2], r[:, 0, 2] - r[:, 2, 0])
+    quaternions[:, 3] = np.copysign(quaternions[:, 3], r[:, 1, 0] - r[:, 0, 1])
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return quaternions[0] if single else quaternions
+
+
+def quaternion_to_rotation(quaternions):
+    """
+    Convert quaternions to rotation matrices.
+
+    Args:
+        quaternions (array-like): (4,) or (N, 4) quaternions ordered (w, x, y, z); they are normalized first.
+
+    Returns:
+        numpy.ndarray: (3, 3) or (N, 3, 3) rotation matrices.
+    """
+    q = np.asarray(quaternions, dtype=np.float64)
+    single = q.ndim == 1
+    q = q.reshape(-1, 4)
+    w, x, y, z = (q / np.linalg.norm(q, axis=1, keepdims=True)).T
+    rotations = np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+    return rotations[0] if single else rotations
+
+
+def jacobian(angles):
+    """
+    Geometric Jacobian of the TCP for a batch of joint configurations.
+
+    Args:
+        angles (numpy.ndarray): (N, 6) joint angles in degrees.
+
+    Returns:
+        tuple: (positions, rotations, jacobians) with the TCP positions (N, 3), rotations (N, 3, 3) and the
+        (N, 6, 6) Jacobians mapping joint rates in rad/s to linear (rows 0-2) and angular (rows 3-5) velocity.
+    """
+    frames = list(_chain(angles))
+    tcp, rotation = frames[-1]
+    jacobians = np.empty((angles.shape[0], 6, 6))
+    for joint, (origin, joint_rotation) in enumerate(frames[:-1]):
+        axis = joint_rotation[:, :, "xyz".index(JOINT_AXES[joint])]
+        jacobians[:, :3, joint] = np.cross(axis, tcp - origin)
+        jacobians[:, 3:, joint] = axis
+    return tcp, rotation, jacobians
+
+
+def _orientation_error(rotations, targets):
+    # Half the sum of column cross products: small-angle rotation vector taking `rotations` to `targets`
+    return 0.5 * np.cross(rotations, targets, axis=1).sum(axis=2)
+
+
+def inverse_kinematics(positions, rotations=None, seed=None, lower_limits=None, upper_limits=None,
+                       max_iterations=100, position_tolerance=1e-4, orientation_tolerance=1e-3, damping=0.05, max_step=0.2):
+    """
+    Damped least squares inverse kinematics, solved for a whole batch of targets at once.
+
+    Every target is iterated in the same vectorized pass; targets that have converged are frozen while the
+    others keep iterating. Joint limits are enforced by clamping after every step.
+
+    Args:
+        positions (array-like): (3,) or (N, 3) target TCP positions in the robot base frame.
+        rotations (array-like, optional): (3, 3) or (N, 3, 3) target TCP orientations. Without them only the
+            position is solved and the wrist orientation is left free.
+        seed (array-like, optional): (6,) or (N, 6) starting joint angles in degrees, zeros by default.
+            Warm-starting from the current pose keeps the solution on the nearby configuration branch.
+        lower_limits (array-like, optional): Lower joint limits in degrees.
+        upper_limits (array-like, optional): Upper joint limits in degrees.
+        max_iterations (int): Iteration budget.
+        position_tolerance (float): Position error to accept, in metres.
+        orientation_tolerance (float): Orientation error to accept, in radians.
+        damping (float): Damping factor of the least squares step.
+        max_step (float): Largest task-space error corrected in one iteration (metres and radians combined).
+
+    Returns:
+        tuple: (angles, converged) with the (N, 6) or (6,) joint angles in degrees and a boolean array (or bool)
+        telling which targets were reached within tolerance.
+    """
+    targets = np.asarray(positions, dtype=np.float64)
+    single = targets.ndim == 1
+    targets = targets.reshape(-1, 3)
+    count = targets.shape[0]
+    target_rotations = None if rotations is None else np.asarray(rotations, dtype=np.float64).reshape(count, 3, 3)
+    rows = 3 if target_rotations is None else 6
+    angles = np.zeros((count, 6))
+    if seed is not None:
+        angles[:] = seed
+    lower = np.full(6, -np.inf) if lower_limits is None else np.asarray(lower_limits, dtype=np.float64)
+    upper = np.full(6, np.inf) if upper_limits is None else np.asarray(upper_limits, dtype=np.float64)
+    np.clip(angles, lower, upper, out=angles)
+
+    converged = np.zeros(count, dtype=bool)
+    active = np.arange(count)
+    identity = damping ** 2 * np.eye(rows)
+    for _ in range(max_iterations):
+        tcp, rotation, jac = jacobian(angles[active])
+        error = targets[active] - tcp
+        done = np.linalg.norm(error, axis=1) < position_tolerance
+        if target_rotations is not None:
+            orientation = _orientation_error(rotation, target_rotations[active])
+            done &= np.linalg.norm(orientation, axis=1) < orientation_tolerance
+            error = np.concatenate([error, orientation], axis=1)
+        converged[active[done]] = True
+        keep = ~done
+        active = active[keep]
+        if active.size == 0:
+            break
+        jac = jac[keep, :rows]
+        # Clamp the task-space error so far targets are approached in steps the linearization can follow
+        error = error[keep] * np.minimum(1.0, max_step / np.maximum(np.linalg.norm(error[keep], axis=1), 1e-12))[:, None]
+        # dq = J^T (J J^T + lambda^2 I)^-1 e
+        step = np.linalg.solve(jac @ jac.transpose(0, 2, 1) + identity, error[:, :, None])
+        delta = (jac.transpose(0, 2, 1) @ step)[:, :, 0]
+        angles[active] = np.clip(angles[active] + np.degrees(delta), lower, upper)
+
+    if single:
+        return angles[0], bool(converged[0])
+    return angles, converged
+
+
+def solve_path(positions, rotations=None, seed=None, max_jump=30.0, **options):
+    """
+    Solve a Cartesian path with one batched IK pass, then repair it point by point where needed.
+
+    Every point is first solved in parallel from `seed`. The path is then walked in order: points that did
+    not converge, or whose solution jumps to another configuration branch (a joint moving more than
+    `max_jump` degrees from the previous point), are solved again seeded from the point before them.
+
+    Args:
+        positions (array-like): (N, 3) TCP positions along the path.
+        rotations (array-like, optional): (N, 3, 3) TCP orientations along the path.
+        seed (array-like, optional): 6 joint angles to start the path from, usually the current pose.
+        max_jump (float): Largest joint change between consecutive points accepted from the batched pass, in degrees.
+        **options: Forwarded to `inverse_kinematics` (limits, tolerances, iteration budget, damping).
+
+    Returns:
+        tuple: (angles, converged) with the (N, 6) joint angles in degrees and the (N,) convergence mask.
+    """
+    targets = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    target_rotations = None if rotations is None else np.asarray(rotations, dtype=np.float64).reshape(-1, 3, 3)
+    angles, converged = inverse_kinematics(targets, target_rotations, seed, **options)
+    previous = np.zeros(6) if seed is None else np.asarray(seed, dtype=np.float64)
+    for index in range(len(targets)):
+        if not converged[index] or np.abs(angles[index] - previous).max() > max_jump:
+            angles[index], converged[index] = inverse_kinematics(
+                targets[index], None if target_rotations is None else target_rotations[index], previous, **options
+            )
+        previous = angles[index]
+    return angles, converged
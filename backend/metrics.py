@@ -0,0 +1,211 @@
+# backend/metrics.py
+import threading
+import time
+from bisect import bisect_left
+
+# Request latency buckets in seconds, from a cached /state read to a large IK or trajectory request
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Control tick lateness buckets in seconds, against a 20 ms period at 50 Hz
+JITTER_BUCKETS = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+# Stop latency buckets in seconds, from an interrupt that wakes the executor at once up to a full 20 ms tick and beyond
+STOP_LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Route label of requests that matched no route, so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observations, in the Prometheus sense.
+
+    Observing is one bisect and a few additions under a lock; the cumulative
+    bucket counts are only built when the histogram is exported.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+        self.max = None  # Largest observation, not part of the exported histogram
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: (cumulative counts per bucket including +Inf, sum, count).
+        """
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, total, count
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Returns:
+            float: The bucket bound, ``inf`` if it falls past the last bucket, or None without observations.
+        """
+        cumulative, _, count = self.snapshot()
+        if count == 0:
+            return None
+        rank = q * count
+        for bound, running in zip(self.buckets + (float("inf"),), cumulative):
+            if running >= rank:
+                return bound
+        return float("inf")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    In-process metrics in the Prometheus text exposition format.
+
+    Request counters and latency histograms are keyed on the route template
+    (``/robots/{robot_id}/state``, not ``/robots/cell-2/state``), so the number
+    of series is bounded by the number of routes. Gauges and other values that
+    live elsewhere are registered as collectors and read only when the metrics
+    are exported.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.requests = {}  # (method, route, status) -> count
+        self.latency = {}   # (method, route) -> Histogram
+        self.started = time.time()
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def observe_request(self, method, route, status, duration):
+        """Count one request and record its latency in seconds."""
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.latency.setdefault(key, Histogram(self.latency_buckets))
+        histogram.observe(duration)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+
+    def collector(self, name, kind, help_text, collect):
+        """
+        Register a metric read at export time.
+
+        Args:
+            name (str): Metric name.
+            kind (str): ``"counter"``, ``"gauge"`` or ``"histogram"``.
+            help_text (str): HELP line.
+            collect (callable): Returns a number (or a Histogram for ``"histogram"``), or a dict of
+                label tuples ``(("name", "value"), ...)`` to numbers or Histograms.
+        """
+        self._collectors.append((name, kind, help_text, collect))
+
+    def render(self):
+        """
+        Returns:
+            str: Every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            requests = dict(self.requests)
+            latency = dict(self.latency)
+
+        lines.append("# HELP yanibot_http_requests_total HTTP requests by method, route template and status.")
+        lines.append("# TYPE yanibot_http_requests_total counter")
+        for (method, route, status), count in sorted(requests.items()):
+            labels = _labels((("method", method), ("route", route), ("status", status)))
+            lines.append(f"yanibot_http_requests_total{labels} {count}")
+
+        lines.append("# HELP yanibot_http_request_duration_seconds HTTP request latency by method and route template.")
+        lines.append("# TYPE yanibot_http_request_duration_seconds histogram")
+        for (method, route), histogram in sorted(latency.items()):
+            self._render_histogram(lines, "yanibot_http_request_duration_seconds", (("method", method), ("route", route)), histogram)
+
+        lines.append("# HELP yanibot_uptime_seconds Seconds since the process started serving.")
+        lines.append("# TYPE yanibot_uptime_seconds gauge")
+        lines.append(f"yanibot_uptime_seconds {_number(time.time() - self.started)}")
+
+        for name, kind, help_text, collect in self._collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            values = collect()
+            if not isinstance(values, dict):
+                values = {(): values}
+            for labels, value in values.items():
+                if isinstance(value, Histogram):
+                    self._render_histogram(lines, name, labels, value)
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(lines, name, labels, histogram):
+        cumulative, total, count = histogram.snapshot()
+        for bound, running in zip(histogram.buckets + (float("inf"),), cumulative):
+            lines.append(f"{name}_bucket{_labels(tuple(labels) + (('le', _number(bound)),))} {running}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request into a `Metrics` instance.
+
+    Unlike ``BaseHTTPMiddleware`` it does not wrap the request or response in
+    extra tasks and streams, so the per-request overhead is two clock reads and
+    one histogram update. WebSocket connections pass through untimed.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; its path is the template
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status, time.perf_counter() - start
+            )
@@ -0,0 +1,232 @@
+# backend/persistence.py
+import atexit
+import os
+import threading
+import time
+import orjson
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.ndjson"
+# Robot state fields that survive a restart. isMoving does not: moves do not survive, so the arm comes back idle
+PERSISTED_FIELDS = (
+    "currentAngles", "homeAngles", "isPaused", "isStopped", "isEmergencyMode", "isSafetyMode",
+    "leftBinCount", "rightBinCount",
+)
+_PERSISTED = frozenset(PERSISTED_FIELDS)
+
+
+class StatePersistence:
+    """
+    Append-only journal and compacted snapshots of every robot's state, on local disk.
+
+    A state change only marks its robot as dirty, from the writing thread; a
+    writer thread collects the changes for `flush_interval` and appends one
+    journal line per dirty robot, holding that robot's whole persisted state.
+    A robot stepping at 50 Hz therefore costs one line per batch, and no
+    request ever waits on the disk.
+
+    Once the journal is larger than `compact_bytes`, every robot's state is
+    written to a snapshot file, fsynced and moved into place with
+    `os.replace`, and the journal starts over. Restoring reads the snapshot
+    and the journal lines after it; a last line torn by a crash is dropped.
+    """
+
+    def __init__(self, directory, flush_interval=0.05, compact_bytes=1 << 20, fsync=False):
+        """
+        Args:
+            directory (str): State directory, created if missing.
+            flush_interval (float): Seconds state changes are collected before they are written.
+            compact_bytes (int): Journal size that triggers a snapshot and a fresh journal.
+            fsync (bool): Also fsync the journal after every batch, so the last batches survive a power loss and not
+                only a process crash. Snapshots are always fsynced before they replace the previous one.
+        """
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self.seq = 0
+        self.states = {}  # Robot ID -> {"version": int, "state": dict}, as last written
+        self.records = 0
+        self.batches = 0
+        self.compactions = 0
+        self.restore_seconds = None
+        self._journal_end = None  # Byte offset after the last intact journal line, see `restore`
+        self._pending = {}        # Robot ID -> RobotArm to write, or None for a removed robot
+        self._listeners = {}
+        self._lock = threading.Lock()     # Guards `_pending` only, taken by every state write
+        self._io_lock = threading.Lock()  # Guards the journal, the snapshot and `states`
+        self._dirty = threading.Event()
+        self._closing = threading.Event()
+        self._journal = None
+        self._writer = None
+        os.makedirs(directory, exist_ok=True)
+
+    def restore(self):
+        """
+        Load the last consistent state from the snapshot and the journal.
+
+        Returns:
+            dict: Robot ID to ``{"version": int, "state": dict}``, the state holding the `PERSISTED_FIELDS`.
+        """
+        started = time.perf_counter()
+        states = {}
+        seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = orjson.loads(f.read())
+            seq = snapshot["seq"]
+            states = snapshot["robots"]
+        end = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("Unterminated line")
+                        record = orjson.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of the journal
+                    end += len(line)
+                    if record["seq"] <= seq:
+                        continue  # Written before a compaction that crashed before truncating the journal
+                    seq = record["seq"]
+                    if record.get("removed"):
+                        states.pop(record["id"], None)
+                    else:
+                        states[record["id"]] = {"version": record["version"], "state": record["state"]}
+        self.seq = seq
+        self.states = states
+        self._journal_end = end
+        self.restore_seconds = time.perf_counter() - started
+        return {robot_id: dict(entry) for robot_id, entry in states.items()}
+
+    def start(self):
+        """Open the journal and start the writer thread. A clean exit writes the last changes and a snapshot."""
+        if self._writer is not None:
+            return
+        self._journal = open(self.journal_path, "ab")
+        if self._journal_end is not None and self._journal.tell() > self._journal_end:
+            self._journal.truncate(self._journal_end)  # New lines must not follow a torn one
+            self._journal.seek(self._journal_end)
+        self._closing.clear()
+        self._writer = threading.Thread(target=self._run, name="yanibot-persistence", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def attach(self, robot_id, robot):
+        """Persist a robot's state changes from now on, starting with its current state."""
+        def listener(robot, fields):
+            if not _PERSISTED.isdisjoint(fields):
+                self._mark(robot_id, robot)
+
+        self._listeners[robot_id] = listener
+        robot.subscribe(listener)
+        self._mark(robot_id, robot)
+
+    def detach(self, robot_id, robot):
+        """Stop persisting a removed robot and drop it from the stored state."""
+        listener = self._listeners.pop(robot_id, None)
+        if listener is not None:
+            robot.unsubscribe(listener)
+        self._mark(robot_id, None)
+
+    def _mark(self, robot_id, robot):
+        # Runs on the thread writing the state: one dict write and, for the first change of a batch, one event set
+        with self._lock:
+            self._pending[robot_id] = robot
+        if not self._dirty.is_set():
+            self._dirty.set()
+
+    def _run(self):
+        while not self._closing.is_set():
+            self._dirty.wait()
+            # Collect the changes of the whole batch window before writing them
+            self._closing.wait(self.flush_interval)
+            self._dirty.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Append one journal line per robot changed since the last flush, and compact the journal once it is large.
+
+        Returns:
+            int: Number of journal lines written.
+        """
+        # The state writers only ever wait for the swap: the disk is touched under the I/O lock alone
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending or self._journal is None:
+                return 0
+            lines = []
+            for robot_id, robot in pending.items():
+                self.seq += 1
+                if robot is None:
+                    self.states.pop(robot_id, None)
+                    lines.append(orjson.dumps({"seq": self.seq, "id": robot_id, "removed": True}))
+                    continue
+                # The published snapshot is consistent on its own, whatever the robot does meanwhile
+                snapshot = robot.snapshot()
+                entry = {"version": snapshot["version"], "state": {name: snapshot[name] for name in PERSISTED_FIELDS}}
+                self.states[robot_id] = entry
+                lines.append(orjson.dumps({"seq": self.seq, "id": robot_id, **entry}))
+            self._journal.write(b"\n".join(lines) + b"\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self.records += len(lines)
+            self.batches += 1
+            if self._journal.tell() >= self.compact_bytes:
+                self._compact()
+        return len(lines)
+
+    def compact(self):
+        """Write every robot's stored state to a new snapshot and start an empty journal."""
+        with self._io_lock:
+            self._compact()
+
+    def _compact(self):
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(orjson.dumps({"seq": self.seq, "robots": self.states}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
+        if self._journal is not None:
+            self._journal.truncate(0)
+            self._journal.seek(0)
+        self.compactions += 1
+
+    def close(self):
+        """Stop the writer, then write the last changes and a snapshot, so the next start only reads the snapshot."""
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        self._closing.set()
+        self._dirty.set()
+        writer.join()
+        self.flush()
+        self.compact()
+        self._journal.close()
+        self._journal = None
+        atexit.unregister(self.close)
+
+    def info(self):
+        """
+        Returns:
+            dict: Directory, journal size, stored robots, and record, batch and compaction counts.
+        """
+        with self._io_lock:
+            journal_bytes = self._journal.tell() if self._journal is not None else None
+            robots = len(self.states)
+        return {
+            "directory": self.directory,
+            "journalBytes": journal_bytes,
+            "robots": robots,
+            "records": self.records,
+            "batches": self.batches,
+            "compactions": self.compactions,
+            "restoreSeconds": self.restore_seconds,
+        }
@@ -0,0 +1,217 @@
+# backend/planner.py
+import threading
+import numpy as np
+from cache import LRUCache, quantize_key
+from collision import densify
+from trajectory import trapezoidal_profile
+
+
+class PlanningFailed(Exception):
+    """Raised when no collision-free path is found within the iteration budget."""
+
+
+class _Tree:
+    """RRT tree in joint space: preallocated node array and parent indices."""
+
+    def __init__(self, root, capacity):
+        self.nodes = np.empty((capacity, len(root)))
+        self.parents = np.empty(capacity, dtype=int)
+        self.nodes[0] = root
+        self.parents[0] = -1
+        self.size = 1
+
+    def nearest(self, pose):
+        distances = np.einsum("ij,ij->i", self.nodes[:self.size] - pose, self.nodes[:self.size] - pose)
+        return int(np.argmin(distances))
+
+    def add(self, pose, parent):
+        self.nodes[self.size] = pose
+        self.parents[self.size] = parent
+        self.size += 1
+        return self.size - 1
+
+    def branch(self, index):
+        """Poses from the root to `index`."""
+        poses = []
+        while index >= 0:
+            poses.append(self.nodes[index])
+            index = self.parents[index]
+        return poses[::-1]
+
+
+def path_length(waypoints):
+    """Total joint-space length of a waypoint path, in degrees."""
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    return float(np.linalg.norm(np.diff(waypoints, axis=0), axis=1).sum())
+
+
+def time_parametrize(waypoints, max_velocity, max_acceleration, period):
+    """
+    Sample a waypoint path as consecutive time-optimal moves, stopping at every waypoint.
+
+    Stopping keeps the arm on the straight joint-space segments the planner checked; blending
+    corners could cut into an obstacle.
+
+    Args:
+        waypoints (numpy.ndarray): (K, 6) joint angles.
+        max_velocity (array-like): Per-joint velocity limits in degrees per second.
+        max_acceleration (array-like): Per-joint acceleration limits in degrees per second squared.
+        period (float): Sampling period in seconds.
+
+    Returns:
+        numpy.ndarray: (n, 6) joint angles, one row per period, starting at the first waypoint.
+    """
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    segments = [waypoints[:1]]
+    for start, target in zip(waypoints[:-1], waypoints[1:]):
+        _, segment = trapezoidal_profile(start, target, max_velocity, max_acceleration, period)
+        segments.append(segment[1:])
+    return np.concatenate(segments)
+
+
+class PathPlanner:
+    """
+    RRT-Connect planner in joint space with shortcut smoothing.
+
+    Two trees grow from the start and the goal towards random poses within the
+    joint limits, one fixed-size step at a time, and each new node is greedily
+    connected to the other tree. Every edge is checked with the
+    `CollisionChecker`, motion between the poses included. Once the trees meet,
+    random shortcuts between non-consecutive waypoints replace the detours RRT
+    leaves behind.
+
+    Plans are cached on the quantized start and goal poses, so repeated cycles
+    between the same poses are served without planning. A direct move is tried
+    first; the trees are only grown when it collides.
+    """
+
+    def __init__(self, checker, lower_limits, upper_limits, step=10.0, edge_step=0.5, max_nodes=5000,
+                 shortcuts=100, cache_size=256, seed=None):
+        """
+        Args:
+            checker (CollisionChecker): Collision checks for poses and edges.
+            lower_limits (array-like): Per-joint lower limits in degrees.
+            upper_limits (array-like): Per-joint upper limits in degrees.
+            step (float): Largest joint-space distance a tree grows per extension, in degrees.
+            edge_step (float): Largest joint change between the poses checked along an edge, in degrees. Finer
+                than the checker's own step, so an executed trajectory, sampled at other points of the same
+                edges, does not graze what the planner let through.
+            max_nodes (int): Node budget per tree before giving up.
+            shortcuts (int): Shortcut attempts on a found path.
+            cache_size (int): Plans kept in the LRU cache.
+            seed (int, optional): Seed of the random sampler, for reproducible plans.
+        """
+        self.checker = checker
+        self.lower_limits = np.asarray(lower_limits, dtype=np.float64)
+        self.upper_limits = np.asarray(upper_limits, dtype=np.float64)
+        self.step = step
+        self.edge_step = edge_step
+        self.max_nodes = max_nodes
+        self.shortcuts = shortcuts
+        self.cache = LRUCache(maxsize=cache_size)
+        self.rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()  # The random generator is not thread-safe
+
+    def clear(self, start, target):
+        """Whether the straight joint-space move from `start` to `target` is collision-free."""
+        dense, _ = densify(np.stack([start, target]), self.edge_step)
+        return not self.checker.check_poses(dense)["colliding"].any()
+
+    def plan(self, start, goal):
+        """
+        Find a collision-free path between two poses.
+
+        Args:
+            start (array-like): Start pose, 6 joint angles in degrees.
+            goal (array-like): Goal pose, 6 joint angles in degrees.
+
+        Returns:
+            tuple: ((K, 6) waypoints from start to goal, cached) where `cached` tells whether the plan came from
+            the cache. The returned waypoints are a copy.
+
+        Raises:
+            ValueError: If the start or goal pose is out of limits or in collision.
+            PlanningFailed: If no path is found within the node budget.
+        """
+        start = np.asarray(start, dtype=np.float64)
+        goal = np.asarray(goal, dtype=np.float64)
+        key = quantize_key(start, goal)
+        waypoints = self.cache.get(key)
+        if waypoints is not None:
+            return waypoints.copy(), True
+        for name, pose in (("Start", start), ("Goal", goal)):
+            if (pose < self.lower_limits).any() or (pose > self.upper_limits).any():
+                raise ValueError(f"{name} pose out of joint limits: {pose.tolist()}")
+            collision = self.checker.check_poses(pose[None])
+            if collision["index"] is not None:
+                raise ValueError(f"{name} pose in collision: {collision['link']} hits {collision['obstacle']}")
+        if self.clear(start, goal):
+            waypoints = np.stack([start, goal])
+        else:
+            with self._lock:
+                waypoints = self.shortcut(self._connect(start, goal))
+        self.cache.put(key, waypoints)
+        return waypoints.copy(), False
+
+    def _extend(self, tree, target):
+        # Grow `tree` one step from its nearest node towards `target`; returns the new node or None if blocked
+        nearest = tree.nearest(target)
+        origin = tree.nodes[nearest]
+        offset = target - origin
+        distance = np.linalg.norm(offset)
+        pose = target if distance <= self.step else origin + offset * (self.step / distance)
+        if not self.clear(origin, pose):
+            return None
+        return tree.add(pose, nearest)
+
+    def _connect(self, start, goal):
+        start_tree = _Tree(start, self.max_nodes)
+        goal_tree = _Tree(goal, self.max_nodes)
+        grown, other = start_tree, goal_tree
+        while grown.size < self.max_nodes and other.size < self.max_nodes:
+            new = self._extend(grown, self.rng.uniform(self.lower_limits, self.upper_limits))
+            if new is not None:
+                # Greedily grow the other tree towards the new node until it is reached or blocked
+                target = grown.nodes[new]
+                reached = self._extend(other, target)
+                while reached is not None and not np.allclose(other.nodes[reached], target):
+                    reached = self._extend(other, target) if other.size < self.max_nodes else None
+                if reached is not None:
+                    if grown is start_tree:
+                        head, tail = grown.branch(new), other.branch(reached)
+                    else:
+                        head, tail = other.branch(reached), grown.branch(new)
+                    # Both branches end on the meeting pose; keep it once
+                    return np.array(head + tail[::-1][1:])
+            grown, other = other, grown
+        raise PlanningFailed(f"No collision-free path found within {self.max_nodes} nodes")
+
+    def shortcut(self, waypoints):
+        """
+        Remove detours from a path by joining random pairs of waypoints that see each other.
+
+        Args:
+            waypoints (numpy.ndarray): (K, 6) collision-free waypoints.
+
+        Returns:
+            numpy.ndarray: (M, 6) waypoints with M <= K, same start and goal.
+        """
+        waypoints = list(waypoints)
+        for _ in range(self.shortcuts):
+            if len(waypoints) <= 2:
+                break
+            first, second = sorted(self.rng.choice(len(waypoints), size=2, replace=False))
+            if second - first < 2:
+                continue
+            if self.clear(waypoints[first], waypoints[second]):
+                del waypoints[first + 1:second]
+        # Greedy pass: from each kept waypoint, jump to the farthest one in direct sight
+        smoothed = [waypoints[0]]
+        index = 0
+        while index < len(waypoints) - 1:
+            for farther in range(len(waypoints) - 1, index, -1):
+                if farther == index + 1 or self.clear(waypoints[index], waypoints[farther]):
+                    break
+            smoothed.append(waypoints[farther])
+            index = farther
+        return np.array(smoothed)
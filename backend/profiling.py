@@ -0,0 +1,275 @@
+# backend/profiling.py
+"""
+Opt-in request profiling for the backend.
+
+Two views of where request time goes, both aggregated in memory and written
+to local files on demand:
+
+- Phase timers: endpoints wrap their steps in ``profiler.phase("compute")``,
+  ``profiler.phase("encode")`` and so on. Per route template, the report gives
+  the time in each phase and the rest of the request ("framework": reading the
+  body, pydantic validation, dependencies and sending the response).
+- Stack sampler: a background thread samples every thread's Python stack at a
+  fixed interval and counts them as collapsed stacks
+  (``module:function;module:function count``), the input format of
+  flamegraph.pl, speedscope and inferno.
+
+Profiling is off unless YANIBOT_PROFILE=1 is set or it is switched on through
+``POST /admin/profiling``. While off, `ProfilingMiddleware` passes requests
+straight through and `Profiler.phase` returns a shared no-op context manager,
+and no sampler thread exists.
+"""
+import atexit
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_ENV = "YANIBOT_PROFILE"
+PROFILE_DIR_ENV = "YANIBOT_PROFILE_DIR"
+PROFILE_INTERVAL_ENV = "YANIBOT_PROFILE_INTERVAL"  # milliseconds
+FRAMEWORK_PHASE = "framework"
+# Leaf frames of threads that are blocked waiting for work, left out of the sampled stacks
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+
+# Phase durations of the request being handled, keyed by phase name
+_request_phases = contextvars.ContextVar("request_phases", default=None)
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ("phases", "name", "start")
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class Profiler:
+    """
+    Phase timer and stack sampler, switched on and off at runtime.
+    """
+
+    def __init__(self, output_dir="profiles", interval=0.005):
+        """
+        Args:
+            output_dir (str): Directory reports are written to.
+            interval (float): Stack sampling interval in seconds.
+        """
+        self.output_dir = output_dir
+        self.interval = interval
+        self.enabled = False
+        self.started = None
+        self.phases = {}  # (route, phase) -> [count, total seconds, max seconds]
+        self.requests = Counter()
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = threading.Event()
+        self._exit_hook = False
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler from the YANIBOT_PROFILE* environment variables, started if YANIBOT_PROFILE is set."""
+        profiler = cls(
+            output_dir=os.environ.get(PROFILE_DIR_ENV, "profiles"),
+            interval=float(os.environ.get(PROFILE_INTERVAL_ENV, 5)) / 1000.0
+        )
+        if os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on"):
+            profiler.start()
+        return profiler
+
+    def start(self):
+        """
+        Start timing phases and sampling stacks. Does nothing if already running.
+
+        A profiler still running when the process exits writes its reports on the way out.
+        """
+        with self._lock:
+            if self.enabled:
+                return
+            if not self._exit_hook:
+                atexit.register(self._write_at_exit)
+                self._exit_hook = True
+            self.enabled = True
+            self.started = time.time()
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="yanibot-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        """Stop profiling, keeping the data collected so far."""
+        with self._lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+            sampler, self._sampler = self._sampler, None
+        self._stop.set()
+        sampler.join()
+
+    def _write_at_exit(self):
+        if self.enabled:
+            self.stop()
+            self.write()
+
+    def reset(self):
+        """Drop the collected phase timings and stacks."""
+        with self._lock:
+            self.phases.clear()
+            self.requests.clear()
+            self.stacks.clear()
+            self.samples = 0
+
+    def phase(self, name):
+        """
+        Time a named phase of the current request.
+
+        Returns:
+            A context manager; a shared no-op one while profiling is off or outside a profiled request.
+        """
+        if not self.enabled:
+            return _NO_PHASE
+        phases = _request_phases.get()
+        if phases is None:
+            return _NO_PHASE
+        return _Phase(phases, name)
+
+    def record_request(self, route, total, phases):
+        """Add one request's total time and phase times to the per-route aggregates."""
+        phases = dict(phases)
+        phases[FRAMEWORK_PHASE] = max(0.0, total - sum(phases.values()))
+        with self._lock:
+            self.requests[route] += 1
+            for name, seconds in phases.items():
+                entry = self.phases.setdefault((route, name), [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            for thread_id, frame in frames.items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}")
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(names)))
+            del frames
+            with self._lock:
+                self.samples += 1
+                self.stacks.update(stacks)
+
+    def report(self, top=20):
+        """
+        Returns:
+            dict: Profiling state, per-route phase timings in milliseconds and the most frequent stacks.
+        """
+        with self._lock:
+            phases = {key: list(value) for key, value in self.phases.items()}
+            requests = dict(self.requests)
+            stacks = self.stacks.most_common(top)
+            samples = self.samples
+        routes = {}
+        for (route, name), (count, total, longest) in sorted(phases.items()):
+            routes.setdefault(route, {"requests": requests.get(route, 0), "phases": {}})["phases"][name] = {
+                "count": count,
+                "meanMs": total / count * 1000.0,
+                "maxMs": longest * 1000.0,
+                "totalMs": total * 1000.0,
+            }
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "interval": self.interval,
+            "samples": samples,
+            "routes": routes,
+            "topStacks": [{"stack": stack, "samples": count} for stack, count in stacks],
+        }
+
+    def write(self, output_dir=None):
+        """
+        Write the collapsed stacks and the phase report to timestamped files.
+
+        Args:
+            output_dir (str, optional): Directory to write to, `output_dir` by default.
+
+        Returns:
+            dict: Paths of the ``stacks`` (collapsed stacks) and ``phases`` (JSON) files.
+        """
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        stacks_path = os.path.join(output_dir, f"stacks-{stamp}.collapsed")
+        phases_path = os.path.join(output_dir, f"phases-{stamp}.json")
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        with open(stacks_path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks)
+        report = self.report(top=0)
+        report.pop("topStacks")
+        with open(phases_path, "w") as f:
+            json.dump(report, f, indent=2)
+        return {"stacks": stacks_path, "phases": phases_path}
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that opens a phase record per HTTP request while profiling is on.
+    """
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+        phases = {}
+        token = _request_phases.set(phases)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            total = time.perf_counter() - start
+            _request_phases.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                self.profiler.record_request(route.path, total, phases)
@@ -0,0 +1,119 @@
+# backend/programs.py
+import numpy as np
+
+EVENTS = ("pick", "drop")
+RAMP_FRACTION = 0.25  # Share of a segment spent accelerating (and decelerating)
+
+
+def segment_profile(u, ramp=RAMP_FRACTION):
+    """
+    Normalized trapezoidal time scaling.
+
+    Args:
+        u (numpy.ndarray): Normalized time, 0 at the segment start and 1 at its end. Values outside [0, 1] are clamped.
+        ramp (float): Fraction of the segment spent accelerating, and again decelerating.
+
+    Returns:
+        numpy.ndarray: Normalized position s(u), rising smoothly from 0 to 1.
+    """
+    u = np.clip(u, 0.0, 1.0)
+    velocity = 1.0 / (1.0 - ramp)
+    acceleration = velocity / ramp
+    return np.where(
+        u < ramp,
+        0.5 * acceleration * u ** 2,
+        np.where(
+            u <= 1.0 - ramp,
+            0.5 * acceleration * ramp ** 2 + velocity * (u - ramp),
+            1.0 - 0.5 * acceleration * (1.0 - u) ** 2,
+        ),
+    )
+
+
+class MotionProgram:
+    """
+    A named cycle of waypoints compiled once into a single blended trajectory.
+
+    Waypoints are visited in order and the cycle closes back on the first one,
+    so the compiled path starts and ends on ``waypoints[0]`` and can be
+    replayed back to back. Each waypoint gives the duration of the segment that
+    arrives at it, an optional ``pick``/``drop`` event fired on arrival and an
+    optional dwell. The robot stops exactly on waypoints with an event or a
+    dwell and on the first waypoint; it rounds the corner at every other
+    waypoint by starting the next segment while the previous one decelerates.
+    """
+
+    def __init__(self, name, waypoints, period, blend=True):
+        """
+        Args:
+            name (str): Program name.
+            waypoints (list of dict): Each with ``angles`` (6 floats, degrees), ``duration`` (seconds, > 0),
+                optional ``event`` ("pick" or "drop") and optional ``dwell`` (seconds).
+            period (float): Sampling period of the compiled trajectory, normally the executor's control period.
+            blend (bool): Round the corners at pass-through waypoints.
+        """
+        if len(waypoints) < 2:
+            raise ValueError("A program needs at least two waypoints")
+        for waypoint in waypoints:
+            if waypoint["duration"] <= 0:
+                raise ValueError("Waypoint durations must be positive")
+            if waypoint.get("event") not in (None,) + EVENTS:
+                raise ValueError(f"Unknown event {waypoint['event']!r}")
+        self.name = name
+        self.waypoints = [dict(waypoint) for waypoint in waypoints]
+        self.period = period
+        self.blend = blend
+        self.times, self.path, self.events = self._compile()
+
+    @property
+    def cycle_duration(self):
+        return float(self.times[-1])
+
+    def _stops_at(self, index):
+        waypoint = self.waypoints[index]
+        return index == 0 or not self.blend or waypoint.get("event") is not None or waypoint.get("dwell", 0) > 0
+
+    def _compile(self):
+        poses = np.array([waypoint["angles"] for waypoint in self.waypoints], dtype=np.float64)
+        count = len(poses)
+        # Segment k arrives at waypoint (k + 1) % count, so the last segment closes the cycle
+        arrivals = [(k + 1) % count for k in range(count)]
+        deltas = poses[arrivals] - poses
+        durations = np.array([self.waypoints[i]["duration"] for i in arrivals])
+
+        starts = np.zeros(count)
+        ends = np.zeros(count)
+        arrival_times = np.zeros(count)
+        clock = 0.0
+        for k, waypoint_index in enumerate(arrivals):
+            starts[k] = clock
+            ends[k] = clock + durations[k]
+            arrival_times[k] = ends[k]
+            if self._stops_at(waypoint_index) or k == count - 1:
+                clock = ends[k] + self.waypoints[waypoint_index].get("dwell", 0.0)
+            else:
+                # Start the next segment while this one decelerates
+                clock = ends[k] - RAMP_FRACTION * min(durations[k], durations[k + 1])
+        total = max(clock, ends[-1])
+
+        times = np.append(np.arange(0.0, total, self.period), total)
+        scaling = segment_profile((times[:, None] - starts) / durations)
+        path = poses[0] + scaling @ deltas
+        path[-1] = poses[0]
+
+        events = []
+        for k, waypoint_index in enumerate(arrivals):
+            event = self.waypoints[waypoint_index].get("event")
+            if event is not None:
+                step = int(np.searchsorted(times, arrival_times[k] - 1e-9))
+                events.append({"step": step, "event": event, "waypoint": waypoint_index})
+        return times, np.ascontiguousarray(path), events
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "waypoints": len(self.waypoints),
+            "steps": len(self.path),
+            "cycleDuration": self.cycle_duration,
+            "events": self.events,
+        }
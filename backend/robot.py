@@ -1,8 +1,46 @@
 # backend/robot.py
-import numpy as np 
+import asyncio
+import itertools
+import threading
+import time
+import numpy as np
+from trajectory import trapezoidal_profile
+
+# Objects in each pick-and-place bin when the scene starts or is reset
+INITIAL_BIN_COUNTS = {"leftBinCount": 5, "rightBinCount": 0}
+
+class VersionConflict(Exception):
+    """Raised by `RobotArm.update` when the state changed since the version the caller read."""
+
+    def __init__(self, expected, actual):
+        super().__init__(f"State version is {actual}, expected {expected}")
+        self.expected = expected
+        self.actual = actual
+
 
 class RobotArm:
+    """
+    Shared state of the simulated arm.
+
+    Writes to the state fields are serialized by a lock: every write that
+    changes something bumps ``version`` and publishes a new immutable snapshot
+    dict. Readers take the published snapshot by reference without locking, so
+    they never block on writers and never see a half-applied update.
+    """
+
+    # Attributes that are part of the published robot state; writing any of them notifies listeners
+    STATE_FIELDS = ("isMoving", "isPaused", "isStopped", "isEmergencyMode", "isSafetyMode", "currentAngles", "homeAngles",
+                    "leftBinCount", "rightBinCount")
+    # Order of the fields in the published snapshot
+    SNAPSHOT_FIELDS = ("isMoving", "isEmergencyMode", "isPaused", "isStopped", "isSafetyMode", "currentAngles", "homeAngles",
+                       "leftBinCount", "rightBinCount")
+    ANGLE_FIELDS = ("currentAngles", "homeAngles")
+
     def __init__(self, isEmergencyMode=False, isPaused=False, isMoving=False):
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.version = 0
+        self._snapshot = {}
         # Define 6 joints with min/max angle limits (degrees)
         self.joint_limits = {
             # ABB IRB 6600 Specific Joint Limits
@@ -13,6 +51,12 @@ class RobotArm:
             4: (-120, 120), # A5: Wrist Pitch
             5: (-300, 300)  # A6: Flange Roll
         }
+        # Same limits as arrays so whole trajectories can be checked in one vectorized pass
+        self.lower_limits = np.array([self.joint_limits[i][0] for i in range(6)], dtype=np.float64)
+        self.upper_limits = np.array([self.joint_limits[i][1] for i in range(6)], dtype=np.float64)
+        # ABB IRB 6600 axis speeds (deg/s) and estimated accelerations (deg/s^2) for trajectory generation
+        self.max_velocity = np.array([100.0, 90.0, 90.0, 150.0, 120.0, 190.0])
+        self.max_acceleration = np.array([200.0, 180.0, 180.0, 300.0, 240.0, 380.0])
         self.isMoving = False
         self.isPaused = False
         self.isStopped = False
@@ -20,3 +64,593 @@ class RobotArm:
         self.isSafetyMode = False
         self.homeAngles = [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]  # Home position
         self.currentAngles = self.homeAngles  # Default home position on startup
+        # Objects in the pick-and-place bins, as reported by the client that moves them
+        self.leftBinCount = INITIAL_BIN_COUNTS["leftBinCount"]
+        self.rightBinCount = INITIAL_BIN_COUNTS["rightBinCount"]
+
+    def __setattr__(self, name, value):
+        if name in self.STATE_FIELDS:
+            self.update(**{name: value})
+        else:
+            super().__setattr__(name, value)
+
+    def update(self, expected_version=None, **fields):
+        """
+        Atomically write one or more state fields.
+
+        All fields are applied under the state lock and published as a single
+        new snapshot, so no reader sees some of them without the others.
+
+        Args:
+            expected_version (int, optional): Only apply the update if the state is still at this version.
+            **fields: State fields to write, from `STATE_FIELDS`.
+
+        Returns:
+            dict: The published snapshot after the update.
+
+        Raises:
+            VersionConflict: If `expected_version` is given and the state has moved on.
+            AttributeError: If a field is not a state field.
+        """
+        for name in fields:
+            if name not in self.STATE_FIELDS:
+                raise AttributeError(f"{name} is not a robot state field")
+        with self._lock:
+            if expected_version is not None and expected_version != self.version:
+                raise VersionConflict(expected_version, self.version)
+            changed = []
+            for name, value in fields.items():
+                if name in self.ANGLE_FIELDS:
+                    value = [float(angle) for angle in value]  # Own copy, never mutated in place
+                if name not in self.__dict__ or self.__dict__[name] != value:
+                    self.__dict__[name] = value
+                    changed.append(name)
+            if changed:
+                self.__dict__["version"] = self.version + 1
+                self._publish()
+            snapshot = self._snapshot
+        if changed:
+            self.notify(tuple(changed))
+        return snapshot
+
+    def restore(self, version, **fields):
+        """
+        Put back a persisted state, as it was at `version`.
+
+        Unlike `update`, the version is set rather than bumped, so clients
+        holding a version from before a restart see the same numbering, and
+        listeners are not notified: nothing changed since the state was saved.
+
+        Args:
+            version (int): Version of the persisted state.
+            **fields: State fields to restore, from `STATE_FIELDS`.
+
+        Raises:
+            AttributeError: If a field is not a state field.
+        """
+        for name in fields:
+            if name not in self.STATE_FIELDS:
+                raise AttributeError(f"{name} is not a robot state field")
+        with self._lock:
+            for name, value in fields.items():
+                if name in self.ANGLE_FIELDS:
+                    value = [float(angle) for angle in value]
+                self.__dict__[name] = value
+            self.__dict__["version"] = version
+            self._publish()
+
+    def _publish(self):
+        snapshot = {name: self.__dict__.get(name) for name in self.SNAPSHOT_FIELDS}
+        snapshot["version"] = self.version
+        self.__dict__["_snapshot"] = snapshot
+
+    def subscribe(self, listener):
+        """
+        Register a callable notified whenever a state field changes.
+
+        Listeners are called synchronously from the writing thread with
+        ``(robot, fields)`` and must not block.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def notify(self, fields=()):
+        """Tell listeners that `fields` changed."""
+        for listener in tuple(self.__dict__.get("_listeners", ())):
+            listener(self, fields)
+
+    def snapshot(self):
+        """
+        Return the robot state as served by `GET /state`.
+
+        This is a lock-free read of the last published snapshot. The dict is
+        shared with other readers and must not be modified.
+
+        Returns:
+            dict: Moving, emergency, paused, stopped and safety flags, current and home angles, bin counts and the
+            state version.
+        """
+        return self._snapshot
+
+    def within_limits(self, angles):
+        """
+        Check whether a single pose lies inside the joint limits.
+
+        Args:
+            angles (list of float): Six joint angles in degrees.
+
+        Returns:
+            bool: True if every joint is within its limits.
+        """
+        return self.first_limit_violation(angles) is None
+
+    def first_limit_violation(self, trajectory):
+        """
+        Find the first pose of a trajectory that breaks a joint limit.
+
+        Args:
+            trajectory (array-like): (N, 6) joint angles in degrees, or a single pose of 6 angles.
+
+        Returns:
+            tuple of int or None: (step index, joint index) of the first violation, or None if the whole trajectory is within limits.
+        """
+        poses = np.asarray(trajectory, dtype=np.float64).reshape(-1, 6)
+        outside = (poses < self.lower_limits) | (poses > self.upper_limits)
+        steps = outside.any(axis=1)
+        if not steps.any():
+            return None
+        step = int(steps.argmax())
+        return step, int(outside[step].argmax())
+
+
+def _expire(waiter):
+    if not waiter.done():
+        waiter.set_result(False)
+
+
+class MoveStopped(Exception):
+    """Raised inside the executor when the robot's stop flag aborts a move."""
+
+
+class MoveCollision(Exception):
+    """Raised inside the executor when a path it planned itself would collide; the move fails."""
+
+    def __init__(self, collision):
+        super().__init__(f"Move collides: {collision['link']} hits {collision['obstacle']}")
+        self.collision = collision
+
+
+class Move:
+    """A single motion request tracked by the MotionExecutor."""
+
+    TERMINAL = ("completed", "stopped", "cancelled", "failed")
+
+    def __init__(self, move_id, targetAngles, duration, manual=False, program=None, cycles=None, path=None):
+        self.id = move_id
+        self.targetAngles = list(targetAngles)
+        self.duration = duration
+        self.manual = manual
+        self.program = program  # MotionProgram replayed by this move, if any
+        self.cycles = cycles    # Number of program cycles, None to repeat until stopped
+        self.path = path        # Precomputed (ticks, 6) path followed by this move, e.g. a telemetry replay
+        self.planned = None     # (start pose, waypoints) planned and checked before the move was started
+        self.cycle = 0
+        self.lastEvent = None
+        self.status = "pending"  # pending | running | waiting | completed | stopped | cancelled | failed
+        self.message = ""
+        self.step = 0
+        self.totalSteps = 0
+        self.task = None
+
+    @property
+    def done(self):
+        return self.status in self.TERMINAL
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "message": self.message,
+            "targetAngles": self.targetAngles,
+            "duration": self.duration,
+            "manual": self.manual,
+            "step": self.step,
+            "totalSteps": self.totalSteps,
+            "program": self.program.name if self.program is not None else None,
+            "cycle": self.cycle,
+            "cycles": self.cycles,
+            "lastEvent": self.lastEvent,
+        }
+
+
+class MotionExecutor:
+    """
+    Server-side trajectory executor for a RobotArm.
+
+    A move is a joint-space path that the executor steps through on its own
+    asyncio task at a fixed control rate, writing each waypoint straight to
+    ``robot.currentAngles``. Between ticks it honours the robot flags the same
+    way the frontend used to: pause, emergency and safety mode hold the move in
+    place, stop aborts it. If the arm was moved by hand while a move was held,
+    a single move is re-planned from the new pose on resume, while a program
+    first returns to the pose where it was held and then carries on.
+
+    With a collision checker, every path the executor plans itself (approach
+    moves, re-plans and returns to a held pose) is planned and checked off
+    the event loop before the arm follows it, and a colliding path fails the
+    move.
+    """
+
+    SAFE_SHOULDER_ANGLE = 50.0  # A2 beyond this is "too low" to travel directly
+    SAFER_SHOULDER_ANGLE = 45.0
+    REPLAN_TOLERANCE = 2.0  # degrees, the tolerance the frontend compared poses with before moves ran here
+    HISTORY_SIZE = 32
+    CHECK_ATTEMPTS = 3  # Plan-and-check rounds while the arm keeps moving under the planner, as for /move
+
+    # State fields that can halt a move or release a held one; writing them interrupts the control tick wait
+    INTERRUPT_FIELDS = frozenset(("isStopped", "isEmergencyMode", "isSafetyMode", "isPaused"))
+
+    def __init__(self, robot, control_rate=50.0, tick_jitter=None, stop_latency=None, collision_checker=None):
+        """
+        Args:
+            robot (RobotArm): Robot to move.
+            control_rate (float): Waypoints per second.
+            tick_jitter (metrics.Histogram, optional): Records how late each control tick wakes up, in seconds.
+            stop_latency (metrics.Histogram, optional): Records the time from a stop, emergency, safety or pause
+                write to the running move halting, in seconds.
+            collision_checker (collision.CollisionChecker, optional): Checks the paths the executor plans itself.
+                They are not checked if None.
+        """
+        self.robot = robot
+        self.collision_checker = collision_checker
+        self.control_rate = control_rate
+        self.period = 1.0 / control_rate
+        self.tick_jitter = tick_jitter
+        self.stop_latency = stop_latency
+        self.current = None  # Automated (interruptible) move
+        self.manual = None   # Manual override move, runs even while `current` is held
+        self.moves = {}
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._waiters = set()        # Futures of the control tick waits in progress
+        self._halt_requested = None  # perf_counter() of the unacknowledged halting write
+        robot.subscribe(self._on_state)
+
+    def plan(self, startAngles, targetAngles, duration=None):
+        """
+        Build the waypoints for a move, one per control tick.
+
+        Args:
+            startAngles (list of float): Pose the move starts from.
+            targetAngles (list of float): Pose the move ends at.
+            duration (float, optional): Move duration in seconds. If omitted the move follows the time-optimal
+                trapezoidal profile allowed by the robot's velocity and acceleration limits.
+
+        Returns:
+            numpy.ndarray: (ticks, 6) array of waypoints, excluding the start pose.
+        """
+        if duration is None:
+            _, path = trapezoidal_profile(
+                startAngles, targetAngles, self.robot.max_velocity, self.robot.max_acceleration, self.period
+            )
+            return path[1:] if len(path) > 1 else path
+        ticks = max(1, int(np.ceil(duration * self.control_rate)))
+        return np.linspace(np.asarray(startAngles, dtype=float), np.asarray(targetAngles, dtype=float), ticks + 1)[1:]
+
+    def start(self, targetAngles, duration, startAngles=None, manual=False, path=None):
+        """
+        Start a move on the running event loop.
+
+        Starting an automated move cancels the previous automated move; a manual
+        move only replaces a previous manual move.
+
+        Args:
+            targetAngles (list of float): Pose to move to.
+            duration (float or None): Move duration in seconds, None for a time-optimal move.
+            startAngles (list of float, optional): Pose to start from, defaults to the current pose.
+            manual (bool): Manual intervention, ignores pause/emergency/safety holds.
+            path (numpy.ndarray, optional): Waypoints from `plan` for the start pose, e.g. already collision-checked.
+                They are used as long as the robot is still at that pose when the move begins, and planned again
+                otherwise.
+
+        Returns:
+            Move: The scheduled move.
+        """
+        if startAngles is not None:
+            self.robot.currentAngles = list(startAngles)
+        move = Move(next(self._ids), targetAngles, duration, manual=manual)
+        if path is not None:
+            move.planned = (list(self.robot.currentAngles), np.asarray(path, dtype=np.float64))
+        return self._launch(move)
+
+    def run_program(self, program, cycles=None):
+        """
+        Replay a compiled MotionProgram as an automated move.
+
+        The robot first moves time-optimally to the program's first waypoint,
+        then plays the precompiled cycle back to back without any planning.
+
+        Args:
+            program (MotionProgram): Compiled program, sampled at this executor's control period.
+            cycles (int, optional): Number of cycles to run, None to repeat until stopped.
+
+        Returns:
+            Move: The scheduled move.
+        """
+        if abs(program.period - self.period) > 1e-9:
+            raise ValueError("Program was compiled for a different control period")
+        move = Move(next(self._ids), program.path[0].tolist(), None, program=program, cycles=cycles)
+        return self._launch(move)
+
+    def follow(self, path):
+        """
+        Play a precomputed path as an automated move, one row per control tick.
+
+        The robot first moves time-optimally to the first row. Holds and stop
+        apply as for a program; after a manual intervention the robot returns
+        to the pose where it was held before carrying on.
+
+        Args:
+            path (numpy.ndarray): (ticks, 6) joint angles sampled at this executor's control period.
+
+        Returns:
+            Move: The scheduled move.
+
+        Raises:
+            ValueError: If the path leaves the joint limits.
+        """
+        path = np.asarray(path, dtype=np.float64)
+        if self.robot.first_limit_violation(path) is not None:
+            raise ValueError("Path leaves the joint limits")
+        move = Move(next(self._ids), path[0].tolist(), None, path=path)
+        return self._launch(move)
+
+    def _launch(self, move):
+        previous = self.manual if move.manual else self.current
+        if previous is not None and not previous.done:
+            previous.task.cancel()
+        if move.manual:
+            self.manual = move
+        else:
+            self.current = move
+        self.moves[move.id] = move
+        while len(self.moves) > self.HISTORY_SIZE:
+            self.moves.pop(next(iter(self.moves)))
+        move.task = asyncio.get_running_loop().create_task(self._run(move))
+        return move
+
+    def get(self, move_id):
+        return self.moves.get(move_id)
+
+    def active(self):
+        """Return the latest automated and manual moves as dicts."""
+        return [move.to_dict() for move in (self.current, self.manual) if move is not None]
+
+    def running(self):
+        """Return the number of automated and manual moves that have not finished."""
+        return sum(1 for move in (self.current, self.manual) if move is not None and not move.done)
+
+    def _set_status(self, move, status, message=None):
+        if message is not None:
+            move.message = message
+        if move.status != status:
+            move.status = status
+            self.robot.notify(("moves",))
+
+    def cancel(self):
+        """Cancel every move that is still running."""
+        for move in (self.current, self.manual):
+            if move is not None and not move.done:
+                move.task.cancel()
+
+    def close(self):
+        """Cancel the moves and stop listening to the robot."""
+        self.cancel()
+        self.robot.unsubscribe(self._on_state)
+
+    def _on_state(self, robot, fields):
+        # Called from whichever thread wrote the state; runs on every tick, so bail out early
+        if self.INTERRUPT_FIELDS.isdisjoint(fields):
+            return
+        automated = self.current is not None and not self.current.done
+        manual = self.manual is not None and not self.manual.done
+        if ((robot.isStopped and (automated or manual)) or (automated and self._held())) and self._halt_requested is None:
+            self._halt_requested = time.perf_counter()
+        loop = self._loop
+        if not self._waiters or loop is None:
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                self._interrupt()
+                return
+        except RuntimeError:
+            pass  # Written from a thread without an event loop
+        try:
+            loop.call_soon_threadsafe(self._interrupt)
+        except RuntimeError:
+            pass  # The executor's event loop is already closed
+
+    def _interrupt(self):
+        for waiter in tuple(self._waiters):
+            if not waiter.done():
+                waiter.set_result(True)
+
+    async def _wait(self, delay):
+        """
+        Sleep for `delay` seconds, or less if a stop, hold or release is written meanwhile.
+
+        A bare future and a timer handle instead of ``asyncio.wait_for`` on an event, which would
+        create a task on every control tick.
+
+        Returns:
+            bool: True if interrupted.
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        waiter = loop.create_future()
+        handle = loop.call_later(delay, _expire, waiter)
+        self._waiters.add(waiter)
+        try:
+            return await waiter
+        finally:
+            handle.cancel()
+            self._waiters.discard(waiter)
+
+    def _halted(self):
+        # Record how long the halting write took to take effect
+        requested, self._halt_requested = self._halt_requested, None
+        if requested is not None and self.stop_latency is not None:
+            self.stop_latency.observe(time.perf_counter() - requested)
+
+    def _held(self):
+        robot = self.robot
+        return robot.isEmergencyMode or robot.isPaused or robot.isSafetyMode
+
+    def _checked(self, plan, start):
+        path = plan(start)
+        return path, self.collision_checker.first_collision(np.vstack([start, path]))
+
+    async def _plan_from_here(self, plan):
+        """
+        Plan a path from the current pose with ``plan(start)`` and check it for collisions.
+
+        Planning and checking grow with the length of the path, so with a collision checker both run off the event
+        loop, and the path is planned again if the arm was moved meanwhile.
+
+        Raises:
+            MoveCollision: If the path collides.
+            RuntimeError: If the arm kept moving through every attempt.
+        """
+        if self.collision_checker is None:
+            return plan(list(self.robot.currentAngles))
+        for _ in range(self.CHECK_ATTEMPTS):
+            start = list(self.robot.currentAngles)
+            path, collision = await asyncio.to_thread(self._checked, plan, start)
+            # The checked path must start where the arm is
+            if self.robot.currentAngles == start:
+                break
+        else:
+            raise RuntimeError("Robot kept moving while the move was planned")
+        if collision is not None:
+            raise MoveCollision(collision)
+        return path
+
+    def _replan_path(self, move, current):
+        if current[1] > self.SAFE_SHOULDER_ANGLE:
+            safer = list(current)
+            safer[1] = self.SAFER_SHOULDER_ANGLE
+            return np.concatenate([
+                self.plan(current, safer, move.duration),
+                self.plan(safer, move.targetAngles, move.duration),
+            ])
+        return self.plan(current, move.targetAngles, move.duration)
+
+    async def _replan(self, move):
+        return await self._plan_from_here(lambda current: self._replan_path(move, current))
+
+    async def _run(self, move):
+        robot = self.robot
+        try:
+            if move.path is not None:
+                path = await self._plan_from_here(lambda start: self.plan(start, move.targetAngles))
+                await self._follow(move, path, replan=lambda: self._replan(move))
+                await self._follow(move, move.path)
+            elif move.program is None:
+                if move.planned is not None and move.planned[0] == robot.currentAngles:
+                    path = move.planned[1]
+                else:
+                    path = await self._plan_from_here(
+                        lambda start: self.plan(start, move.targetAngles, move.duration)
+                    )
+                await self._follow(move, path, replan=lambda: self._replan(move))
+            else:
+                path = await self._plan_from_here(lambda start: self.plan(start, move.targetAngles))
+                await self._follow(move, path, replan=lambda: self._replan(move))
+                while move.cycles is None or move.cycle < move.cycles:
+                    await self._follow(move, move.program.path, events=move.program.events)
+                    move.cycle += 1
+            self._set_status(move, "completed")
+        except MoveStopped:
+            self._set_status(move, "stopped", "Robot stopped")
+        except asyncio.CancelledError:
+            self._set_status(move, "cancelled")
+            raise
+        except Exception as e:
+            self._set_status(move, "failed", str(e))
+        finally:
+            if not any(m is not None and m is not move and not m.done for m in (self.current, self.manual)):
+                robot.isMoving = False
+                self._halt_requested = None  # Nothing left to halt
+
+    async def _follow(self, move, path, events=(), replan=None):
+        """
+        Step the robot through `path`, one waypoint per control tick.
+
+        Args:
+            move (Move): Move being executed, updated with progress and events.
+            path (numpy.ndarray): (n, 6) waypoints.
+            events (list of dict): Program events, fired when their ``step`` is reached.
+            replan (callable, optional): Coroutine function returning a new path from the current pose after a
+                manual intervention. Without it the robot first returns to the pose where it was held.
+
+        Raises:
+            MoveStopped: If the robot's stop flag is set.
+            MoveCollision: If the new path after a manual intervention collides.
+        """
+        robot = self.robot
+        loop = asyncio.get_running_loop()
+        events = {event["step"]: event for event in events}
+        move.step = 0
+        move.totalSteps = len(path)
+        last = list(robot.currentAngles)
+        next_tick = loop.time()
+        while move.step < len(path):
+            if robot.isStopped:
+                self._halted()
+                raise MoveStopped()
+            if not move.manual and self._held():
+                self._halted()
+                self._set_status(move, "waiting")
+                if robot.isMoving and (self.manual is None or self.manual.done):
+                    robot.isMoving = False
+                await self._wait(self.period)
+                next_tick = loop.time()
+                continue
+            if not move.manual and not np.allclose(robot.currentAngles, last, atol=self.REPLAN_TOLERANCE):
+                # Robot was moved by someone else while this move was held
+                if replan is not None:
+                    path = await replan()
+                    move.step = 0
+                    move.totalSteps = len(path)
+                    # The new path starts here; a stop or hold written while it was planned still applies
+                    last = list(robot.currentAngles)
+                    next_tick = loop.time()
+                    continue
+                step = move.step
+                held = last
+                await self._follow(move, await self._plan_from_here(lambda start: self.plan(start, held)))
+                move.step = step
+                move.totalSteps = len(path)
+                next_tick = loop.time()
+            self._set_status(move, "running")
+            if not robot.isMoving:
+                robot.isMoving = True
+            last = path[move.step].tolist()
+            robot.currentAngles = last
+            event = events.get(move.step)
+            if event is not None:
+                move.lastEvent = {"event": event["event"], "waypoint": event["waypoint"], "cycle": move.cycle}
+                robot.notify(("moves",))
+            move.step += 1
+            next_tick += self.period
+            while await self._wait(max(0.0, next_tick - loop.time())):
+                if robot.isStopped or (not move.manual and self._held()):
+                    break  # Halt now instead of at the next tick
+                if loop.time() >= next_tick:
+                    break
+            else:
+                if self.tick_jitter is not None:
+                    self.tick_jitter.observe(max(0.0, loop.time() - next_tick))
@@ -0,0 +1,288 @@
+# backend/simulation.py
+"""
+Headless pick-and-place simulation in virtual time.
+
+Replays the frontend automation loop (AutomationManager, BinManager and the
+pick/drop handling) against RobotArm and the backend motion planning, without
+a browser or a running server. Every move takes exactly as many control ticks
+as the MotionExecutor would spend on it, but the clock is advanced by
+arithmetic instead of sleeping, so hours of cell time run in milliseconds.
+
+Usage (from backend/):
+    python simulation.py --strategy bidirectional --cycles 100
+    python simulation.py --compare --no-blend
+"""
+import argparse
+import json
+import time
+from robot import RobotArm
+from programs import MotionProgram
+from trajectory import trapezoidal_profile
+
+STRATEGIES = ("left-to-right", "right-to-left", "bidirectional")
+BINS = ("left", "right")
+
+# Same poses as AutomationManager.getPresetPositions in frontend/js/automation.js
+PRESET_POSITIONS = {
+    "home": [0.0, 30.0, 55.0, 0.0, 0.0, 0.0],
+    "leftBinApproach": [-45.0, 50.0, 55.0, 0.0, 0.0, 0.0],
+    "leftBinPick": [-45.0, 75.0, 55.0, 0.0, 35.0, 10.0],
+    "leftBinDrop": [-45.0, 75.0, 55.0, 0.0, 35.0, 10.0],
+    "leftBinLift": [-45.0, 50.0, 55.0, 0.0, 0.0, 0.0],
+    "rightBinApproach": [45.0, 50.0, 55.0, 0.0, 0.0, 0.0],
+    "rightBinPick": [45.0, 75.0, 55.0, 0.0, 35.0, -10.0],
+    "rightBinDrop": [45.0, 75.0, 55.0, 0.0, 35.0, -10.0],
+    "rightBinLift": [45.0, 50.0, 55.0, 0.0, 0.0, 0.0],
+    "intermediate1": [0.0, 30.0, 55.0, 0.0, 0.0, 0.0],
+}
+
+OBJECTS_PER_BIN = 5  # BinManager.init fills the left bin with 5 objects
+CYCLE_DELAY = 2.0    # AutomationManager.cycleDelay, in seconds
+
+
+def program_waypoints(positions, sourceBin, targetBin, duration_scale=1.0):
+    """
+    Waypoints of one pick-and-place cycle, as built by AutomationManager.buildProgramWaypoints.
+
+    Args:
+        positions (dict): Named poses, see `PRESET_POSITIONS`.
+        sourceBin (str): Bin to pick from, "left" or "right".
+        targetBin (str): Bin to drop into, "left" or "right".
+        duration_scale (float): Factor applied to every segment duration and dwell.
+
+    Returns:
+        list of dict: MotionProgram waypoints, durations and dwells in seconds.
+    """
+    waypoints = [
+        {"angles": positions["intermediate1"], "duration": 0.7},
+        {"angles": positions[f"{sourceBin}BinApproach"], "duration": 0.7},
+        {"angles": positions[f"{sourceBin}BinPick"], "duration": 0.7, "event": "pick", "dwell": 0.5},
+        {"angles": positions[f"{sourceBin}BinLift"], "duration": 0.7},
+        {"angles": positions["intermediate1"], "duration": 0.7},
+        {"angles": positions[f"{targetBin}BinApproach"], "duration": 0.7},
+        {"angles": positions[f"{targetBin}BinDrop"], "duration": 0.6, "event": "drop", "dwell": 0.5},
+        {"angles": positions[f"{targetBin}BinLift"], "duration": 0.7},
+    ]
+    for waypoint in waypoints:
+        waypoint["duration"] *= duration_scale
+        if "dwell" in waypoint:
+            waypoint["dwell"] *= duration_scale
+    return waypoints
+
+
+class Bins:
+    """Object counts of the two bins, with the transfer rules of the frontend BinManager."""
+
+    def __init__(self, left=OBJECTS_PER_BIN, right=0):
+        self.counts = {"left": left, "right": right}
+
+    def transfer_pair(self, strategy):
+        """
+        Pick the source and target bin for the next cycle.
+
+        Args:
+            strategy (str): One of `STRATEGIES`.
+
+        Returns:
+            tuple: (sourceBin, targetBin), or (None, None) if there is nothing to move.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}")
+        if strategy in ("left-to-right", "bidirectional") and self.counts["left"] > 0:
+            return "left", "right"
+        if strategy in ("right-to-left", "bidirectional") and self.counts["right"] > 0:
+            return "right", "left"
+        return None, None
+
+    def pickup(self, binName):
+        if self.counts[binName] == 0:
+            raise RuntimeError(f"No objects available in {binName} bin")
+        self.counts[binName] -= 1
+
+    def drop(self, binName):
+        self.counts[binName] += 1
+
+
+class PickAndPlaceSimulation:
+    """
+    Virtual-time run of the automation loop for one strategy and set of poses.
+
+    Each cycle moves time-optimally to the program's first waypoint and plays
+    the compiled pick-and-place program once, exactly like
+    `POST /programs/{name}/run` with one cycle, then waits `cycle_delay`.
+    Pick and drop events update the bins at the tick they fire.
+    """
+
+    def __init__(self, strategy="left-to-right", positions=None, left=OBJECTS_PER_BIN, right=0,
+                 cycle_delay=CYCLE_DELAY, blend=True, duration_scale=1.0, velocity_scale=1.0,
+                 control_rate=50.0, robot=None, program_cache=None):
+        """
+        Args:
+            strategy (str): One of `STRATEGIES`.
+            positions (dict, optional): Poses overriding `PRESET_POSITIONS`.
+            left (int): Objects in the left bin at the start.
+            right (int): Objects in the right bin at the start.
+            cycle_delay (float): Pause between cycles in seconds.
+            blend (bool): Round the corners at pass-through waypoints, as the compiled programs do.
+            duration_scale (float): Factor applied to the program's segment durations and dwells.
+            velocity_scale (float): Factor applied to the robot's joint velocity and acceleration limits.
+            control_rate (float): Executor control rate in Hz.
+            robot (RobotArm, optional): Robot to reuse; it is put back in its home pose.
+            program_cache (dict, optional): Compiled programs shared between simulations, keyed on their inputs.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}")
+        self.strategy = strategy
+        self.positions = {**PRESET_POSITIONS, **(positions or {})}
+        self.bins = Bins(left, right)
+        self.cycle_delay = cycle_delay
+        self.blend = blend
+        self.duration_scale = duration_scale
+        self.robot = robot if robot is not None else RobotArm()
+        self.robot.currentAngles = self.robot.homeAngles
+        # Control period of the MotionExecutor being replayed; no executor is built, as it would subscribe to the robot
+        self.period = 1.0 / control_rate
+        self.max_velocity = self.robot.max_velocity * velocity_scale
+        self.max_acceleration = self.robot.max_acceleration * velocity_scale
+        self.programs = {}
+        self.program_cache = program_cache if program_cache is not None else {}
+        self.clock = 0.0
+        self.cycles = 0
+        self.cycle_times = []
+
+    def program(self, sourceBin, targetBin):
+        """Compile the program for a bin pair once, like AutomationManager.ensureProgram."""
+        name = f"{sourceBin}-to-{targetBin}"
+        if name not in self.programs:
+            waypoints = program_waypoints(self.positions, sourceBin, targetBin, self.duration_scale)
+            key = (
+                name, self.blend, self.period,
+                tuple((tuple(w["angles"]), w["duration"], w.get("dwell", 0.0)) for w in waypoints),
+            )
+            if key not in self.program_cache:
+                for waypoint in waypoints:
+                    if not self.robot.within_limits(waypoint["angles"]):
+                        raise ValueError(f"Waypoint of {name} out of joint limits: {waypoint['angles']}")
+                self.program_cache[key] = MotionProgram(name, waypoints, self.period, blend=self.blend)
+            self.programs[name] = self.program_cache[key]
+        return self.programs[name]
+
+    def _approach(self, targetAngles):
+        # Time-optimal move to the program start within the (scaled) limits, as MotionExecutor.plan
+        _, path = trapezoidal_profile(
+            self.robot.currentAngles, targetAngles, self.max_velocity, self.max_acceleration, self.period
+        )
+        return path[1:] if len(path) > 1 else path
+
+    def _follow(self, path, events=(), sourceBin=None, targetBin=None):
+        # One waypoint per control tick, as in MotionExecutor._follow
+        for event in events:
+            if event["event"] == "pick":
+                self.bins.pickup(sourceBin)
+            else:
+                self.bins.drop(targetBin)
+        self.clock += len(path) * self.period
+        self.robot.currentAngles = path[-1].tolist()
+
+    def cycle(self):
+        """
+        Run one pick-and-place cycle.
+
+        Returns:
+            bool: False if the strategy has nothing left to move, True otherwise.
+        """
+        sourceBin, targetBin = self.bins.transfer_pair(self.strategy)
+        if sourceBin is None:
+            return False
+        started = self.clock
+        program = self.program(sourceBin, targetBin)
+        self._follow(self._approach(program.path[0]))
+        self._follow(program.path, program.events, sourceBin, targetBin)
+        self.clock += self.cycle_delay
+        self.cycles += 1
+        self.cycle_times.append(self.clock - started)
+        return True
+
+    def run(self, max_cycles=None, max_duration=None):
+        """
+        Run cycles until the bins run dry or a limit is reached.
+
+        Args:
+            max_cycles (int, optional): Stop after this many cycles.
+            max_duration (float, optional): Stop once this much virtual time has passed, in seconds.
+
+        Returns:
+            dict: The report, see `report`.
+        """
+        started = time.perf_counter()
+        while max_cycles is None or self.cycles < max_cycles:
+            if max_duration is not None and self.clock >= max_duration:
+                break
+            if not self.cycle():
+                break
+        return self.report(time.perf_counter() - started)
+
+    def report(self, wall_time=0.0):
+        """
+        Summarize the run.
+
+        Args:
+            wall_time (float): Real time spent simulating, in seconds.
+
+        Returns:
+            dict: Strategy, cycles, virtual time, mean cycle time, cycles per hour, bin counts and speedup over real time.
+        """
+        return {
+            "strategy": self.strategy,
+            "blend": self.blend,
+            "cycles": self.cycles,
+            "virtualTime": self.clock,
+            "meanCycleTime": self.clock / self.cycles if self.cycles else None,
+            "cyclesPerHour": 3600.0 * self.cycles / self.clock if self.clock else 0.0,
+            "bins": dict(self.bins.counts),
+            "wallTime": wall_time,
+            "speedup": self.clock / wall_time if wall_time else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless pick-and-place throughput simulation")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="left-to-right")
+    parser.add_argument("--compare", action="store_true", help="Run every strategy")
+    parser.add_argument("--cycles", type=int, default=100, help="Maximum number of cycles")
+    parser.add_argument("--hours", type=float, default=None, help="Maximum virtual time in hours")
+    parser.add_argument("--left", type=int, default=OBJECTS_PER_BIN, help="Objects in the left bin")
+    parser.add_argument("--right", type=int, default=0, help="Objects in the right bin")
+    parser.add_argument("--cycle-delay", type=float, default=CYCLE_DELAY * 1000, help="Pause between cycles in ms")
+    parser.add_argument("--no-blend", action="store_true", help="Stop at every waypoint")
+    parser.add_argument("--poses", help="JSON file with poses overriding the presets")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    positions = None
+    if args.poses:
+        with open(args.poses) as f:
+            positions = json.load(f)
+    reports = []
+    for strategy in (STRATEGIES if args.compare else (args.strategy,)):
+        simulation = PickAndPlaceSimulation(
+            strategy, positions, left=args.left, right=args.right,
+            cycle_delay=args.cycle_delay / 1000.0, blend=not args.no_blend
+        )
+        reports.append(simulation.run(
+            max_cycles=args.cycles, max_duration=args.hours * 3600.0 if args.hours is not None else None
+        ))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    print(f"{'strategy':>15} {'cycles':>7} {'cycle (s)':>10} {'cycles/h':>9} {'left':>5} {'right':>5} {'speedup':>9}")
+    for report in reports:
+        cycle_time = f"{report['meanCycleTime']:.2f}" if report["cycles"] else "-"
+        speedup = f"{report['speedup']:.0f}x" if report["speedup"] else "-"
+        print(f"{report['strategy']:>15} {report['cycles']:>7} {cycle_time:>10} {report['cyclesPerHour']:>9.1f} "
+              f"{report['bins']['left']:>5} {report['bins']['right']:>5} {speedup:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/stream.py
+import asyncio
+import json
+
+
+class Subscription:
+    """A single stream client, woken whenever the broadcast state changes."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.pending = False
+
+    def wake(self):
+        # A burst of changes only schedules one wake-up until the client has sent the next snapshot
+        if self.pending:
+            return
+        self.pending = True
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # Client's event loop is already closed
+
+    async def wait(self):
+        await self.event.wait()
+        self.event.clear()
+        self.pending = False
+
+
+class StateBroadcaster:
+    """
+    Push channel for RobotArm state.
+
+    The broadcaster listens to robot change notifications and wakes every
+    subscriber. Each subscriber sends at most one snapshot per `min_interval`,
+    so a burst of flag and angle writes collapses into a single message with
+    the latest state. Snapshots are encoded once per change and shared by all
+    subscribers.
+    """
+
+    def __init__(self, robot, snapshot, min_interval=0.02):
+        self.robot = robot
+        self.snapshot = snapshot
+        self.min_interval = min_interval
+        self.subscribers = set()
+        self._version = 0
+        self._encoded = None
+        self._encoded_version = -1
+        robot.subscribe(self._on_change)
+
+    def _on_change(self, robot, fields):
+        self._version += 1
+        for subscription in tuple(self.subscribers):
+            subscription.wake()
+
+    def encoded(self):
+        """Return the latest state as a JSON string, encoding it at most once per change."""
+        version = self._version
+        if self._encoded_version != version:
+            self._encoded = json.dumps(self.snapshot())
+            self._encoded_version = version
+        return self._encoded
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop())
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def close(self):
+        """Stop listening to the robot."""
+        self.robot.unsubscribe(self._on_change)
+
+    async def stream(self, subscription, send):
+        """
+        Send the current state, then every coalesced change, until cancelled.
+
+        Args:
+            subscription (Subscription): Subscription returned by `subscribe`.
+            send (callable): Coroutine function taking the encoded JSON text.
+        """
+        await send(self.encoded())
+        while True:
+            await subscription.wait()
+            await send(self.encoded())
+            await asyncio.sleep(self.min_interval)
@@ -0,0 +1,221 @@
+# backend/telemetry.py
+import os
+import threading
+import time
+import warnings
+import numpy as np
+import orjson
+
+# One sample per state change: wall-clock time, state version, joint angles and the state flags as a bitmask
+SAMPLE_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("version", "<u8"),
+    ("angles", "<f8", (6,)),
+    ("flags", "u1"),
+], align=True)
+FLAG_BITS = {"isMoving": 1, "isPaused": 2, "isStopped": 4, "isEmergencyMode": 8, "isSafetyMode": 16}
+# Columns of the matrix form of a recording, see `as_matrix`
+MATRIX_COLUMNS = ("time", "a1", "a2", "a3", "a4", "a5", "a6", "flags", "version")
+# Samples kept per robot by default: at least 80 s of a move at 50 Hz, 288 KiB once full
+DEFAULT_CAPACITY = 4096
+# Slots an in-memory buffer starts with; it doubles up to its capacity as samples come in
+INITIAL_SLOTS = 256
+
+
+def decode_flags(flags):
+    """Turn a flags bitmask back into the state flags dict."""
+    return {name: bool(flags & bit) for name, bit in FLAG_BITS.items()}
+
+
+class TelemetryRecorder:
+    """
+    Fixed-size ring buffer of robot state samples.
+
+    The recorder listens to robot change notifications and appends one sample
+    per state version. Recording is a handful of in-place field writes; an
+    in-memory buffer starts small and doubles until it reaches its capacity,
+    so idle robots of a large fleet hold a few KiB each. Once full, the oldest
+    samples are overwritten. With a `path`, the buffer is a memory-mapped file,
+    which keeps the recording across restarts and lets other processes read it;
+    the OS only backs the pages that were written.
+    """
+
+    def __init__(self, robot, capacity=DEFAULT_CAPACITY, path=None, clock=time.time):
+        """
+        Args:
+            robot (RobotArm): Robot to record.
+            capacity (int): Number of samples kept.
+            path (str, optional): File backing the buffer, its directory created if missing. An existing recording
+                of the same capacity is resumed; one of another capacity is moved aside to ``<path>.bak``.
+            clock (callable): Returns the sample timestamp in seconds.
+        """
+        if capacity < 1:
+            raise ValueError("Telemetry capacity must be positive")
+        self.robot = robot
+        self.capacity = capacity
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._last_version = None
+        if path is None:
+            self.buffer = np.zeros(min(capacity, INITIAL_SLOTS), dtype=SAMPLE_DTYPE)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            resume = False
+            if os.path.exists(path):
+                size = os.path.getsize(path)
+                resume = size == capacity * SAMPLE_DTYPE.itemsize
+                if not resume:
+                    # Recorded with another TELEMETRY_CAPACITY: keep it for inspection rather than overwrite it
+                    os.replace(path, path + ".bak")
+                    warnings.warn(
+                        f"Telemetry file {path} holds {size} bytes, not {capacity} samples; moved it to {path}.bak",
+                        RuntimeWarning, stacklevel=2
+                    )
+            self.buffer = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r+" if resume else "w+", shape=(capacity,))
+        # Written slots have a non-zero timestamp; the newest one is just before the write head
+        self.count = int(np.count_nonzero(self.buffer["time"] > 0))
+        self.head = (int(self.buffer["time"].argmax()) + 1) % capacity if self.count else 0
+        self.recording = True
+        self.record()
+        robot.subscribe(self._on_change)
+
+    def _on_change(self, robot, fields):
+        if self.recording:
+            self.record()
+
+    def record(self):
+        """Append the robot's current state, unless that state version is already recorded."""
+        state = self.robot.snapshot()
+        version = state["version"]
+        flags = 0
+        for name, bit in FLAG_BITS.items():
+            if state[name]:
+                flags |= bit
+        with self._lock:
+            if version == self._last_version:
+                return
+            self._last_version = version
+            if self.head == len(self.buffer):
+                # Only before the first wrap-around: the ring is still filling up and is full up to the head
+                grown = np.zeros(min(2 * len(self.buffer), self.capacity), dtype=SAMPLE_DTYPE)
+                grown[:self.head] = self.buffer
+                self.buffer = grown
+            sample = self.buffer[self.head]
+            sample["time"] = self.clock()
+            sample["version"] = version
+            sample["angles"] = state["currentAngles"]
+            sample["flags"] = flags
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def flush(self):
+        """Write a file-backed buffer out to disk."""
+        if isinstance(self.buffer, np.memmap):
+            self.buffer.flush()
+
+    def close(self):
+        """Stop recording and flush a file-backed buffer."""
+        self.robot.unsubscribe(self._on_change)
+        self.flush()
+
+    def samples(self, start=None, end=None):
+        """
+        Copy the recorded samples in a time range, oldest first.
+
+        Args:
+            start (float, optional): Earliest timestamp, inclusive.
+            end (float, optional): Latest timestamp, inclusive.
+
+        Returns:
+            numpy.ndarray: Structured array of `SAMPLE_DTYPE` samples.
+        """
+        with self._lock:
+            if self.count < self.capacity:
+                ordered = self.buffer[:self.count].copy()
+            else:
+                ordered = np.concatenate((self.buffer[self.head:], self.buffer[:self.head]))
+        times = ordered["time"]
+        first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        last = len(ordered) if end is None else int(np.searchsorted(times, end, side="right"))
+        return ordered[first:last]
+
+    def info(self):
+        """
+        Returns:
+            dict: Capacity, sample count, oldest and newest timestamps, backing file and recording flag.
+        """
+        samples = self.samples()
+        return {
+            "capacity": self.capacity,
+            "count": len(samples),
+            "oldest": float(samples["time"][0]) if len(samples) else None,
+            "newest": float(samples["time"][-1]) if len(samples) else None,
+            "path": self.path,
+            "recording": self.recording,
+        }
+
+
+def as_matrix(samples):
+    """
+    Flatten samples into an (n, 9) float64 matrix with the columns of `MATRIX_COLUMNS`.
+
+    Args:
+        samples (numpy.ndarray): Samples from `TelemetryRecorder.samples`.
+
+    Returns:
+        numpy.ndarray: One row per sample.
+    """
+    matrix = np.empty((len(samples), len(MATRIX_COLUMNS)))
+    matrix[:, 0] = samples["time"]
+    matrix[:, 1:7] = samples["angles"]
+    matrix[:, 7] = samples["flags"]
+    matrix[:, 8] = samples["version"]
+    return matrix
+
+
+def iter_ndjson(samples, chunk_size=1024):
+    """
+    Encode samples as newline-delimited JSON, one chunk of lines at a time.
+
+    Args:
+        samples (numpy.ndarray): Samples from `TelemetryRecorder.samples`.
+        chunk_size (int): Samples per yielded chunk.
+
+    Yields:
+        bytes: Lines of ``{"time", "version", "currentAngles", <flags>}`` objects.
+    """
+    for offset in range(0, len(samples), chunk_size):
+        block = samples[offset:offset + chunk_size]
+        yield b"".join(
+            orjson.dumps({"time": t, "version": v, "currentAngles": a, **decode_flags(f)}) + b"\n"
+            for t, v, a, f in zip(
+                block["time"].tolist(), block["version"].tolist(), block["angles"].tolist(), block["flags"].tolist()
+            )
+        )
+
+
+def replay_path(samples, period, speed=1.0):
+    """
+    Resample a recording onto a fixed control period, for replay through the MotionExecutor.
+
+    Args:
+        samples (numpy.ndarray): Recorded samples, oldest first.
+        period (float): Control period in seconds.
+        speed (float): Playback speed, 2.0 replays twice as fast.
+
+    Returns:
+        numpy.ndarray: (ticks, 6) joint angles, one row per control tick, ending on the last recorded pose.
+
+    Raises:
+        ValueError: If there are no samples or the speed is not positive.
+    """
+    if len(samples) == 0:
+        raise ValueError("No telemetry samples in range")
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive")
+    times = samples["time"] - samples["time"][0]
+    ticks = np.append(np.arange(0.0, times[-1], period * speed), times[-1])
+    # The recorded pose holds until the next sample, as it did on the robot
+    index = np.searchsorted(times, ticks, side="right") - 1
+    return np.ascontiguousarray(samples["angles"][index])
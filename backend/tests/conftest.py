@@ -1,7 +1,24 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from api import app
 
+# Opt-in for the wall-clock and memory budgets of tests/test_startup.py, which depend on the host
+STARTUP_BUDGET_ENV = "YANIBOT_STARTUP_BUDGET"
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", f"startup_budget: import time and memory budgets of a fresh worker, run with {STARTUP_BUDGET_ENV}=1"
+    )
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get(STARTUP_BUDGET_ENV, "").lower() in ("1", "true", "yes", "on"):
+        return
+    skip = pytest.mark.skip(reason=f"Startup budgets are opt-in: set {STARTUP_BUDGET_ENV}=1")
+    for item in items:
+        if "startup_budget" in item.keywords:
+            item.add_marker(skip)
+
 @pytest.fixture
 def client():
     """Create a test client for the FastAPI app"""
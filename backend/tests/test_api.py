@@ -1,9 +1,23 @@
+import asyncio
+import numpy as np
+import orjson
 import pytest
+import time
 from fastapi.testclient import TestClient
-from api import app
+from api import app, interpolate_path
+from encoding import MATRIX_MEDIA_TYPE, decode_matrix
 
 client = TestClient(app)
 
+def wait_for_move(test_client, move_id, timeout=2.0, prefix=""):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = test_client.get(f"{prefix}/move/{move_id}").json()
+        if data["status"] in ("completed", "stopped", "cancelled", "failed"):
+            return data
+        time.sleep(0.01)
+    raise AssertionError(f"Move {move_id} did not finish")
+
 class TestAPI:
     """Test suite for FastAPI endpoints"""
 
@@ -42,6 +56,23 @@ class TestAPI:
         assert data["success"] is True
         assert data["currentAngles"] == angles
 
+    def test_set_angles_expected_version(self):
+        version = client.get("/state").json()["version"]
+        response = client.post("/angles", json={"joint_angles": [5, 5, 5, 0, 0, 0], "expectedVersion": version})
+        assert response.status_code == 200
+        assert response.json()["version"] == version + 1
+        # A stale writer is rejected instead of overwriting the newer state
+        response = client.post("/angles", json={"joint_angles": [9, 9, 9, 0, 0, 0], "expectedVersion": version})
+        assert response.status_code == 409
+        assert client.get("/state").json()["currentAngles"] == [5, 5, 5, 0, 0, 0]
+
+    def test_move_expected_version(self):
+        version = client.get("/state").json()["version"]
+        client.post("/pause", json={"is_paused": False})
+        client.post("/angles", json={"joint_angles": [1, 1, 1, 0, 0, 0]})
+        response = client.post("/move", json={"targetAngles": [0, 0, 0, 0, 0, 0], "expectedVersion": version})
+        assert response.status_code == 409
+
     def test_set_angles_invalid_lengthL(self):
         angles = [30, 50, 0, 0, 0, 0, 0]  # Invalid length
         response = client.post("/angles", json={"joint_angles": angles})
@@ -117,6 +148,23 @@ class TestAPI:
         assert data["steps"][0] == start
         assert data["steps"][-1] == target
 
+    def test_interpolate_path_is_contiguous_array(self):
+        path = interpolate_path([0, 0, 0, 0, 0, 0], [10, 20, 30, 40, 50, 60], steps=300)
+        assert path.shape == (300, 6)
+        assert path.flags["C_CONTIGUOUS"]
+        assert path[0].tolist() == [0, 0, 0, 0, 0, 0]
+        assert path[-1].tolist() == [10, 20, 30, 40, 50, 60]
+
+    def test_interpolate_long_move(self):
+        start = [0, 0, 0, 0, 0, 0]
+        target = [-170, 70, -150, 280, 110, -290]
+        response = client.post("/interpolate", json={"startAngles": start, "targetAngles": target})
+        assert response.status_code == 200
+        steps = response.json()["steps"]
+        assert len(steps) == 290
+        assert all(len(step) == 6 for step in steps)
+        assert steps[-1] == target
+
     def test_set_moving_state(self):
         response = client.post("/moving", json={"is_moving": True})
         data = response.json()
@@ -216,4 +264,614 @@ class TestAPIIntegration:
         assert reset_response.status_code == 200
         state_response = client.get("/state")
         state_data = state_response.json()
-        assert state_data["currentAngles"] == [30,40,50,60,70,80]  # Assuming reset sets to home position
\ No newline at end of file
+        assert state_data["currentAngles"] == [30,40,50,60,70,80]  # Assuming reset sets to home position
+
+class TestMotionAPI:
+    """Tests for the server-side move endpoints"""
+
+    def test_move_to_target(self):
+        target = [5, 25, 45, 0, 10, 0]
+        with TestClient(app) as test_client:
+            test_client.post("/angles", json={"joint_angles": [0, 30, 55, 0, 0, 0]})
+            response = test_client.post("/move", json={"targetAngles": target, "duration": 100})
+            assert response.status_code == 200
+            data = response.json()
+            assert data["success"] is True
+            result = wait_for_move(test_client, data["move"]["id"])
+            assert result["status"] == "completed"
+            assert result["currentAngles"] == target
+            assert result["isMoving"] is False
+
+    def test_move_out_of_limits(self):
+        response = client.post("/move", json={"targetAngles": [999, 0, 0, 0, 0, 0], "duration": 100})
+        assert response.status_code == 200
+        assert response.json()["success"] is False
+
+    def test_move_invalid_duration(self):
+        response = client.post("/move", json={"targetAngles": [0, 0, 0, 0, 0, 0], "duration": 0})
+        assert response.status_code == 422
+        # An hours-long move would take seconds to plan and collision-check
+        response = client.post("/move", json={"targetAngles": [0, 0, 0, 0, 0, 0], "duration": 1e7})
+        assert response.status_code == 422
+
+    def test_unknown_move(self):
+        response = client.get("/move/999999")
+        assert response.status_code == 404
+
+
+class TestStateStream:
+    """Tests for the /ws/state push channel"""
+
+    def test_stream_sends_snapshot_on_connect(self):
+        with client.websocket_connect("/ws/state") as websocket:
+            data = websocket.receive_json()
+            assert data["currentAngles"] is not None
+            assert data["isPaused"] is not None
+            assert isinstance(data["moves"], list)
+
+    def test_stream_per_robot(self):
+        client.post("/robots", json={"id": "cell-w"})
+        client.post("/robots/cell-w/angles", json={"joint_angles": [4, 30, 55, 0, 0, 0]})
+        with client.websocket_connect("/robots/cell-w/ws/state") as websocket:
+            assert websocket.receive_json()["currentAngles"] == [4, 30, 55, 0, 0, 0]
+        client.delete("/robots/cell-w")
+
+    def test_stream_pushes_changes(self):
+        client.post("/pause", json={"is_paused": False})
+        with client.websocket_connect("/ws/state") as websocket:
+            websocket.receive_json()
+            client.post("/pause", json={"is_paused": True})
+            data = websocket.receive_json()
+            assert data["isPaused"] is True
+        client.post("/pause", json={"is_paused": False})
+
+    def test_stream_coalesces_bursts(self):
+        with client.websocket_connect("/ws/state") as websocket:
+            websocket.receive_json()
+            for i in range(20):
+                client.post("/angles", json={"joint_angles": [i, 0, 0, 0, 0, 0]})
+            time.sleep(0.1)
+            messages = [websocket.receive_json()]
+            while messages[-1]["currentAngles"] != [19, 0, 0, 0, 0, 0]:
+                messages.append(websocket.receive_json())
+            assert len(messages) < 20
+
+    def test_many_subscribers(self):
+        with client.websocket_connect("/ws/state") as first, client.websocket_connect("/ws/state") as second:
+            first.receive_json()
+            second.receive_json()
+            client.post("/stop", json={"is_stopped": True})
+            assert first.receive_json()["isStopped"] is True
+            assert second.receive_json()["isStopped"] is True
+        client.post("/stop", json={"is_stopped": False})
+
+
+class TestTrajectoryLimitsAPI:
+    """Tests for the /limits/batch endpoint"""
+
+    def test_batch_limits_valid(self):
+        trajectory = [[i, 30, 55, 0, 0, 0] for i in range(100)]
+        response = client.post("/limits/batch", json={"trajectory": trajectory})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["steps"] == 100
+        assert data["firstViolation"] is None
+
+    def test_batch_limits_reports_first_violation(self):
+        trajectory = [[0, 30, 55, 0, 0, 0] for _ in range(10)]
+        trajectory[6][2] = 75
+        trajectory[8][0] = 999
+        data = client.post("/limits/batch", json={"trajectory": trajectory}).json()
+        assert data["success"] is False
+        assert data["firstViolation"] == 6
+        assert data["joint"] == 2
+        assert data["joint_angles"] == trajectory[6]
+
+    def test_batch_limits_invalid_pose_length(self):
+        response = client.post("/limits/batch", json={"trajectory": [[0, 0, 0, 0, 0]]})
+        assert response.status_code == 422
+
+    def test_batch_limits_empty(self):
+        response = client.post("/limits/batch", json={"trajectory": []})
+        assert response.status_code == 422
+
+
+class TestTrajectoryAPI:
+    """Tests for the /trajectory endpoint and time-optimal moves"""
+
+    def test_trajectory(self):
+        start = [0, 30, 55, 0, 0, 0]
+        target = [45, 50, 55, 0, 0, 0]
+        response = client.post("/trajectory", json={"startAngles": start, "targetAngles": target, "period": 0.05})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert len(data["times"]) == len(data["steps"])
+        assert data["times"][-1] == data["duration"]
+        assert data["steps"][0] == start
+        assert data["steps"][-1] == target
+
+    def test_trajectory_binary(self):
+        payload = {"startAngles": [0, 30, 55, 0, 0, 0], "targetAngles": [45, 50, 55, 0, 0, 0], "period": 0.05}
+        data = client.post("/trajectory", json=payload).json()
+        response = client.post("/trajectory", json=payload, headers={"Accept": MATRIX_MEDIA_TYPE})
+        assert response.headers["content-type"] == MATRIX_MEDIA_TYPE
+        assert float(response.headers["x-trajectory-duration"]) == data["duration"]
+        assert float(response.headers["x-trajectory-period"]) == 0.05
+        assert decode_matrix(response.content).tolist() == data["steps"]
+
+    def test_trajectory_invalid_period(self):
+        response = client.post("/trajectory", json={"startAngles": [0] * 6, "targetAngles": [1] * 6, "period": 0})
+        assert response.status_code == 422
+        # A tiny period would sample a long move into millions of rows
+        response = client.post("/trajectory", json={"startAngles": [0] * 6, "targetAngles": [1] * 6, "period": 1e-7})
+        assert response.status_code == 422
+
+    def test_time_optimal_move(self):
+        target = [2, 30, 55, 0, 0, 0]
+        with TestClient(app) as test_client:
+            test_client.post("/angles", json={"joint_angles": [0, 30, 55, 0, 0, 0]})
+            data = test_client.post("/move", json={"targetAngles": target}).json()
+            assert data["success"] is True
+            result = wait_for_move(test_client, data["move"]["id"])
+            assert result["status"] == "completed"
+            assert result["currentAngles"] == target
+
+
+class TestProgramAPI:
+    """Tests for the motion program endpoints"""
+
+    waypoints = [
+        {"angles": [0, 30, 55, 0, 0, 0], "duration": 40},
+        {"angles": [-45, 75, 55, 0, 35, 10], "duration": 40, "event": "pick", "dwell": 20},
+        {"angles": [45, 75, 55, 0, 35, -10], "duration": 40, "event": "drop"},
+    ]
+
+    def test_define_and_get_program(self):
+        response = client.put("/programs/test-cycle", json={"waypoints": self.waypoints})
+        assert response.status_code == 200
+        program = response.json()["program"]
+        assert program["name"] == "test-cycle"
+        assert program["waypoints"] == 3
+        assert [event["event"] for event in program["events"]] == ["pick", "drop"]
+        data = client.get("/programs/test-cycle", params={"trajectory": True}).json()
+        assert len(data["steps"]) == program["steps"]
+        assert data["steps"][0] == [0, 30, 55, 0, 0, 0]
+        assert "test-cycle" in [p["name"] for p in client.get("/programs").json()["programs"]]
+
+    def test_run_program_cycles(self):
+        client.put("/programs/test-cycle", json={"waypoints": self.waypoints})
+        with TestClient(app) as test_client:
+            test_client.post("/stop", json={"is_stopped": False})
+            data = test_client.post("/programs/test-cycle/run", json={"cycles": 2}).json()
+            assert data["success"] is True
+            result = wait_for_move(test_client, data["move"]["id"])
+            assert result["status"] == "completed"
+            assert result["cycle"] == 2
+            assert result["lastEvent"] == {"event": "drop", "waypoint": 2, "cycle": 1}
+            assert result["currentAngles"] == [0, 30, 55, 0, 0, 0]
+
+    def test_program_out_of_limits(self):
+        waypoints = [dict(self.waypoints[0]), {"angles": [0, 0, 999, 0, 0, 0], "duration": 100}]
+        response = client.put("/programs/bad", json={"waypoints": waypoints})
+        assert response.status_code == 400
+
+    def test_unknown_program(self):
+        assert client.get("/programs/missing").status_code == 404
+        assert client.post("/programs/missing/run", json={}).status_code == 404
+
+    def test_delete_program(self):
+        client.put("/programs/temporary", json={"waypoints": self.waypoints})
+        assert client.delete("/programs/temporary").status_code == 200
+        assert client.get("/programs/temporary").status_code == 404
+
+
+class TestInterpolateCache:
+    """Tests for the /interpolate response cache"""
+
+    def test_repeated_path_is_a_cache_hit(self):
+        payload = {"startAngles": [1, 2, 3, 4, 5, 6], "targetAngles": [-45, 50, 55, 0, 0, 0]}
+        before = client.get("/interpolate/cache").json()
+        first = client.post("/interpolate", json=payload)
+        second = client.post("/interpolate", json=payload)
+        after = client.get("/interpolate/cache").json()
+        assert first.content == second.content
+        assert second.headers["content-type"] == "application/json"
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_binary_format_negotiated_and_cached_separately(self):
+        payload = {"startAngles": [0, 0, 0, 0, 0, 0], "targetAngles": [90, 40, -60, 120, 45, 200]}
+        as_json = client.post("/interpolate", json=payload).json()
+        binary = client.post("/interpolate", json=payload, headers={"Accept": MATRIX_MEDIA_TYPE})
+        single = client.post("/interpolate", json=payload, headers={"Accept": f"{MATRIX_MEDIA_TYPE}; dtype=float32"})
+        assert binary.headers["content-type"] == MATRIX_MEDIA_TYPE
+        assert binary.headers["vary"] == "Accept"
+        assert decode_matrix(binary.content).tolist() == as_json["steps"]
+        assert decode_matrix(single.content) == pytest.approx(np.array(as_json["steps"]), abs=1e-4)
+        assert len(single.content) < len(binary.content) < len(client.post("/interpolate", json=payload).content)
+
+
+class TestKinematicsAPI:
+    """Tests for the forward kinematics endpoints"""
+
+    def test_fk_trajectory(self):
+        trajectory = [[0, 0, 0, 0, 0, 0], [90, 90, 0, 0, 0, 0]]
+        response = client.post("/fk", json={"trajectory": trajectory})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert len(data["positions"]) == 2
+        assert data["positions"][0] == pytest.approx([0, 0, 3.25])
+        assert data["quaternions"][0] == pytest.approx([1, 0, 0, 0])
+
+    def test_fk_invalid_pose(self):
+        response = client.post("/fk", json={"trajectory": [[0, 0, 0]]})
+        assert response.status_code == 422
+
+    def test_tcp(self):
+        client.post("/angles", json={"joint_angles": [0, 0, 0, 0, 0, 0]})
+        data = client.get("/tcp").json()
+        assert data["position"] == pytest.approx([0, 0, 3.25])
+
+    def test_ik_round_trip(self):
+        pick = [-45.0, 75.0, 55.0, 0.0, 35.0, 10.0]
+        client.post("/angles", json={"joint_angles": pick})
+        poses = client.post("/fk", json={"trajectory": [pick, [-40.0, 70.0, 50.0, 0.0, 35.0, 10.0]]}).json()
+        response = client.post("/ik", json={"positions": poses["positions"], "quaternions": poses["quaternions"]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["converged"] == [True, True]
+        assert data["seedAngles"] == pick
+        assert data["angles"][0] == pytest.approx(pick, abs=0.1)
+
+    def test_ik_unreachable(self):
+        data = client.post("/ik", json={"positions": [[10.0, 0.0, 0.0]]}).json()
+        assert data["success"] is False
+        assert data["converged"] == [False]
+
+    def test_ik_mismatched_quaternions(self):
+        response = client.post("/ik", json={"positions": [[1.0, 0.0, 1.0]], "quaternions": []})
+        assert response.status_code == 400
+
+
+class TestFleetAPI:
+    """Tests for multi-robot routing"""
+
+    def test_create_and_route(self):
+        assert client.post("/robots", json={"id": "cell-a"}).status_code == 200
+        assert client.post("/robots", json={"id": "cell-a"}).status_code == 409
+        client.post("/robots/cell-a/angles", json={"joint_angles": [1, 2, 3, 4, 5, 6]})
+        assert client.get("/robots/cell-a/state").json()["currentAngles"] == [1, 2, 3, 4, 5, 6]
+        assert client.get("/state").json()["currentAngles"] != [1, 2, 3, 4, 5, 6]
+        robots = client.get("/robots").json()
+        assert {"default", "cell-a"} <= {robot["id"] for robot in robots["robots"]}
+        assert client.delete("/robots/cell-a").status_code == 200
+        assert client.get("/robots/cell-a/state").status_code == 404
+
+    def test_default_robot_aliases(self):
+        client.post("/angles", json={"joint_angles": [7, 7, 7, 0, 0, 0]})
+        assert client.get("/robots/default/state").json()["currentAngles"] == [7, 7, 7, 0, 0, 0]
+        assert client.delete("/robots/default").status_code == 400
+
+    def test_robot_id_only_in_path(self):
+        client.post("/robots", json={"id": "cell-q"})
+        # The root routes always act on the default robot; a query parameter does not pick another one
+        client.post("/angles?robot_id=cell-q", json={"joint_angles": [3, 30, 55, 0, 0, 0]})
+        assert client.get("/robots/cell-q/state").json()["currentAngles"] != [3, 30, 55, 0, 0, 0]
+        assert client.get("/state?robot_id=cell-q").json()["currentAngles"] == [3, 30, 55, 0, 0, 0]
+        paths = client.get("/openapi.json").json()["paths"]
+        assert [p["name"] for p in paths["/state"]["get"].get("parameters", [])] == []
+        assert [(p["name"], p["in"]) for p in paths["/robots/{robot_id}/state"]["get"]["parameters"]] == [
+            ("robot_id", "path")
+        ]
+        client.delete("/robots/cell-q")
+
+    def test_unknown_robot(self):
+        assert client.post("/robots/ghost/pause", json={"is_paused": True}).status_code == 404
+        assert client.delete("/robots/ghost").status_code == 404
+        assert client.post("/robots", json={"id": "bad id"}).status_code == 422
+
+    def test_flags_are_per_robot(self):
+        client.post("/robots", json={"id": "cell-b"})
+        client.post("/robots/cell-b/emergency", json={"is_emergency": True})
+        assert client.get("/robots/cell-b/state").json()["isEmergencyMode"] is True
+        assert client.get("/state").json()["isEmergencyMode"] is False
+        client.delete("/robots/cell-b")
+
+    def test_many_robots_move_concurrently(self):
+        target = [10.0, 35.0, 50.0, 0.0, 0.0, 0.0]
+        ids = [f"arm-{index}" for index in range(200)]
+        with TestClient(app) as test_client:
+            moves = {}
+            for robot_id in ids:
+                test_client.post("/robots", json={"id": robot_id})
+                data = test_client.post(f"/robots/{robot_id}/move", json={"targetAngles": target, "duration": 200}).json()
+                moves[robot_id] = data["move"]["id"]
+            for robot_id, move_id in moves.items():
+                result = wait_for_move(test_client, move_id, prefix=f"/robots/{robot_id}")
+                assert result["status"] == "completed"
+                assert result["currentAngles"] == target
+            for robot_id in ids:
+                test_client.delete(f"/robots/{robot_id}")
+
+class TestTelemetryAPI:
+    """Tests for telemetry recording, export and replay"""
+
+    def test_ndjson_and_binary_export(self):
+        client.post("/robots", json={"id": "rec-a"})
+        client.post("/robots/rec-a/angles", json={"joint_angles": [5, 30, 55, 0, 0, 0]})
+        client.post("/robots/rec-a/angles", json={"joint_angles": [10, 30, 55, 0, 0, 0]})
+        response = client.get("/robots/rec-a/telemetry")
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [orjson.loads(line) for line in response.content.splitlines()]
+        assert [record["currentAngles"][0] for record in records][-2:] == [5.0, 10.0]
+        matrix = decode_matrix(client.get("/robots/rec-a/telemetry", headers={"Accept": MATRIX_MEDIA_TYPE}).content)
+        assert matrix.shape == (len(records), 9)
+        assert matrix[-1, 1] == 10.0
+        info = client.get("/robots/rec-a/telemetry/info").json()
+        assert info["count"] == len(records)
+        assert len(client.get("/robots/rec-a/telemetry", params={"start": info["newest"]}).content.splitlines()) == 1
+        client.delete("/robots/rec-a")
+
+    def test_replay(self):
+        with TestClient(app) as test_client:
+            test_client.post("/robots", json={"id": "rec-b"})
+            for angle in (5, 10, 15):
+                test_client.post("/robots/rec-b/angles", json={"joint_angles": [angle, 30, 55, 0, 0, 0]})
+                time.sleep(0.02)
+            test_client.post("/robots/rec-b/angles", json={"joint_angles": [0, 30, 55, 0, 0, 0]})
+            data = test_client.post("/robots/rec-b/telemetry/replay", json={"last": 60, "speed": 2.0}).json()
+            assert data["success"] is True
+            result = wait_for_move(test_client, data["move"]["id"], prefix="/robots/rec-b")
+            assert result["status"] == "completed"
+            assert result["currentAngles"] == [0, 30, 55, 0, 0, 0]
+            test_client.delete("/robots/rec-b")
+
+    def test_replay_empty_range(self):
+        response = client.post("/telemetry/replay", json={"start": 0, "end": 1})
+        assert response.status_code == 400
+        assert client.post("/telemetry/replay", json={"speed": 0}).status_code == 422
+
+class TestMetricsAPI:
+    """Tests for the /metrics endpoint"""
+
+    def test_request_and_motion_metrics(self):
+        with TestClient(app) as test_client:
+            test_client.get("/state")
+            test_client.get("/robots/default/state")
+            move = test_client.post("/move", json={"targetAngles": [5, 30, 55, 0, 0, 0], "duration": 100}).json()["move"]
+            wait_for_move(test_client, move["id"])
+            response = test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'yanibot_http_requests_total{method="GET",route="/robots/{robot_id}/state",status="200"}' in text
+        assert 'yanibot_http_request_duration_seconds_count{method="GET",route="/state"}' in text
+        assert "yanibot_active_moves 0" in text
+        assert "yanibot_interpolate_cache_hits_total" in text
+        count = next(line for line in text.splitlines() if line.startswith("yanibot_control_tick_lateness_seconds_count"))
+        assert int(count.split()[-1]) > 0
+
+class TestProfilingAPI:
+    """Tests for the profiling admin endpoints"""
+
+    def test_toggle_and_report(self, tmp_path, monkeypatch):
+        from api import profiler
+        monkeypatch.setattr(profiler, "output_dir", str(tmp_path))
+        assert client.post("/admin/profiling", json={"enabled": True, "reset": True}).json()["enabled"] is True
+        client.post("/interpolate", json={"startAngles": [0, 0, 0, 0, 0, 0], "targetAngles": [90, 0, 0, 0, 0, 0]})
+        client.post("/limits", json={"joint_angles": [0, 0, 0, 0, 0, 0]})
+        report = client.get("/admin/profiling").json()
+        assert {"compute", "encode", "cache", "framework"} <= set(report["routes"]["/interpolate"]["phases"])
+        assert "compute" in report["routes"]["/limits"]["phases"]
+        data = client.post("/admin/profiling", json={"enabled": False}).json()
+        assert data["enabled"] is False
+        assert {"stacks", "phases"} == set(data["files"])
+
+class TestCollisionAPI:
+    """Tests for collision checking"""
+
+    home = [0, 30, 55, 0, 0, 0]
+    pick = [-45, 75, 55, 0, 35, 10]
+
+    def test_check_trajectory(self):
+        data = client.post("/collisions", json={"trajectory": [self.home, [-45, 50, 55, 0, 0, 0]]}).json()
+        assert data["success"] is True
+        assert data["firstCollision"] is None
+        data = client.post("/collisions", json={"trajectory": [self.home, self.pick]}).json()
+        assert data["success"] is False
+        assert data["firstCollision"] == 1
+        assert data["link"] == "tool"
+        assert client.post("/collisions", json={"trajectory": [[0, 0, 0]]}).status_code == 422
+
+    def test_colliding_move_not_started(self):
+        client.post("/angles", json={"joint_angles": self.home})
+        data = client.post("/move", json={"targetAngles": self.pick, "duration": 200}).json()
+        assert data["success"] is False
+        assert data["collision"]["obstacle"].startswith("leftBin")
+        assert client.get("/state").json()["currentAngles"] == self.home
+
+    def test_move_checked_off_loop_and_planned_once(self, monkeypatch):
+        from api import collision_checker, registry
+        executor = registry.default.executor
+        calls, checks = [], []
+        plan, first_collision = executor.plan, collision_checker.first_collision
+        monkeypatch.setattr(executor, "plan", lambda *args: calls.append(args) or plan(*args))
+
+        def checking(trajectory):
+            # No event loop in the checking thread: the control loops were not blocked meanwhile
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            checks.append(len(trajectory))
+            return first_collision(trajectory)
+
+        monkeypatch.setattr(collision_checker, "first_collision", checking)
+        with TestClient(app) as test_client:
+            test_client.post("/angles", json={"joint_angles": self.home})
+            data = test_client.post("/move", json={"targetAngles": [10, 30, 55, 0, 0, 0], "duration": 100}).json()
+            assert data["success"] is True
+            assert wait_for_move(test_client, data["move"]["id"])["status"] == "completed"
+        # Planned once, and the checked path (start pose plus 5 ticks of 20 ms) is the one executed
+        assert len(calls) == 1
+        assert checks == [6]
+
+    def test_replan_after_manual_move_checked(self):
+        target = [-152.9, -61.3, -128.3, -218.3, 70.7, -209.0]
+        moved = [-57.6, -63.1, 43.6, -107.4, 82.3, 277.2]
+        with TestClient(app) as test_client:
+            test_client.post("/angles", json={"joint_angles": self.home})
+            data = test_client.post("/move", json={"targetAngles": target}).json()
+            assert data["success"] is True
+            test_client.post("/commands", json={"commands": [{"command": "pause", "value": True}]})
+            test_client.post("/angles", json={"joint_angles": moved})
+            test_client.post("/commands", json={"commands": [{"command": "pause", "value": False}]})
+            move = wait_for_move(test_client, data["move"]["id"])
+            # Resuming would have run from the new pose straight through the right bin
+            assert move["status"] == "failed"
+            assert "rightBinFront" in move["message"]
+            assert test_client.get("/state").json()["currentAngles"] == moved
+
+    def test_program_collision_reported(self):
+        data = client.put("/programs/collision-test", json={"waypoints": [
+            {"angles": self.home, "duration": 200}, {"angles": self.pick, "duration": 200}
+        ]}).json()
+        assert data["success"] is True
+        assert data["collision"]["link"] == "tool"
+        client.delete("/programs/collision-test")
+
+class TestPlanAPI:
+    """Tests for collision-free path planning"""
+
+    home = [0, 30, 55, 0, 0, 0]
+    pick = [-45, 75, 55, 0, 35, 10]
+
+    def test_execute_rejected_if_arm_moved(self, monkeypatch):
+        from api import planner, registry
+        robot = registry.default.robot
+        plan = planner.plan
+
+        def moving_plan(start, goal):
+            # Another client moves the arm while the path is planned
+            robot.currentAngles = [5, 30, 55, 0, 0, 0]
+            return plan(start, goal)
+
+        monkeypatch.setattr(planner, "plan", moving_plan)
+        client.post("/angles", json={"joint_angles": self.home})
+        response = client.post("/plan", json={"targetAngles": [10, 30, 55, 0, 0, 0], "execute": True})
+        assert response.status_code == 409
+        assert client.get("/state").json()["isMoving"] is False
+        # Without execute the plan is only returned, from the pose it was asked for
+        data = client.post("/plan", json={"targetAngles": [10, 30, 55, 0, 0, 0]}).json()
+        assert data["success"] is True
+
+    def test_plan_around_bin_wall(self):
+        client.post("/angles", json={"joint_angles": self.home})
+        data = client.post("/plan", json={"targetAngles": self.pick}).json()
+        assert data["success"] is True
+        assert len(data["waypoints"]) >= 3
+        assert data["waypoints"][-1] == self.pick
+        assert data["pathLength"] > 0 and data["duration"] > 0
+        assert "move" not in data
+        assert client.post("/collisions", json={"trajectory": data["waypoints"]}).json()["success"] is True
+        again = client.post("/plan", json={"targetAngles": self.pick}).json()
+        assert again["cached"] is True
+        assert again["waypoints"] == data["waypoints"]
+        assert client.get("/plan/cache").json()["hits"] >= 1
+
+    def test_plan_from_given_start(self):
+        data = client.post("/plan", json={"startAngles": [-45, 50, 55, 0, 0, 0], "targetAngles": [45, 50, 55, 0, 0, 0]}).json()
+        assert len(data["waypoints"]) == 2
+
+    def test_execute_plan(self):
+        client.post("/angles", json={"joint_angles": self.home})
+        with TestClient(app) as test_client:
+            data = test_client.post("/plan", json={"targetAngles": self.pick, "execute": True}).json()
+            assert data["move"]["status"] in ("pending", "running")
+            # A followed path first heads to its start pose, the current one here
+            assert data["move"]["targetAngles"] == self.home
+            test_client.post("/stop")
+
+    def test_invalid_plan_requests(self):
+        response = client.post("/plan", json={"startAngles": self.home, "targetAngles": self.pick, "execute": True})
+        assert response.status_code == 400
+        response = client.post("/plan", json={"targetAngles": [-45, 80, 55, 0, 35, 10]})
+        assert response.status_code == 400
+        assert "collision" in response.json()["detail"]
+
+class TestCommandsAPI:
+    """Tests for batched state commands"""
+
+    def test_reset_batch(self):
+        client.post("/angles", json={"joint_angles": [10, 20, 30, 0, 0, 0]})
+        client.post("/pause", json={"is_paused": True})
+        client.post("/emergency", json={"is_emergency": True})
+        data = client.post("/commands", json={"commands": [{"command": "reset"}]}).json()
+        assert data["success"] is True
+        state = data["state"]
+        assert state["currentAngles"] == state["homeAngles"]
+        assert not any(state[flag] for flag in ("isMoving", "isPaused", "isStopped", "isEmergencyMode", "isSafetyMode"))
+        assert client.get("/state").json() == state
+
+    def test_one_version_per_batch(self):
+        version = client.get("/state").json()["version"]
+        data = client.post("/commands", json={"commands": [
+            {"command": "pause", "value": True},
+            {"command": "moving", "value": False},
+            {"command": "angles", "joint_angles": [5, 30, 55, 0, 0, 0]},
+            {"command": "pause", "value": False}
+        ]}).json()
+        # Later commands win, and the whole batch is a single state change
+        assert data["state"]["isPaused"] is False
+        assert data["state"]["currentAngles"] == [5, 30, 55, 0, 0, 0]
+        assert data["state"]["version"] == version + 1
+
+    def test_all_or_nothing(self):
+        before = client.get("/state").json()
+        response = client.post("/commands", json={"commands": [
+            {"command": "stop", "value": not before["isStopped"]}, {"command": "safety"}
+        ]})
+        assert response.status_code == 400
+        assert client.get("/state").json() == before
+        response = client.post("/commands", json={
+            "commands": [{"command": "stop", "value": True}], "expectedVersion": before["version"] - 1
+        })
+        assert response.status_code == 409
+        assert client.post("/commands", json={"commands": [{"command": "jump"}]}).status_code == 422
+        assert client.post("/commands", json={"commands": []}).status_code == 422
+
+    def test_bin_counts(self):
+        state = client.post("/commands", json={"commands": [{"command": "bins", "left": 3, "right": 2}]}).json()["state"]
+        assert (state["leftBinCount"], state["rightBinCount"]) == (3, 2)
+        state = client.post("/commands", json={"commands": [{"command": "bins", "right": 4}]}).json()["state"]
+        assert (state["leftBinCount"], state["rightBinCount"]) == (3, 4)
+        assert client.post("/commands", json={"commands": [{"command": "bins"}]}).status_code == 400
+        assert client.post("/commands", json={"commands": [{"command": "bins", "left": -1}]}).status_code == 422
+        # Resetting the scene refills the left bin
+        state = client.post("/commands", json={"commands": [{"command": "reset"}]}).json()["state"]
+        assert (state["leftBinCount"], state["rightBinCount"]) == (5, 0)
+
+    def test_persistence_status(self):
+        data = client.get("/admin/persistence").json()
+        assert data == {"success": True, "enabled": False}
+
+class TestStopLatencyAPI:
+    """Tests for the stop interrupt and its latency"""
+
+    def test_stop_latency_recorded(self):
+        client.post("/commands", json={"commands": [{"command": "reset"}]})
+        before = client.get("/stop/latency").json()["count"]
+        with TestClient(app) as test_client:
+            move = test_client.post("/move", json={"targetAngles": [0, 30, 55, 0, 0, 90], "duration": 2000}).json()["move"]
+            time.sleep(0.1)
+            assert test_client.post("/stop", json={"is_stopped": True}).status_code == 200
+            assert wait_for_move(test_client, move["id"])["status"] == "stopped"
+            test_client.post("/stop", json={"is_stopped": False})
+        data = client.get("/stop/latency").json()
+        assert data["count"] == before + 1
+        # The write wakes the executor; it halts well within one 20 ms control tick
+        assert data["p99Ms"] <= 20.0
+        assert data["maxMs"] < 20.0
+        assert "yanibot_stop_latency_seconds_count" in client.get("/metrics").text
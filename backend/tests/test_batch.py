@@ -0,0 +1,51 @@
+import pytest
+from batch import expand_grid, format_table, run_batch, run_scenario, table_row
+from robot import RobotArm
+
+class TestBatchRunner:
+    """Test suite for the parallel batch simulation runner"""
+
+    def test_expand_grid(self):
+        scenarios = expand_grid({"strategy": ["left-to-right", "bidirectional"], "cycle_delay": [0, 1.0], "left": 3})
+        assert len(scenarios) == 4
+        assert scenarios[0] == {"strategy": "left-to-right", "cycle_delay": 0, "left": 3}
+        assert scenarios[-1] == {"strategy": "bidirectional", "cycle_delay": 1.0, "left": 3}
+
+    def test_unknown_parameter(self):
+        with pytest.raises(ValueError):
+            expand_grid({"gripper": [True]})
+
+    def test_invalid_scenario_reports_error(self):
+        report = run_scenario({"strategy": "left-to-right", "positions": {"leftBinPick": [0, 0, 90, 0, 0, 0]}})
+        assert report["cycles"] == 0
+        assert "out of joint limits" in report["error"]
+
+    def test_parallel_matches_sequential(self):
+        scenarios = expand_grid({
+            "strategy": ["left-to-right", "bidirectional"],
+            "duration_scale": [0.8, 1.0],
+            "blend": [True, False],
+            "max_cycles": 10,
+        })
+        results = {index: report for index, _, report in run_batch(scenarios, workers=2, chunksize=3)}
+        assert sorted(results) == list(range(len(scenarios)))
+        for index, scenario in enumerate(scenarios):
+            expected = run_scenario(scenario)
+            assert results[index]["cycles"] == expected["cycles"]
+            assert results[index]["cyclesPerHour"] == pytest.approx(expected["cyclesPerHour"])
+
+    def test_shared_robot_does_not_grow(self):
+        # A worker's robot runs every scenario of its chunks; nothing may stay subscribed to it between scenarios
+        robot, programs = RobotArm(), {}
+        listeners = len(robot._listeners)
+        for strategy in ("left-to-right", "bidirectional", "right-to-left") * 20:
+            report = run_scenario({"strategy": strategy, "max_cycles": 2}, robot, programs)
+            assert "error" not in report
+        assert len(robot._listeners) == listeners
+
+    def test_table_orders_by_throughput(self):
+        scenarios = [{"strategy": "left-to-right", "duration_scale": scale} for scale in (1.0, 0.5)]
+        rows = [table_row(index, scenario, run_scenario(scenario)) for index, scenario in enumerate(scenarios)]
+        lines = format_table(rows).splitlines()
+        assert len(lines) == 3
+        assert lines[1].split()[0] == "1"
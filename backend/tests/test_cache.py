@@ -0,0 +1,36 @@
+import pytest
+from cache import LRUCache, quantize_key
+
+class TestLRUCache:
+    """Test suite for the LRU cache"""
+
+    def test_hit_and_miss_counters(self):
+        cache = LRUCache(maxsize=2)
+        assert cache.get("a") is None
+        cache.put("a", b"1")
+        assert cache.get("a") == b"1"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hitRate"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+        assert cache.stats()["evictions"] == 1
+        assert len(cache) == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_quantized_keys(self):
+        assert quantize_key([0.0, 30.0]) == quantize_key([0.0000001, 29.9999999])
+        assert quantize_key([0.0, 30.0]) != quantize_key([0.01, 30.0])
+        assert quantize_key([1, 2], [3, 4]) != quantize_key([3, 4], [1, 2])
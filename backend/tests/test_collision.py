@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from collision import CollisionChecker, densify, segment_distances
+from programs import MotionProgram
+from simulation import PRESET_POSITIONS, program_waypoints
+
+HOME = [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+
+class TestSegmentDistances:
+    """Test suite for the vectorized segment-segment distance"""
+
+    def test_known_distances(self):
+        p1 = np.array([[0, 0, 0], [0, 0, 0], [0, 0, 0]], dtype=float)
+        q1 = np.array([[1, 0, 0], [1, 0, 0], [1, 0, 0]], dtype=float)
+        p2 = np.array([[0.5, -1, 1], [2, 0, 0], [0, 1, 0]], dtype=float)
+        q2 = np.array([[0.5, 1, 1], [3, 0, 0], [1, 1, 0]], dtype=float)
+        assert segment_distances(p1, q1, p2, q2) == pytest.approx([1.0, 1.0, 1.0])
+
+    def test_degenerate_segments(self):
+        point = np.zeros(3)
+        assert segment_distances(point, point, np.array([3.0, 4.0, 0.0]), np.array([3.0, 4.0, 0.0])) == pytest.approx(5.0)
+
+class TestDensify:
+    """Test suite for trajectory densification"""
+
+    def test_step_bound_and_index(self):
+        path = np.array([[0, 0, 0, 0, 0, 0], [10, 0, 0, 0, 0, 0], [11, 0, 0, 0, 0, 0]], dtype=float)
+        dense, index = densify(path, max_step=2.0)
+        assert np.abs(np.diff(dense, axis=0)).max() <= 2.0 + 1e-9
+        assert dense[-1].tolist() == path[-1].tolist()
+        assert index.tolist() == [0, 1, 1, 1, 1, 1, 2]
+
+class TestCollisionChecker:
+    """Test suite for the CollisionChecker"""
+
+    checker = CollisionChecker()
+
+    def test_presets_are_clear(self):
+        result = self.checker.check_poses(list(PRESET_POSITIONS.values()))
+        assert not result["colliding"].any()
+        assert result["index"] is None
+
+    def test_automation_cycle_is_clear(self):
+        for source, target in (("left", "right"), ("right", "left")):
+            program = MotionProgram("cycle", program_waypoints(PRESET_POSITIONS, source, target), 0.02)
+            assert self.checker.first_collision(program.path) is None
+
+    def test_direct_move_into_bin_hits_wall(self):
+        path = np.linspace(HOME, PRESET_POSITIONS["leftBinPick"], 30)
+        collision = self.checker.first_collision(path)
+        assert collision is not None
+        assert collision["link"] == "tool"
+        assert collision["obstacle"].startswith("leftBin")
+        assert 0 < collision["step"] < 30
+
+    def test_motion_between_steps_is_checked(self):
+        # Both poses are clear, the joint move between them is not
+        path = [HOME, PRESET_POSITIONS["leftBinPick"]]
+        assert not self.checker.check_poses(path)["colliding"].any()
+        assert self.checker.first_collision(path)["step"] == 1
+
+    def test_self_collision(self):
+        result = self.checker.check_poses([[0.0, -60.0, -150.0, 0.0, 0.0, 0.0]])
+        assert result["index"] == 0
+        assert (result["link"], result["obstacle"]) in {("base", "wrist"), ("base", "tool"), ("shoulder", "wrist")}
+
+    def test_floor_and_workspace(self):
+        checker = CollisionChecker(obstacles=[], links=(("upperArm", 2, 3, 1.6),), self_pairs=())
+        assert checker.check_poses([HOME])["obstacle"] == "floor"
+        checker = CollisionChecker(obstacles=[], self_pairs=(), workspace_radius=1.0)
+        assert checker.check_poses([HOME])["obstacle"] == "workspace"
+
+    def test_clearance_inflates_links(self):
+        pose = [[-45.0, 70.0, 55.0, 0.0, 30.0, 10.0]]
+        assert not self.checker.check_poses(pose)["colliding"].any()
+        assert CollisionChecker(clearance=0.3).check_poses(pose)["colliding"].all()
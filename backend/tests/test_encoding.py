@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from encoding import MATRIX_HEADER, MatrixResponse, decode_matrix, encode_matrix, negotiate_matrix
+
+class TestMatrixEncoding:
+    """Test suite for the binary matrix transport format"""
+
+    def test_round_trip(self):
+        path = np.linspace([0, 30, 55, 0, 0, 0], [-45, 75, 55, 0, 35, 10], 40)
+        body = encode_matrix(path)
+        assert len(body) == MATRIX_HEADER.size + path.size * 8
+        assert np.array_equal(decode_matrix(body), path)
+
+    def test_float32(self):
+        path = np.linspace([0] * 6, [170, 60, -100, 200, 100, 250], 7)
+        decoded = decode_matrix(encode_matrix(path, "float32"))
+        assert decoded.dtype == np.float32
+        assert np.allclose(decoded, path, atol=1e-4)
+
+    def test_header_is_little_endian(self):
+        body = encode_matrix(np.zeros((3, 6)))
+        assert body[:4] == b"YBMX"
+        assert body[4:8] == (3).to_bytes(4, "little")
+        assert body[8:12] == (6).to_bytes(4, "little")
+        assert body[12] == 2
+
+    def test_non_contiguous_input(self):
+        path = np.arange(60, dtype=np.float64).reshape(6, 10).T
+        assert np.array_equal(decode_matrix(encode_matrix(path)), path)
+
+    def test_malformed_payload(self):
+        body = encode_matrix(np.zeros((3, 6)))
+        with pytest.raises(ValueError):
+            decode_matrix(body[:-8])
+        with pytest.raises(ValueError):
+            decode_matrix(b"JSON" + body[4:])
+        with pytest.raises(ValueError):
+            decode_matrix(b"")
+        with pytest.raises(ValueError):
+            encode_matrix(np.zeros(6))
+
+    def test_negotiation(self):
+        assert negotiate_matrix(None) is None
+        assert negotiate_matrix("application/json") is None
+        assert negotiate_matrix("application/x-yanibot-matrix") == "float64"
+        assert negotiate_matrix("text/html, application/x-yanibot-matrix;dtype=float32") == "float32"
+        assert negotiate_matrix("application/x-yanibot-matrix; dtype=int8") == "float64"
+
+    def test_response(self):
+        response = MatrixResponse(np.ones((2, 6)), dtype="float32")
+        assert response.media_type == "application/x-yanibot-matrix"
+        assert decode_matrix(response.body).shape == (2, 6)
@@ -0,0 +1,40 @@
+import pytest
+from fleet import DEFAULT_ROBOT_ID, RobotRegistry
+
+class TestRobotRegistry:
+    """Test suite for the RobotRegistry class"""
+
+    def test_default_robot(self):
+        registry = RobotRegistry()
+        assert registry.ids() == [DEFAULT_ROBOT_ID]
+        assert registry.get(DEFAULT_ROBOT_ID) is registry.default
+        with pytest.raises(ValueError):
+            registry.remove(DEFAULT_ROBOT_ID)
+
+    def test_robots_are_independent(self):
+        registry = RobotRegistry()
+        first = registry.create("a")
+        second = registry.create("b")
+        first.robot.isPaused = True
+        assert second.robot.isPaused is False
+        assert first.executor.robot is first.robot
+        assert first.broadcaster.robot is first.robot
+        assert first.state()["moves"] == []
+
+    def test_duplicate_and_capacity(self):
+        registry = RobotRegistry(max_robots=2)
+        registry.create("a")
+        with pytest.raises(ValueError):
+            registry.create("a")
+        with pytest.raises(ValueError):
+            registry.create("b")
+
+    def test_remove_detaches_stream(self):
+        registry = RobotRegistry()
+        unit = registry.create("a")
+        registry.remove("a")
+        assert "a" not in registry
+        assert len(registry) == 1
+        assert unit.robot._listeners == []
+        with pytest.raises(KeyError):
+            registry.get("a")
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from kinematics import (
+    JOINT_OFFSETS, TOOL_OFFSET, forward_kinematics, inverse_kinematics, jacobian, joint_positions,
+    quaternion_to_rotation, rotation_to_quaternion, solve_path
+)
+from robot import RobotArm
+
+REACH = JOINT_OFFSETS[:, 2].sum() + TOOL_OFFSET[2]
+
+class TestForwardKinematics:
+    """Test suite for the forward kinematics engine"""
+
+    def test_zero_pose_points_straight_up(self):
+        position, rotation = forward_kinematics([0, 0, 0, 0, 0, 0])
+        assert np.allclose(position, [0, 0, REACH])
+        assert np.allclose(rotation, np.eye(3))
+
+    def test_base_rotation_turns_arm(self):
+        # Shoulder pitch tilts the arm towards -y, base rotation swings it around z
+        position, _ = forward_kinematics([90, 90, 0, 0, 0, 0])
+        assert np.allclose(position, [REACH - 1.5, 0, 1.5])
+
+    def test_wrist_roll_keeps_tcp(self):
+        first, _ = forward_kinematics([10, 40, 30, 0, 20, 0])
+        second, _ = forward_kinematics([10, 40, 30, 0, 20, 90])
+        assert np.allclose(first, second)
+
+    def test_pick_pose_reaches_left_bin(self):
+        position, _ = forward_kinematics([-45.0, 75.0, 55.0, 0.0, 35.0, 10.0])
+        assert position[0] == pytest.approx(-1.0, abs=0.05)
+        assert position[1] == pytest.approx(-1.0, abs=0.05)
+        assert 0.85 < position[2] < 1.15
+
+    def test_batch_matches_single_poses(self):
+        rng = np.random.default_rng(0)
+        poses = rng.uniform(-120, 120, size=(50, 6))
+        positions, rotations = forward_kinematics(poses)
+        assert positions.shape == (50, 3)
+        assert rotations.shape == (50, 3, 3)
+        for i in (0, 17, 49):
+            position, rotation = forward_kinematics(poses[i])
+            assert np.allclose(positions[i], position)
+            assert np.allclose(rotations[i], rotation)
+        assert np.allclose(rotations @ rotations.transpose(0, 2, 1), np.eye(3))
+
+    def test_joint_positions_end_at_tcp(self):
+        pose = [20, 40, -30, 10, 50, 0]
+        points = joint_positions(pose)
+        assert points.shape == (8, 3)
+        assert np.allclose(points[0], 0)
+        assert np.allclose(points[1], [0, 0, 1.0])
+        assert np.allclose(points[-1], forward_kinematics(pose)[0])
+        lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+        assert np.allclose(lengths, np.append(JOINT_OFFSETS[:, 2], TOOL_OFFSET[2]))
+
+    def test_quaternions(self):
+        assert np.allclose(rotation_to_quaternion(np.eye(3)), [1, 0, 0, 0])
+        _, rotation = forward_kinematics([0, 0, 0, 0, 0, 90])
+        assert np.allclose(rotation_to_quaternion(rotation), [np.sqrt(0.5), 0, 0, np.sqrt(0.5)])
+        rng = np.random.default_rng(1)
+        _, rotations = forward_kinematics(rng.uniform(-180, 180, size=(100, 6)))
+        quaternions = rotation_to_quaternion(rotations)
+        assert np.allclose(quaternion_to_rotation(quaternions), rotations)
+
+
+class TestInverseKinematics:
+    """Test suite for the damped least squares IK solver"""
+
+    robot = RobotArm()
+    limits = {"lower_limits": robot.lower_limits, "upper_limits": robot.upper_limits}
+    pick = np.array([-45.0, 75.0, 55.0, 0.0, 35.0, 10.0])
+
+    def test_jacobian_matches_finite_differences(self):
+        pose = np.array([[20.0, 40.0, -30.0, 10.0, 50.0, 5.0]])
+        position, _, jac = jacobian(pose)
+        for joint in range(6):
+            nudged = pose.copy()
+            nudged[0, joint] += 1e-4
+            shifted, _ = forward_kinematics(nudged)
+            assert np.allclose((shifted - position[0]) / np.radians(1e-4), jac[0, :3, joint], atol=1e-5)
+
+    def test_recovers_pose_from_warm_start(self):
+        position, rotation = forward_kinematics(self.pick)
+        angles, converged = inverse_kinematics(position, rotation, self.pick + 10, **self.limits)
+        assert converged
+        assert np.allclose(angles, self.pick, atol=0.1)
+
+    def test_batch_reaches_targets(self):
+        rng = np.random.default_rng(0)
+        poses = np.clip(self.pick + rng.uniform(-20, 20, size=(200, 6)), self.robot.lower_limits, self.robot.upper_limits)
+        positions, rotations = forward_kinematics(poses)
+        angles, converged = inverse_kinematics(positions, rotations, self.pick, **self.limits)
+        assert converged.mean() > 0.95
+        reached, _ = forward_kinematics(angles[converged])
+        assert np.allclose(reached, positions[converged], atol=1e-4)
+
+    def test_respects_joint_limits(self):
+        # A target straight below the base would need the shoulder past its limit
+        angles, converged = inverse_kinematics([0.0, 0.0, -2.0], seed=self.pick, **self.limits)
+        assert not converged
+        assert self.robot.within_limits(angles)
+
+    def test_solve_path_is_continuous(self):
+        path = np.linspace(self.pick, [45.0, 60.0, 40.0, 0.0, 35.0, 10.0], 60)
+        positions, rotations = forward_kinematics(path)
+        angles, converged = solve_path(positions, rotations, self.pick, **self.limits)
+        assert converged.all()
+        assert np.abs(np.diff(angles, axis=0)).max() < 5.0
@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from metrics import UNMATCHED_ROUTE, Histogram, Metrics, MetricsMiddleware
+
+class TestHistogram:
+    """Test suite for the fixed-bucket Histogram"""
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        cumulative, total, count = histogram.snapshot()
+        assert cumulative == [2, 3, 4]
+        assert total == pytest.approx(2.65)
+        assert count == 4
+
+    def test_quantile(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        assert histogram.quantile(0.5) is None
+        for value in [0.05] * 98 + [0.5, 5.0]:
+            histogram.observe(value)
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.99) == 1.0
+        assert histogram.quantile(1.0) == float("inf")
+
+class TestMetrics:
+    """Test suite for the Prometheus text export and the ASGI middleware"""
+
+    def test_render_collectors(self):
+        metrics = Metrics()
+        histogram = Histogram(buckets=(1.0,))
+        histogram.observe(0.5)
+        metrics.collector("test_gauge", "gauge", "A gauge.", lambda: 3)
+        metrics.collector("test_labelled", "gauge", "Labelled.", lambda: {(("robot", 'a"b'),): 1.5})
+        metrics.collector("test_latency", "histogram", "A histogram.", lambda: histogram)
+        text = metrics.render()
+        assert "# TYPE test_gauge gauge\ntest_gauge 3\n" in text
+        assert 'test_labelled{robot="a\\"b"} 1.5' in text
+        assert 'test_latency_bucket{le="1.0"} 1' in text
+        assert 'test_latency_bucket{le="+Inf"} 1' in text
+        assert "test_latency_count 1" in text
+
+    def test_middleware_uses_route_templates(self):
+        app = FastAPI()
+        metrics = Metrics()
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/items/x")
+        client.get("/missing")
+        assert metrics.requests[("GET", "/items/{item_id}", 200)] == 2
+        assert metrics.requests[("GET", "/items/{item_id}", 422)] == 1
+        assert metrics.requests[("GET", UNMATCHED_ROUTE, 404)] == 1
+        assert metrics.latency[("GET", "/items/{item_id}")].count == 3
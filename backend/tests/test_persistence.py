@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+import orjson
+from fleet import RobotRegistry
+from persistence import JOURNAL_FILE, SNAPSHOT_FILE, StatePersistence
+from robot import RobotArm
+
+def journal_lines(directory):
+    with open(os.path.join(directory, JOURNAL_FILE), "rb") as f:
+        return [orjson.loads(line) for line in f]
+
+class TestStatePersistence:
+    """Test suite for the state journal and snapshots"""
+
+    def test_roundtrip(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path))
+        persistence.restore()
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        robot.update(currentAngles=[10, 20, 30, 0, 0, 0], isPaused=True, leftBinCount=3, rightBinCount=2)
+        robot.isMoving = True
+        persistence.flush()
+        # Crash: nothing closed, only the journal is on disk
+        restored = StatePersistence(str(tmp_path)).restore()
+        entry = restored["default"]
+        assert entry["version"] == robot.version
+        assert entry["state"]["currentAngles"] == [10, 20, 30, 0, 0, 0]
+        assert entry["state"]["isPaused"] is True
+        assert (entry["state"]["leftBinCount"], entry["state"]["rightBinCount"]) == (3, 2)
+        assert "isMoving" not in entry["state"]
+        persistence.close()
+
+    def test_batch_coalesces_changes(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path))
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        persistence.flush()
+        for step in range(100):
+            robot.currentAngles = [step, 30, 55, 0, 0, 0]
+        # A flag the journal does not keep does not mark the robot
+        robot.isMoving = True
+        assert persistence.flush() == 1
+        robot.isMoving = False
+        assert persistence.flush() == 0
+        lines = journal_lines(str(tmp_path))
+        assert len(lines) == 2
+        assert lines[-1]["state"]["currentAngles"] == [99, 30, 55, 0, 0, 0]
+        persistence.close()
+
+    def test_writer_thread_flushes(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path), flush_interval=0.01)
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        robot.isStopped = True
+        deadline = time.time() + 2.0
+        while persistence.states.get("default", {}).get("state", {}).get("isStopped") is not True:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        persistence.close()
+
+    def test_slow_disk_does_not_block_writes(self, tmp_path, monkeypatch):
+        persistence = StatePersistence(str(tmp_path), fsync=True)
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        persistence.flush()
+        syncing, release = threading.Event(), threading.Event()
+
+        def slow_fsync(fd):
+            syncing.set()
+            release.wait(2.0)
+
+        monkeypatch.setattr(os, "fsync", slow_fsync)
+        robot.currentAngles = [1, 30, 55, 0, 0, 0]
+        flusher = threading.Thread(target=persistence.flush)
+        flusher.start()
+        assert syncing.wait(2.0)
+        # The flush is stuck on the disk; the control loop's writes still go through at once
+        started = time.perf_counter()
+        for step in range(10):
+            robot.currentAngles = [step, 30, 55, 0, 0, 0]
+        assert time.perf_counter() - started < 0.05
+        release.set()
+        flusher.join()
+        monkeypatch.undo()
+        assert persistence.flush() == 1
+        persistence.close()
+
+    def test_compaction(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path), compact_bytes=2048)
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        for step in range(50):
+            robot.currentAngles = [step, 30, 55, 0, 0, 0]
+            persistence.flush()
+        assert persistence.compactions > 0
+        assert os.path.getsize(os.path.join(str(tmp_path), JOURNAL_FILE)) < 2048
+        restored = StatePersistence(str(tmp_path)).restore()
+        assert restored["default"]["state"]["currentAngles"] == [49, 30, 55, 0, 0, 0]
+        # A clean close leaves the whole state in the snapshot
+        persistence.close()
+        assert os.path.getsize(os.path.join(str(tmp_path), JOURNAL_FILE)) == 0
+        with open(os.path.join(str(tmp_path), SNAPSHOT_FILE), "rb") as f:
+            assert orjson.loads(f.read())["robots"]["default"]["version"] == robot.version
+
+    def test_torn_line_dropped(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path))
+        robot = RobotArm()
+        persistence.attach("default", robot)
+        persistence.start()
+        robot.currentAngles = [1, 30, 55, 0, 0, 0]
+        persistence.flush()
+        persistence._journal.write(b'{"seq": 99, "id": "default", "ver')
+        persistence._journal.flush()
+        restoring = StatePersistence(str(tmp_path))
+        assert restoring.restore()["default"]["state"]["currentAngles"] == [1, 30, 55, 0, 0, 0]
+        # Lines written after the restart must not be glued to the torn one
+        restoring.start()
+        restarted = RobotArm()
+        restoring.attach("default", restarted)
+        restarted.currentAngles = [2, 30, 55, 0, 0, 0]
+        restoring.flush()
+        assert StatePersistence(str(tmp_path)).restore()["default"]["state"]["currentAngles"] == [2, 30, 55, 0, 0, 0]
+        assert len(journal_lines(str(tmp_path))) == 2
+        restoring.close()
+        persistence.close()
+
+    def test_removed_robot_forgotten(self, tmp_path):
+        persistence = StatePersistence(str(tmp_path))
+        robot = RobotArm()
+        persistence.attach("cell-2", robot)
+        persistence.start()
+        persistence.flush()
+        persistence.detach("cell-2", robot)
+        persistence.flush()
+        robot.isPaused = True
+        assert persistence.flush() == 0
+        assert StatePersistence(str(tmp_path)).restore() == {}
+        persistence.close()
+
+class TestRegistryRestore:
+    """Tests for restoring a fleet from the state directory"""
+
+    def test_restart_restores_robots(self, tmp_path):
+        registry = RobotRegistry(persistence=StatePersistence(str(tmp_path)))
+        registry.default.robot.update(currentAngles=[15, 30, 55, 0, 0, 0], isEmergencyMode=True, leftBinCount=1,
+                                      rightBinCount=4)
+        registry.create("cell-2").robot.isSafetyMode = True
+        registry.create("cell-3")
+        registry.remove("cell-3")
+        version = registry.default.robot.version
+        registry.persistence.close()
+
+        persistence = StatePersistence(str(tmp_path))
+        restarted = RobotRegistry(persistence=persistence)
+        assert sorted(restarted.ids()) == ["cell-2", "default"]
+        state = restarted.default.robot.snapshot()
+        assert state["currentAngles"] == [15, 30, 55, 0, 0, 0]
+        assert state["isEmergencyMode"] is True
+        assert (state["leftBinCount"], state["rightBinCount"]) == (1, 4)
+        assert state["isMoving"] is False
+        assert state["version"] == version
+        assert restarted.get("cell-2").robot.isSafetyMode is True
+        # Telemetry starts with the restored state
+        sample = restarted.default.telemetry.samples()[-1]
+        assert sample["version"] == version
+        assert sample["angles"].tolist() == [15, 30, 55, 0, 0, 0]
+        assert persistence.restore_seconds < 0.05
+        persistence.close()
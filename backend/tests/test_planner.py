@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from collision import CollisionChecker
+from planner import PathPlanner, PlanningFailed, path_length, time_parametrize
+from robot import RobotArm
+from simulation import PRESET_POSITIONS
+
+HOME = PRESET_POSITIONS["home"]
+
+def make_planner(**kwargs):
+    robot = RobotArm()
+    return PathPlanner(CollisionChecker(), robot.lower_limits, robot.upper_limits, seed=7, **kwargs)
+
+class TestPathHelpers:
+    """Test suite for path length and time parametrization"""
+
+    def test_path_length(self):
+        assert path_length([[0, 0, 0, 0, 0, 0], [3, 4, 0, 0, 0, 0], [3, 4, 0, 0, 0, 10]]) == pytest.approx(15.0)
+
+    def test_time_parametrize_stops_at_waypoints(self):
+        robot = RobotArm()
+        waypoints = np.array([HOME, PRESET_POSITIONS["leftBinApproach"], PRESET_POSITIONS["leftBinPick"]])
+        trajectory = time_parametrize(waypoints, robot.max_velocity, robot.max_acceleration, 0.02)
+        assert trajectory[0].tolist() == waypoints[0].tolist()
+        assert trajectory[-1] == pytest.approx(waypoints[-1])
+        # The middle waypoint is a sampled pose, reached exactly
+        assert np.isclose(trajectory, waypoints[1]).all(axis=1).any()
+        assert (np.abs(np.diff(trajectory, axis=0)).max(axis=0) <= robot.max_velocity * 0.02 + 1e-6).all()
+
+class TestPathPlanner:
+    """Test suite for the RRT-Connect path planner"""
+
+    def test_direct_move_when_clear(self):
+        planner = make_planner()
+        waypoints, cached = planner.plan(PRESET_POSITIONS["leftBinLift"], PRESET_POSITIONS["rightBinApproach"])
+        assert cached is False
+        assert len(waypoints) == 2
+
+    def test_plans_around_bin_wall(self):
+        planner = make_planner()
+        start, goal = HOME, PRESET_POSITIONS["leftBinPick"]
+        waypoints, _ = planner.plan(start, goal)
+        assert len(waypoints) >= 3
+        assert waypoints[0].tolist() == start
+        assert waypoints[-1].tolist() == goal
+        robot = RobotArm()
+        trajectory = time_parametrize(waypoints, robot.max_velocity, robot.max_acceleration, 0.02)
+        assert planner.checker.first_collision(trajectory) is None
+
+    def test_cached_plan(self):
+        planner = make_planner()
+        first, cached = planner.plan(HOME, PRESET_POSITIONS["rightBinPick"])
+        assert cached is False
+        second, cached = planner.plan(HOME, PRESET_POSITIONS["rightBinPick"])
+        assert cached is True
+        assert np.array_equal(first, second)
+        # Callers get a copy, the cached plan stays intact
+        second[1] += 1.0
+        assert np.array_equal(planner.plan(HOME, PRESET_POSITIONS["rightBinPick"])[0], first)
+        assert planner.cache.stats()["hits"] == 2
+
+    def test_invalid_poses(self):
+        planner = make_planner()
+        with pytest.raises(ValueError, match="out of joint limits"):
+            planner.plan(HOME, [500, 0, 0, 0, 0, 0])
+        with pytest.raises(ValueError, match="Start pose in collision"):
+            planner.plan([-45, 80, 55, 0, 35, 10], HOME)
+
+    def test_node_budget(self):
+        planner = make_planner(max_nodes=2)
+        with pytest.raises(PlanningFailed):
+            planner.plan(HOME, PRESET_POSITIONS["leftBinPick"])
@@ -0,0 +1,63 @@
+import os
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from profiling import FRAMEWORK_PHASE, Profiler, ProfilingMiddleware
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+class TestProfiler:
+    """Test suite for the opt-in Profiler"""
+
+    def test_off_by_default(self, monkeypatch):
+        monkeypatch.delenv("YANIBOT_PROFILE", raising=False)
+        profiler = Profiler.from_env()
+        assert profiler.enabled is False
+        assert profiler._sampler is None
+        assert profiler.phase("compute") is profiler.phase("encode")
+
+    def test_phases_per_route(self):
+        profiler = Profiler(interval=0.001)
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            with profiler.phase("compute"):
+                busy(0.002)
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        assert profiler.report()["routes"] == {}
+        profiler.start()
+        try:
+            client.get("/items/1")
+            client.get("/items/2")
+        finally:
+            profiler.stop()
+        route = profiler.report()["routes"]["/items/{item_id}"]
+        assert route["requests"] == 2
+        assert route["phases"]["compute"]["count"] == 2
+        assert route["phases"]["compute"]["meanMs"] >= 2.0
+        assert FRAMEWORK_PHASE in route["phases"]
+
+    def test_sampler_writes_collapsed_stacks(self, tmp_path):
+        profiler = Profiler(output_dir=str(tmp_path), interval=0.001)
+        profiler.start()
+        try:
+            busy(0.1)
+        finally:
+            profiler.stop()
+        assert profiler.samples > 0
+        files = profiler.write()
+        with open(files["stacks"]) as f:
+            lines = f.read().splitlines()
+        assert any("test_profiling:busy" in line for line in lines)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert os.path.exists(files["phases"])
+        profiler.reset()
+        assert profiler.report()["samples"] == 0
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from programs import MotionProgram, segment_profile
+
+HOME = [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+APPROACH = [-45.0, 50.0, 55.0, 0.0, 0.0, 0.0]
+PICK = [-45.0, 75.0, 55.0, 0.0, 35.0, 10.0]
+DROP_APPROACH = [45.0, 50.0, 55.0, 0.0, 0.0, 0.0]
+DROP = [45.0, 75.0, 55.0, 0.0, 35.0, -10.0]
+
+def pick_and_place(blend=True):
+    waypoints = [
+        {"angles": HOME, "duration": 0.7},
+        {"angles": APPROACH, "duration": 0.7},
+        {"angles": PICK, "duration": 0.7, "event": "pick", "dwell": 0.5},
+        {"angles": APPROACH, "duration": 0.7},
+        {"angles": HOME, "duration": 0.7},
+        {"angles": DROP_APPROACH, "duration": 0.7},
+        {"angles": DROP, "duration": 0.6, "event": "drop", "dwell": 0.5},
+        {"angles": DROP_APPROACH, "duration": 0.7},
+    ]
+    return MotionProgram("pick-and-place", waypoints, period=0.02, blend=blend)
+
+class TestSegmentProfile:
+    """Test suite for the normalized segment time scaling"""
+
+    def test_endpoints_and_monotonic(self):
+        u = np.linspace(-0.5, 1.5, 201)
+        s = segment_profile(u)
+        assert s[0] == 0.0
+        assert s[-1] == 1.0
+        assert np.all(np.diff(s) >= 0)
+        assert segment_profile(np.array([0.5]))[0] == pytest.approx(0.5)
+
+class TestMotionProgram:
+    """Test suite for compiled motion programs"""
+
+    def test_cycle_starts_and_ends_on_first_waypoint(self):
+        program = pick_and_place()
+        assert program.path[0].tolist() == HOME
+        assert program.path[-1].tolist() == HOME
+        assert len(program.times) == len(program.path)
+
+    def test_events_fire_on_exact_poses(self):
+        program = pick_and_place()
+        assert [event["event"] for event in program.events] == ["pick", "drop"]
+        pick, drop = program.events
+        assert np.allclose(program.path[pick["step"]], PICK)
+        assert np.allclose(program.path[drop["step"]], DROP)
+
+    def test_dwell_holds_pose(self):
+        program = pick_and_place()
+        pick = program.events[0]["step"]
+        held = program.path[pick:pick + int(0.5 / 0.02)]
+        assert np.allclose(held, PICK)
+
+    def test_blending_shortens_cycle(self):
+        blended = pick_and_place(blend=True)
+        stopped = pick_and_place(blend=False)
+        # Eight segments plus two dwells when stopping at every waypoint
+        assert stopped.cycle_duration == pytest.approx(0.7 * 7 + 0.6 + 1.0)
+        assert blended.cycle_duration < stopped.cycle_duration
+
+    def test_blended_path_stays_within_waypoint_bounds(self):
+        program = pick_and_place()
+        poses = np.array([HOME, APPROACH, PICK, DROP_APPROACH, DROP])
+        assert np.all(program.path >= poses.min(axis=0) - 1e-9)
+        assert np.all(program.path <= poses.max(axis=0) + 1e-9)
+
+    def test_velocity_is_continuous(self):
+        program = pick_and_place()
+        velocity = np.diff(program.path, axis=0) / 0.02
+        jumps = np.abs(np.diff(velocity, axis=0))
+        assert jumps.max() < 20.0
+
+    def test_invalid_programs(self):
+        with pytest.raises(ValueError):
+            MotionProgram("short", [{"angles": HOME, "duration": 1.0}], period=0.02)
+        with pytest.raises(ValueError):
+            MotionProgram("zero", [{"angles": HOME, "duration": 0}, {"angles": PICK, "duration": 1}], period=0.02)
+        with pytest.raises(ValueError):
+            MotionProgram("event", [{"angles": HOME, "duration": 1, "event": "weld"}, {"angles": PICK, "duration": 1}], period=0.02)
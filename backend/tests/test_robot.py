@@ -1,4 +1,10 @@
-from robot import RobotArm
+import asyncio
+import threading
+import numpy as np
+import pytest
+from collision import CollisionChecker
+from metrics import STOP_LATENCY_BUCKETS, Histogram
+from robot import RobotArm, MotionExecutor, VersionConflict
 
 class TestRobotArm:
     """Test suite for RobotArm class"""
@@ -21,4 +27,284 @@ class TestRobotArm:
         assert robot.isStopped is False
         assert robot.currentAngles == [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
         assert robot.homeAngles == [0.0, 30.0, 55.0, 0.0, 0.0, 0.0]
-    
\ No newline at end of file
+    
+
+class TestStateVersioning:
+    """Test suite for the lock-protected, versioned robot state"""
+
+    def test_version_bumps_on_change_only(self):
+        robot = RobotArm()
+        version = robot.version
+        robot.isPaused = True
+        assert robot.version == version + 1
+        robot.isPaused = True
+        assert robot.version == version + 1
+        assert robot.snapshot()["version"] == robot.version
+
+    def test_update_is_atomic(self):
+        robot = RobotArm()
+        changes = []
+        robot.subscribe(lambda _, fields: changes.append(fields))
+        state = robot.update(isEmergencyMode=True, isMoving=True, currentAngles=[1, 2, 3, 4, 5, 6])
+        assert changes == [("isEmergencyMode", "isMoving", "currentAngles")]
+        assert state is robot.snapshot()
+        assert state["isEmergencyMode"] is True
+        assert state["currentAngles"] == [1, 2, 3, 4, 5, 6]
+
+    def test_expected_version_conflict(self):
+        robot = RobotArm()
+        version = robot.version
+        robot.isEmergencyMode = True
+        with pytest.raises(VersionConflict):
+            robot.update(expected_version=version, currentAngles=[0, 0, 0, 0, 0, 0])
+        assert robot.currentAngles == robot.homeAngles
+        robot.update(expected_version=robot.version, currentAngles=[0, 0, 0, 0, 0, 0])
+        assert robot.currentAngles == [0, 0, 0, 0, 0, 0]
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(AttributeError):
+            RobotArm().update(joint_limits={})
+
+    def test_snapshot_unaffected_by_caller_lists(self):
+        robot = RobotArm()
+        angles = [10.0, 20.0, 30.0, 0.0, 0.0, 0.0]
+        robot.currentAngles = angles
+        angles[0] = 99.0
+        assert robot.snapshot()["currentAngles"][0] == 10.0
+
+    def test_readers_never_see_torn_updates(self):
+        robot = RobotArm()
+        stop = threading.Event()
+        torn = []
+
+        def writer(offset):
+            value = offset
+            while not stop.is_set():
+                value += 1
+                robot.update(currentAngles=[value] * 6, homeAngles=[value] * 6)
+
+        writers = [threading.Thread(target=writer, args=(offset * 1000000,)) for offset in range(4)]
+        for thread in writers:
+            thread.start()
+        last_version = 0
+        for _ in range(20000):
+            state = robot.snapshot()
+            if state["currentAngles"] != state["homeAngles"] or state["version"] < last_version:
+                torn.append(state)
+            last_version = state["version"]
+        stop.set()
+        for thread in writers:
+            thread.join()
+        assert torn == []
+
+
+class TestMotionExecutor:
+    """Test suite for the server-side MotionExecutor"""
+
+    def test_plan_one_waypoint_per_tick(self):
+        executor = MotionExecutor(RobotArm(), control_rate=50.0)
+        path = executor.plan([0, 0, 0, 0, 0, 0], [10, 20, 30, 40, 50, 60], 0.5)
+        assert path.shape == (25, 6)
+        assert path[-1].tolist() == [10, 20, 30, 40, 50, 60]
+
+    @pytest.mark.asyncio
+    async def test_move_reaches_target(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        target = [10.0, 20.0, 30.0, 0.0, 0.0, 0.0]
+        move = executor.start(target, 0.05)
+        await move.task
+        assert move.status == "completed"
+        assert robot.currentAngles == target
+        assert robot.isMoving is False
+
+    @pytest.mark.asyncio
+    async def test_move_uses_planned_path_from_its_start(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        target = [10.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        path = executor.plan(robot.currentAngles, target, 0.05)
+        move = executor.start(target, 0.05, path=path)
+        await move.task
+        assert move.totalSteps == len(path)
+        assert robot.currentAngles == target
+        # The arm is moved before the move begins: it is planned again from where the arm is
+        back = executor.plan(target, robot.homeAngles, 0.05)
+        move = executor.start(robot.homeAngles, 0.05, path=back)
+        robot.currentAngles = [20.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        seen = []
+        robot.subscribe(lambda robot, fields: "currentAngles" in fields and seen.append(robot.currentAngles[0]))
+        await move.task
+        assert robot.currentAngles == robot.homeAngles
+        # The stale path would have jumped back to at most 10 degrees on the first tick
+        assert seen[0] > 10.0
+
+    @pytest.mark.asyncio
+    async def test_move_aborts_on_stop(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        move = executor.start([90.0, 30.0, 55.0, 0.0, 0.0, 0.0], 1.0)
+        await asyncio.sleep(0.02)
+        robot.isStopped = True
+        await move.task
+        assert move.status == "stopped"
+        assert 0 < robot.currentAngles[0] < 90.0
+
+    @pytest.mark.asyncio
+    async def test_move_holds_while_paused(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        robot.isPaused = True
+        move = executor.start([10.0, 30.0, 55.0, 0.0, 0.0, 0.0], 0.05)
+        await asyncio.sleep(0.05)
+        assert move.status == "waiting"
+        assert robot.currentAngles == robot.homeAngles
+        robot.isPaused = False
+        await move.task
+        assert move.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_move_replans_after_manual_intervention(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        target = [10.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        robot.isPaused = True
+        move = executor.start(target, 0.05)
+        await asyncio.sleep(0.02)
+        manual = executor.start([-20.0, 30.0, 55.0, 0.0, 0.0, 0.0], 0.02, manual=True)
+        await manual.task
+        robot.isPaused = False
+        await move.task
+        assert manual.status == "completed"
+        assert move.status == "completed"
+        assert robot.currentAngles == target
+
+    @pytest.mark.asyncio
+    async def test_replan_is_collision_checked(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0, collision_checker=CollisionChecker())
+        target = [-152.9, -61.3, -128.3, -218.3, 70.7, -209.0]
+        moved = [-57.6, -63.1, 43.6, -107.4, 82.3, 277.2]
+        robot.isPaused = True
+        move = executor.start(target, None)
+        await asyncio.sleep(0.02)
+        # Moved by hand while held: the straight path from here to the target runs through the right bin
+        robot.currentAngles = moved
+        robot.isPaused = False
+        await move.task
+        assert move.status == "failed"
+        assert "rightBinFront" in move.message
+        assert robot.currentAngles == moved
+        assert robot.isMoving is False
+
+    @pytest.mark.asyncio
+    async def test_checked_replan_completes(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0, collision_checker=CollisionChecker())
+        target = [10.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        robot.isPaused = True
+        move = executor.start(target, 0.05)
+        await asyncio.sleep(0.02)
+        robot.currentAngles = [-20.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        robot.isPaused = False
+        await move.task
+        assert move.status == "completed"
+        assert robot.currentAngles == target
+
+    @pytest.mark.asyncio
+    async def test_new_move_cancels_previous(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        first = executor.start([90.0, 30.0, 55.0, 0.0, 0.0, 0.0], 1.0)
+        await asyncio.sleep(0.01)
+        second = executor.start([0.0, 0.0, 0.0, 0.0, 0.0, 0.0], 0.02)
+        await second.task
+        assert first.status == "cancelled"
+        assert robot.currentAngles == [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_follow_plays_path(self):
+        robot = RobotArm()
+        executor = MotionExecutor(robot, control_rate=200.0)
+        path = np.linspace([5.0, 30.0, 55.0, 0.0, 0.0, 0.0], [20.0, 30.0, 55.0, 0.0, 0.0, 0.0], 10)
+        seen = []
+        robot.subscribe(lambda robot, fields: seen.append(robot.currentAngles[0]))
+        move = executor.follow(path)
+        await move.task
+        assert move.status == "completed"
+        assert robot.currentAngles == path[-1].tolist()
+        assert set(path[:, 0].tolist()) <= set(seen)
+
+    @pytest.mark.asyncio
+    async def test_stop_interrupts_tick_wait(self):
+        # At 2 Hz a move only notices a stop within the tick if the write wakes it
+        robot = RobotArm()
+        latency = Histogram(STOP_LATENCY_BUCKETS)
+        executor = MotionExecutor(robot, control_rate=2.0, stop_latency=latency)
+        move = executor.start([90.0, 30.0, 55.0, 0.0, 0.0, 0.0], 5.0)
+        await asyncio.sleep(0.05)
+        robot.isStopped = True
+        await asyncio.wait_for(move.task, 0.1)
+        assert move.status == "stopped"
+        assert latency.count == 1
+        assert latency.max < 0.05
+
+    @pytest.mark.asyncio
+    async def test_emergency_from_another_thread(self):
+        robot = RobotArm()
+        latency = Histogram(STOP_LATENCY_BUCKETS)
+        executor = MotionExecutor(robot, control_rate=2.0, stop_latency=latency)
+        move = executor.start([90.0, 30.0, 55.0, 0.0, 0.0, 0.0], 5.0)
+        await asyncio.sleep(0.05)
+        writer = threading.Thread(target=setattr, args=(robot, "isEmergencyMode", True))
+        writer.start()
+        writer.join()
+        await asyncio.sleep(0.05)
+        assert move.status == "waiting"
+        assert latency.count == 1
+        executor.cancel()
+
+    @pytest.mark.asyncio
+    async def test_manual_move_not_interrupted_by_hold(self):
+        robot = RobotArm()
+        latency = Histogram(STOP_LATENCY_BUCKETS)
+        executor = MotionExecutor(robot, control_rate=200.0, stop_latency=latency)
+        target = [10.0, 30.0, 55.0, 0.0, 0.0, 0.0]
+        move = executor.start(target, 0.1, manual=True)
+        await asyncio.sleep(0.02)
+        robot.isPaused = True
+        await move.task
+        assert move.status == "completed"
+        assert robot.currentAngles == target
+        assert latency.count == 0
+
+    def test_follow_rejects_out_of_limits(self):
+        executor = MotionExecutor(RobotArm(), control_rate=200.0)
+        with pytest.raises(ValueError):
+            executor.follow([[0.0, 100.0, 0.0, 0.0, 0.0, 0.0]])
+
+
+class TestJointLimits:
+    """Test suite for the vectorized joint-limit checks"""
+
+    def test_limit_arrays_match_dict(self):
+        robot = RobotArm()
+        assert robot.lower_limits.tolist() == [robot.joint_limits[i][0] for i in range(6)]
+        assert robot.upper_limits.tolist() == [robot.joint_limits[i][1] for i in range(6)]
+
+    def test_trajectory_within_limits(self):
+        robot = RobotArm()
+        trajectory = np.linspace([0, 0, 0, 0, 0, 0], [170, 75, 55, 290, 110, -290], 100)
+        assert robot.first_limit_violation(trajectory) is None
+
+    def test_first_violation_reported(self):
+        robot = RobotArm()
+        trajectory = np.zeros((50, 6))
+        trajectory[30, 4] = 121
+        trajectory[40, 1] = -90
+        assert robot.first_limit_violation(trajectory) == (30, 4)
+
+    def test_single_pose(self):
+        robot = RobotArm()
+        assert robot.within_limits([0, 0, 0, 0, 0, 0]) is True
+        assert robot.within_limits([0, 0, 61, 0, 0, 0]) is False
@@ -0,0 +1,74 @@
+import pytest
+from robot import RobotArm
+from simulation import PRESET_POSITIONS, Bins, PickAndPlaceSimulation, program_waypoints
+
+class TestBins:
+    """Test suite for the bin transfer rules"""
+
+    def test_transfer_pairs(self):
+        bins = Bins(left=1, right=1)
+        assert bins.transfer_pair("left-to-right") == ("left", "right")
+        assert bins.transfer_pair("right-to-left") == ("right", "left")
+        assert bins.transfer_pair("bidirectional") == ("left", "right")
+        bins.pickup("left")
+        assert bins.transfer_pair("left-to-right") == (None, None)
+        assert bins.transfer_pair("bidirectional") == ("right", "left")
+
+    def test_empty_bin(self):
+        with pytest.raises(RuntimeError):
+            Bins(left=0).pickup("left")
+        with pytest.raises(ValueError):
+            Bins().transfer_pair("diagonal")
+
+
+class TestPickAndPlaceSimulation:
+    """Test suite for the headless pick-and-place simulation"""
+
+    def test_left_to_right_empties_left_bin(self):
+        simulation = PickAndPlaceSimulation("left-to-right")
+        report = simulation.run()
+        assert report["cycles"] == 5
+        assert report["bins"] == {"left": 0, "right": 5}
+        assert report["cyclesPerHour"] == pytest.approx(3600.0 / report["meanCycleTime"])
+
+    def test_right_to_left_has_nothing_to_move(self):
+        report = PickAndPlaceSimulation("right-to-left").run()
+        assert report["cycles"] == 0
+        assert report["cyclesPerHour"] == 0.0
+
+    def test_bidirectional_runs_until_limit(self):
+        report = PickAndPlaceSimulation("bidirectional").run(max_cycles=20)
+        assert report["cycles"] == 20
+        assert sum(report["bins"].values()) == 5
+
+    def test_cycle_time_matches_program(self):
+        simulation = PickAndPlaceSimulation("left-to-right", cycle_delay=1.0)
+        simulation.cycle()
+        program = simulation.programs["left-to-right"]
+        # Home is intermediate1, so the approach move is a single tick
+        expected = (len(program.path) + 1) * simulation.period + 1.0
+        assert simulation.clock == pytest.approx(expected)
+        assert simulation.robot.currentAngles == PRESET_POSITIONS["intermediate1"]
+
+    def test_blending_raises_throughput(self):
+        blended = PickAndPlaceSimulation("left-to-right").run()
+        stepwise = PickAndPlaceSimulation("left-to-right", blend=False).run()
+        assert blended["cyclesPerHour"] > stepwise["cyclesPerHour"]
+
+    def test_faster_than_real_time(self):
+        report = PickAndPlaceSimulation("bidirectional").run(max_duration=3600.0)
+        assert report["virtualTime"] >= 3600.0
+        assert report["wallTime"] < 5.0
+
+    def test_reused_robot_keeps_listeners(self):
+        robot = RobotArm()
+        listeners = len(robot._listeners)
+        for _ in range(5):
+            PickAndPlaceSimulation("left-to-right", robot=robot).run(max_cycles=1)
+        assert len(robot._listeners) == listeners
+
+    def test_custom_poses(self):
+        waypoints = program_waypoints(PRESET_POSITIONS, "left", "right")
+        assert [waypoint.get("event") for waypoint in waypoints].count("pick") == 1
+        with pytest.raises(ValueError):
+            PickAndPlaceSimulation("left-to-right", positions={"leftBinPick": [0, 0, 90, 0, 0, 0]}).run()
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import api
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Budgets for one fresh worker process; today's figures are about 1.3 s and 70 MB on a slow CI runner
+IMPORT_TIME_BUDGET = 4.0  # seconds
+RSS_BUDGET = 160.0        # MiB, after the warm-up
+# Measured in a fresh interpreter, so nothing imported by the test session skews the numbers
+PROBE = """
+import json, sys, time
+def rss():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+started = time.perf_counter()
+import api
+imported = time.perf_counter() - started
+result = {"importTime": imported, "importRss": rss(), "modules": sorted(sys.modules)}
+result["warmUp"] = api.warm_up()
+result["warmRss"] = rss()
+print(json.dumps(result))
+"""
+
+def probe():
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+@pytest.mark.startup_budget
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="Reads the resident memory from /proc")
+class TestStartupBudget:
+    """Import time and resident memory of a fresh worker; opt-in, as the figures depend on the host"""
+
+    result = None
+
+    def setup_method(self):
+        if TestStartupBudget.result is None:
+            TestStartupBudget.result = probe()
+
+    def test_import_time(self):
+        assert self.result["importTime"] < IMPORT_TIME_BUDGET
+
+    def test_resident_memory(self):
+        assert self.result["importRss"] <= self.result["warmRss"] < RSS_BUDGET
+
+    def test_lazy_imports(self):
+        # Only the development entry point and the warm-up need these
+        assert "uvicorn" not in self.result["modules"]
+        assert "simulation" not in self.result["modules"]
+
+    def test_warm_up_plans_presets(self):
+        # Five distinct preset poses, every ordered pair
+        assert self.result["warmUp"]["plans"] == 20
+
+class TestWarmUpHook:
+    """The warm-up runs at startup only when YANIBOT_WARMUP is set"""
+
+    def run_lifespan(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(api, "warm_up", lambda: calls.append(True))
+        with TestClient(api.app):
+            pass
+        return calls
+
+    def test_off_by_default(self, monkeypatch):
+        monkeypatch.delenv("YANIBOT_WARMUP", raising=False)
+        assert self.run_lifespan(monkeypatch) == []
+
+    def test_enabled(self, monkeypatch):
+        monkeypatch.setenv("YANIBOT_WARMUP", "1")
+        assert self.run_lifespan(monkeypatch) == [True]
@@ -0,0 +1,153 @@
+import itertools
+import time
+import numpy as np
+import orjson
+import pytest
+from robot import RobotArm
+from telemetry import MATRIX_COLUMNS, TelemetryRecorder, as_matrix, decode_flags, iter_ndjson, replay_path
+
+def fake_clock():
+    ticks = itertools.count(1)
+    return lambda: float(next(ticks))
+
+class TestTelemetryRecorder:
+    """Test suite for the telemetry ring buffer"""
+
+    def test_records_one_sample_per_version(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=16, clock=fake_clock())
+        robot.currentAngles = [1, 2, 3, 4, 5, 6]
+        robot.isPaused = True
+        recorder.record()
+        samples = recorder.samples()
+        assert len(samples) == 3
+        assert np.diff(samples["version"]).tolist() == [1, 1]
+        assert samples["angles"][-1].tolist() == [1, 2, 3, 4, 5, 6]
+        assert decode_flags(samples["flags"][-1])["isPaused"] is True
+
+    def test_ring_wraps_oldest_first(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=4, clock=fake_clock())
+        for step in range(1, 10):
+            robot.currentAngles = [step, 0, 0, 0, 0, 0]
+        samples = recorder.samples()
+        assert recorder.count == 4
+        assert samples["time"].tolist() == [7.0, 8.0, 9.0, 10.0]
+        assert samples["angles"][:, 0].tolist() == [6, 7, 8, 9]
+
+    def test_buffer_grows_to_capacity(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=1000, clock=fake_clock())
+        assert len(recorder.buffer) == 256
+        for step in range(1, 300):
+            robot.currentAngles = [step, 0, 0, 0, 0, 0]
+        assert len(recorder.buffer) == 512
+        assert recorder.samples()["angles"][:, 0].tolist()[-3:] == [297, 298, 299]
+        for step in range(300, 2500):
+            robot.currentAngles = [step, 0, 0, 0, 0, 0]
+        samples = recorder.samples()
+        assert len(recorder.buffer) == 1000
+        assert samples["angles"][:, 0].tolist() == list(range(1500, 2500))
+        assert (np.diff(samples["time"]) > 0).all()
+
+    def test_time_range(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=8, clock=fake_clock())
+        for step in range(1, 6):
+            robot.currentAngles = [step, 0, 0, 0, 0, 0]
+        assert recorder.samples(start=3, end=5)["time"].tolist() == [3.0, 4.0, 5.0]
+        assert len(recorder.samples(start=100)) == 0
+
+    def test_memmap_resumes(self, tmp_path):
+        path = str(tmp_path / "arm.telemetry")
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=4, path=path, clock=fake_clock())
+        for step in range(1, 6):
+            robot.currentAngles = [step, 0, 0, 0, 0, 0]
+        recorder.close()
+        resumed = TelemetryRecorder(RobotArm(), capacity=4, path=path, clock=lambda: 100.0)
+        samples = resumed.samples()
+        assert samples["time"].tolist() == [4.0, 5.0, 6.0, 100.0]
+        assert resumed.info()["count"] == 4
+
+    def test_memmap_creates_directory(self, tmp_path):
+        path = str(tmp_path / "missing" / "arm.telemetry")
+        recorder = TelemetryRecorder(RobotArm(), capacity=4, path=path)
+        assert len(recorder.samples()) == 1
+        recorder.close()
+
+    def test_memmap_other_capacity_moved_aside(self, tmp_path):
+        path = str(tmp_path / "arm.telemetry")
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=4, path=path, clock=fake_clock())
+        robot.currentAngles = [1, 0, 0, 0, 0, 0]
+        recorder.close()
+        with open(path, "rb") as f:
+            recorded = f.read()
+        with pytest.warns(RuntimeWarning, match="moved it to"):
+            resized = TelemetryRecorder(RobotArm(), capacity=8, path=path, clock=lambda: 100.0)
+        assert resized.samples()["time"].tolist() == [100.0]
+        with open(path + ".bak", "rb") as f:
+            assert f.read() == recorded
+
+    def test_close_stops_recording(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=8)
+        recorder.close()
+        robot.currentAngles = [1, 2, 3, 4, 5, 6]
+        assert len(recorder.samples()) == 1
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            TelemetryRecorder(RobotArm(), capacity=0)
+
+    def test_recording_overhead(self):
+        robot = RobotArm()
+        recorder = TelemetryRecorder(robot, capacity=1024)
+        start = time.perf_counter()
+        for step in range(2000):
+            robot.currentAngles = [step % 90, 0, 0, 0, 0, 0]
+        with_recorder = time.perf_counter() - start
+        recorder.close()
+        start = time.perf_counter()
+        for step in range(2000):
+            robot.currentAngles = [step % 90, 0, 0, 0, 0, 0]
+        without_recorder = time.perf_counter() - start
+        # Generous bound, the point is that recording is not a multiple of the state write itself
+        assert with_recorder < without_recorder * 5 + 0.05
+
+class TestTelemetryFormats:
+    """Tests for the matrix, NDJSON and replay forms of a recording"""
+
+    def setup_method(self):
+        robot = RobotArm()
+        self.recorder = TelemetryRecorder(robot, capacity=16, clock=fake_clock())
+        robot.update(currentAngles=[10, 0, 0, 0, 0, 0], isMoving=True)
+        robot.update(currentAngles=[20, 0, 0, 0, 0, 0], isMoving=False)
+        self.samples = self.recorder.samples()
+
+    def test_as_matrix(self):
+        matrix = as_matrix(self.samples)
+        assert matrix.shape == (3, len(MATRIX_COLUMNS))
+        assert matrix[:, 0].tolist() == [1.0, 2.0, 3.0]
+        assert matrix[:, 1].tolist() == [0.0, 10.0, 20.0]
+        assert matrix[:, 7].tolist() == [0.0, 1.0, 0.0]
+        assert matrix[:, 8].tolist() == self.samples["version"].astype(float).tolist()
+
+    def test_ndjson(self):
+        lines = b"".join(iter_ndjson(self.samples, chunk_size=2)).splitlines()
+        records = [orjson.loads(line) for line in lines]
+        assert [record["version"] for record in records] == self.samples["version"].tolist()
+        assert records[1]["isMoving"] is True
+        assert records[2]["currentAngles"] == [20.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+    def test_replay_holds_samples(self):
+        path = replay_path(self.samples, period=0.5)
+        assert path[:, 0].tolist() == [0.0, 0.0, 10.0, 10.0, 20.0]
+        assert len(replay_path(self.samples, period=0.5, speed=2.0)) == 3
+
+    def test_replay_invalid(self):
+        with pytest.raises(ValueError):
+            replay_path(self.samples[:0], period=0.02)
+        with pytest.raises(ValueError):
+            replay_path(self.samples, period=0.02, speed=0)
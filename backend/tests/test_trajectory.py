@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from robot import RobotArm
+from trajectory import trapezoidal_profile
+
+class TestTrapezoidalProfile:
+    """Test suite for time-optimal trajectory generation"""
+
+    def setup_method(self):
+        self.robot = RobotArm()
+
+    def profile(self, start, target, period=0.01):
+        return trapezoidal_profile(start, target, self.robot.max_velocity, self.robot.max_acceleration, period)
+
+    def test_endpoints_exact(self):
+        start = [0, 30, 55, 0, 0, 0]
+        target = [-45, 75, 55, 0, 35, 10]
+        times, path = self.profile(start, target)
+        assert times[0] == 0
+        assert path[0].tolist() == start
+        assert path[-1].tolist() == target
+        assert np.all(np.diff(times) > 0)
+
+    def test_respects_velocity_and_acceleration_limits(self):
+        start = np.zeros(6)
+        target = np.array([170, 60, -150, 280, 110, -290])
+        times, path = self.profile(start, target, period=0.001)
+        velocity = np.diff(path, axis=0) / np.diff(times)[:, None]
+        acceleration = np.diff(velocity, axis=0) / np.diff(times)[1:, None]
+        assert np.all(np.abs(velocity) <= self.robot.max_velocity * 1.001)
+        assert np.all(np.abs(acceleration[:-1]) <= self.robot.max_acceleration * 1.01)
+
+    def test_long_move_reaches_cruise_speed(self):
+        times, path = self.profile([0, 0, 0, 0, 0, 0], [180, 0, 0, 0, 0, 0], period=0.001)
+        # 180 deg at 100 deg/s and 200 deg/s^2: 0.5 s ramps + 1.3 s cruise
+        assert times[-1] == pytest.approx(2.3)
+        peak = np.max(np.abs(np.diff(path[:, 0]) / np.diff(times)))
+        assert peak == pytest.approx(100.0, rel=1e-3)
+
+    def test_short_move_is_triangular(self):
+        times, _ = self.profile([0, 0, 0, 0, 0, 0], [2, 0, 0, 0, 0, 0])
+        # Triangular profile: T = 2 * sqrt(d / a)
+        assert times[-1] == pytest.approx(2 * np.sqrt(2 / 200.0))
+
+    def test_short_moves_are_not_oversampled(self):
+        times, path = self.profile([0, 30, 55, 0, 0, 0], [5, 30, 55, 0, 0, 0], period=0.05)
+        assert len(path) < 30
+
+    def test_no_motion(self):
+        times, path = self.profile([1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 6])
+        assert times.tolist() == [0.0]
+        assert path.tolist() == [[1, 2, 3, 4, 5, 6]]
+
+    def test_invalid_period(self):
+        with pytest.raises(ValueError):
+            self.profile([0] * 6, [1] * 6, period=0)
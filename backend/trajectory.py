@@ -0,0 +1,60 @@
+# backend/trajectory.py
+import numpy as np
+
+
+def trapezoidal_profile(startAngles, targetAngles, max_velocity, max_acceleration, period=0.05):
+    """
+    Time-optimal synchronized trapezoidal trajectory between two poses.
+
+    All joints follow the same normalized profile s(t) from 0 to 1, so they
+    start and stop together and the path stays a straight line in joint space.
+    The profile's peak speed and acceleration are limited by whichever joint
+    reaches its own velocity or acceleration limit first. If the move is too
+    short to reach cruise speed, the profile is triangular.
+
+    Args:
+        startAngles (list of float): Starting joint angles in degrees.
+        targetAngles (list of float): Target joint angles in degrees.
+        max_velocity (array-like): Per-joint velocity limits in degrees per second.
+        max_acceleration (array-like): Per-joint acceleration limits in degrees per second squared.
+        period (float): Sampling period in seconds.
+
+    Returns:
+        tuple: (times, path) where times is a (n,) array of seconds from the start and path is the (n, 6) array
+        of joint angles. The first sample is the start pose and the last sample is exactly the target pose.
+    """
+    if period <= 0:
+        raise ValueError("Sampling period must be positive")
+    start = np.asarray(startAngles, dtype=np.float64)
+    target = np.asarray(targetAngles, dtype=np.float64)
+    delta = target - start
+    distance = np.abs(delta)
+    moving = distance > 1e-9
+    if not moving.any():
+        return np.zeros(1), target[None, :].copy()
+
+    # Normalized limits: how fast s may change before some joint exceeds its own limit
+    velocity = np.min(np.asarray(max_velocity, dtype=np.float64)[moving] / distance[moving])
+    acceleration = np.min(np.asarray(max_acceleration, dtype=np.float64)[moving] / distance[moving])
+    if velocity * velocity >= acceleration:
+        # Triangular: reaches the midpoint before cruise speed
+        ramp = np.sqrt(1.0 / acceleration)
+        velocity = acceleration * ramp
+        duration = 2.0 * ramp
+    else:
+        ramp = velocity / acceleration
+        duration = 1.0 / velocity + ramp
+
+    times = np.append(np.arange(0.0, duration, period), duration)
+    s = np.where(
+        times < ramp,
+        0.5 * acceleration * times ** 2,
+        np.where(
+            times <= duration - ramp,
+            0.5 * acceleration * ramp ** 2 + velocity * (times - ramp),
+            1.0 - 0.5 * acceleration * (duration - times) ** 2,
+        ),
+    )
+    path = start + s[:, None] * delta
+    path[-1] = target
+    return times, path
@@ -2,6 +2,8 @@ class APIManager {
     constructor() {
         this.baseURL = window.ENV.BACKEND_URL;
         if (!this.baseURL) throw new Error("Backend URL is not defined in environment configuration");
+        this.stream = null;
+        this.streamState = null; // Latest state pushed by the backend, null while the stream is down
     }
 
     async init() {
@@ -11,6 +13,7 @@ class APIManager {
             const data = await response.json();
             console.log('init response:', data);
             if (!response.ok) throw new Error(`Backend not reachable: ${response.status}`);
+            this.openStateStream();
             return true;
         } catch (error) {
             console.error('❌ Failed to connect to backend:', error.message);
@@ -18,7 +21,33 @@ class APIManager {
         }
     }
 
+    openStateStream() {
+        // Backend pushes every state change; getState() answers from it instead of polling /state
+        const url = this.baseURL.replace(/^http/, 'ws') + window.ENV.API_ENDPOINTS.STATE_STREAM;
+        try {
+            this.stream = new WebSocket(url);
+        } catch (error) {
+            console.warn('⚠️ State stream unavailable, falling back to polling:', error.message);
+            return;
+        }
+        this.stream.onmessage = (event) => {
+            this.streamState = JSON.parse(event.data);
+        };
+        this.stream.onerror = () => this.stream.close();
+        this.stream.onclose = () => {
+            this.stream = null;
+            this.streamState = null;
+            setTimeout(() => this.openStateStream(), 1000); // Reconnect
+        };
+    }
+
+    applyState(partial) {
+        // Reflect our own writes immediately instead of waiting for the next pushed snapshot
+        if (this.streamState && partial) Object.assign(this.streamState, partial);
+    }
+
     async getState() {
+        if (this.streamState) return { ...this.streamState };
         try {
             const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.STATE}`);
             const data = await response.json();
@@ -44,21 +73,6 @@ class APIManager {
         }
     }
 
-    async getInterpolatedPath(startAngles = null, targetAngles, steps = 20) {
-        const payload = startAngles
-            ? { startAngles: startAngles, targetAngles: targetAngles }
-            : { targetAngles: targetAngles };
-        const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.INTERPOLATE}?steps=${steps}`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(payload)
-        });
-        const data = await response.json();
-        if (window.LOG_OPTIONS.interpolatedPath) console.log('getInterpolatedPath response:', data);
-        if (!response.ok) throw new Error('Failed to fetch interpolated path');
-        return data.steps;
-    }
-
     async check_joint_limits(angles) {
         try {
             const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.LIMITS}`, {
@@ -92,6 +106,7 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.currentAngles) console.log('currentAngles response:', data);
             if (!response.ok) throw new Error('Failed to set joint angles');
+            this.applyState({ currentAngles: data.currentAngles });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set joint angles:', error.message);
@@ -109,6 +124,7 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.movingState) console.log('setMovingState response:', data);
             if (!response.ok) throw new Error('Failed to set moving state');
+            this.applyState({ isMoving: data.isMoving });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set moving state:', error.message);
@@ -126,6 +142,7 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.stopState) console.log('setStopState response:', data);
             if (!response.ok) throw new Error('Failed to set stop state');
+            this.applyState({ isStopped: data.isStopped });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set stop state:', error.message);
@@ -143,6 +160,7 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.pauseState) console.log('setPauseState response:', data);
             if (!response.ok) throw new Error('Failed to set pause state');
+            this.applyState({ isPaused: data.isPaused });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set pause state:', error.message);
@@ -160,6 +178,7 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.emergencyState) console.log('setEmergencyState response:', data);
             if (!response.ok) throw new Error('Failed to set emergency state');
+            this.applyState({ isEmergencyMode: data.isEmergencyMode });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set emergency state:', error.message);
@@ -177,10 +196,101 @@ class APIManager {
             const data = await response.json();
             if (window.LOG_OPTIONS.safetyMode) console.log('setSafetyMode response:', data);
             if (!response.ok) throw new Error('Failed to set safety mode');
+            this.applyState({ isSafetyMode: data.isSafetyMode });
             return data;
         } catch (error) {
             console.warn('⚠️ Failed to set safety mode:', error.message);
             return null;
         }
     }
-}
\ No newline at end of file
+
+    async sendCommands(commands, expectedVersion = null) {
+        // Apply several state changes as one atomic update, e.g. [{ command: 'pause', value: true }, { command: 'moving', value: false }]
+        try {
+            const payload = { commands: commands };
+            if (expectedVersion !== null) payload.expectedVersion = expectedVersion;
+            const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.COMMANDS}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+            const data = await response.json();
+            if (window.LOG_OPTIONS.commands) console.log('sendCommands response:', data);
+            if (!response.ok) throw new Error('Failed to apply commands');
+            this.applyState(data.state);
+            return data;
+        } catch (error) {
+            console.warn('⚠️ Failed to apply commands:', error.message);
+            return null;
+        }
+    }
+
+    async startMove(targetAngles, duration = 2000, startAngles = null, manualIntervention = false) {
+        try {
+            const payload = { targetAngles: targetAngles, duration: duration, manualIntervention: manualIntervention };
+            if (startAngles) payload.startAngles = startAngles;
+            const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.MOVE}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+            const data = await response.json();
+            if (window.LOG_OPTIONS.move) console.log('startMove response:', data);
+            if (!response.ok) throw new Error('Failed to start move');
+            return data;
+        } catch (error) {
+            console.warn('⚠️ Failed to start move:', error.message);
+            return null;
+        }
+    }
+
+    async getMove(moveId) {
+        const streamed = this.streamState?.moves?.find(move => move.id === moveId);
+        if (streamed) {
+            return { ...streamed, currentAngles: this.streamState.currentAngles, isMoving: this.streamState.isMoving };
+        }
+        try {
+            const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.MOVE}/${moveId}`);
+            const data = await response.json();
+            if (!response.ok) throw new Error(`Backend error: ${response.status}`);
+            return data;
+        } catch (error) {
+            console.warn('⚠️ Failed to get move status:', error.message);
+            return null;
+        }
+    }
+
+    async defineProgram(name, waypoints) {
+        try {
+            const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.PROGRAMS}/${encodeURIComponent(name)}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ waypoints: waypoints })
+            });
+            const data = await response.json();
+            if (window.LOG_OPTIONS.move) console.log('defineProgram response:', data);
+            if (!response.ok) throw new Error('Failed to define program');
+            return data;
+        } catch (error) {
+            console.warn('⚠️ Failed to define program:', error.message);
+            return null;
+        }
+    }
+
+    async runProgram(name, cycles = null) {
+        try {
+            const response = await fetch(`${this.baseURL}${window.ENV.API_ENDPOINTS.PROGRAMS}/${encodeURIComponent(name)}/run`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(cycles ? { cycles: cycles } : {})
+            });
+            const data = await response.json();
+            if (window.LOG_OPTIONS.move) console.log('runProgram response:', data);
+            if (!response.ok) throw new Error('Failed to run program');
+            return data;
+        } catch (error) {
+            console.warn('⚠️ Failed to run program:', error.message);
+            return null;
+        }
+    }
+}
@@ -13,10 +13,14 @@ class AutomationManager {
         this.targetBin = null;
         this.stepAutomation = null;
         this.positions = this.getPresetPositions();
+        this.programs = new Set(); // Motion programs already defined on the backend
     }
 
     async init() {
-        await this.binManager.init();
+        // The backend keeps the bin counts across restarts; fall back to a fresh scene if it is unreachable
+        const state = await this.api.getState();
+        await this.binManager.init({ left: state?.leftBinCount ?? 5, right: state?.rightBinCount ?? 0 });
+        if (this.ui && this.ui.updateBinCounts) this.ui.updateBinCounts();
         console.log("✅ Automation Manager initialized");
     }
 
@@ -61,47 +65,27 @@ class AutomationManager {
 
     async pickAndPlace(sourceBin, targetBin) {
         try {
-            // Define all key positions
-            const approachPos = this.positions[`${sourceBin}BinApproach`];
-            const pickPos = this.positions[`${sourceBin}BinPick`];
-            const liftPos = this.positions[`${sourceBin}BinLift`];
-            const dropApproachPos = this.positions[`${targetBin}BinApproach`];
-            const dropPos = this.positions[`${targetBin}BinDrop`];
-            const dropLiftPos = this.positions[`${targetBin}BinLift`];
-
-            // 1. Move to pick position (home → approach → pick)
-            this.stepAutomation = 'intermediate1';
-            await this.robot.moveTo(null, this.positions.intermediate1, 700);
-            this.stepAutomation = 'approach';
-            await this.robot.moveTo(null, approachPos, 700);
-            this.stepAutomation = 'pick';
-            await this.robot.moveTo(null, pickPos, 700);
-
-            /// 2. Pick object
-            await this.robot.pickObject(sourceBin);
-
-            if (this.ui && this.ui.updateBinCounts) this.ui.updateBinCounts();
-
-            // 3. Move to drop position (pick → lift → intermediate → dropApproach → drop)
-            this.stepAutomation = 'lift';
-            await this.robot.moveTo(null, liftPos, 700);
-            this.stepAutomation = 'intermediate1';
-            await this.robot.moveTo(null, this.positions.intermediate1, 700);
-            this.stepAutomation = 'dropApproach';
-            await this.robot.moveTo(null, dropApproachPos, 700);
-            this.stepAutomation = 'drop';
-            await this.robot.moveTo(null, dropPos, 600);
-
-            // 4. Drop object
-            await this.robot.dropObject(targetBin);
-
-            if (this.ui && this.ui.updateBinCounts) this.ui.updateBinCounts();
+            // The whole cycle is compiled once per bin pair on the backend and replayed each time
+            const programName = await this.ensureProgram(sourceBin, targetBin);
+            const response = await this.api.runProgram(programName, 1);
+            if (!response || response.success === false) {
+                this.programs.delete(programName); // Redefine on the next cycle, e.g. after a backend restart
+                throw new Error(`Failed to run program ${programName}`);
+            }
 
-            // 5. Move back home (drop → dropLift → home)
-            this.stepAutomation = 'dropLift';
-            await this.robot.moveTo(null, dropLiftPos, 700);
-            this.stepAutomation = 'intermediate1';
-            await this.robot.moveTo(null, this.positions.intermediate1, 700);
+            const move = await this.robot.watchMove(response.move.id, async (event) => {
+                if (event.event === 'pick') {
+                    this.stepAutomation = 'pick';
+                    await this.robot.pickObject(sourceBin, false);
+                } else if (event.event === 'drop') {
+                    this.stepAutomation = 'drop';
+                    await this.robot.dropObject(targetBin, false);
+                }
+                const counts = this.binManager.getBinCounts();
+                await this.api.sendCommands([{ command: 'bins', left: counts.left, right: counts.right }]);
+                if (this.ui && this.ui.updateBinCounts) this.ui.updateBinCounts();
+            });
+            if (move.status !== 'completed') throw new Error(`Pick and place ${move.status}: ${move.message}`);
 
         } catch (error) {
             console.error('Pick and place failed:', error);
@@ -109,6 +93,31 @@ class AutomationManager {
         }
     }
 
+    async ensureProgram(sourceBin, targetBin) {
+        const name = `${sourceBin}-to-${targetBin}`;
+        if (this.programs.has(name)) return name;
+        const waypoints = this.buildProgramWaypoints(sourceBin, targetBin);
+        const response = await this.api.defineProgram(name, waypoints);
+        if (!response || response.success === false) throw new Error(`Failed to define program ${name}`);
+        this.programs.add(name);
+        return name;
+    }
+
+    buildProgramWaypoints(sourceBin, targetBin) {
+        // Same poses and timings as the former step-by-step moveTo sequence;
+        // the segment into intermediate1 closes the cycle from the drop lift pose
+        return [
+            { angles: this.positions.intermediate1, duration: 700 },
+            { angles: this.positions[`${sourceBin}BinApproach`], duration: 700 },
+            { angles: this.positions[`${sourceBin}BinPick`], duration: 700, event: 'pick', dwell: 500 },
+            { angles: this.positions[`${sourceBin}BinLift`], duration: 700 },
+            { angles: this.positions.intermediate1, duration: 700 },
+            { angles: this.positions[`${targetBin}BinApproach`], duration: 700 },
+            { angles: this.positions[`${targetBin}BinDrop`], duration: 600, event: 'drop', dwell: 500 },
+            { angles: this.positions[`${targetBin}BinLift`], duration: 700 },
+        ];
+    }
+
     getPresetPositions() {
         return {
             // change to become default ABB IRB6600 home position
@@ -5,18 +5,21 @@ class BinManager {
         this.rightBin = [];
     }
 
-    async init() {
-        // Example: create 5 spheres as objects
+    async init(counts = { left: 5, right: 0 }) {
+        // Example: create spheres as objects, as many per bin as the backend state holds
         this.leftBin = [];
-        for (let i = 0; i < 5; i++) {
-            const geometry = new THREE.SphereGeometry(0.05, 16, 16);
-            const material = new THREE.MeshStandardMaterial({ color: 0xff0000 });
-            const mesh = new THREE.Mesh(geometry, material);
-            mesh.position.set(Math.random(), 0, 0); // or wherever you want
-            this.leftBin.push(mesh);
-            if (this.scene) this.scene.add(mesh);
-        }
         this.rightBin = [];
+        for (let i = 0; i < counts.left; i++) this.leftBin.push(this.createObject());
+        for (let i = 0; i < counts.right; i++) this.rightBin.push(this.createObject());
+    }
+
+    createObject() {
+        const geometry = new THREE.SphereGeometry(0.05, 16, 16);
+        const material = new THREE.MeshStandardMaterial({ color: 0xff0000 });
+        const mesh = new THREE.Mesh(geometry, material);
+        mesh.position.set(Math.random(), 0, 0); // or wherever you want
+        if (this.scene) this.scene.add(mesh);
+        return mesh;
     }
 
     isEmpty(bin = null) {
@@ -17,6 +17,7 @@ window.ENV = {
     API_ENDPOINTS: {
         ROOT: '/',
         STATE: '/state',
+        STATE_STREAM: '/ws/state',
         RESET: '/reset',
         HEALTH: '/health',
         MOVING: '/moving',
@@ -27,6 +28,9 @@ window.ENV = {
         LIMITS: '/limits',
         EMERGENCY: '/emergency',
         SAFETY: '/safety',
+        COMMANDS: '/commands',
+        MOVE: '/move',
+        PROGRAMS: '/programs',
     },
     
     // Feature flags
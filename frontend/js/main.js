@@ -4,14 +4,15 @@ let app = {};
 window.LOG_OPTIONS = {
     state: true,
     reset: true,
-    interpolatedPath: true,
     jointLimits: true,
     movingState: true,
     currentAngles: true,
     stopState: true,
     pauseState: true,
     emergencyState: true,
-    safetyMode: true
+    safetyMode: true,
+    commands: true,
+    move: true
 };
 
 // Update loading status if available
@@ -155,9 +156,9 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     // === Log Options Checkbox Sync ===
     [
-        'state', 'reset', 'interpolatedPath', 'jointLimits',
+        'state', 'reset', 'jointLimits',
         'movingState', 'currentAngles', 'stopState', 'pauseState',
-        'emergencyState', 'safetyMode'
+        'emergencyState', 'safetyMode', 'move'
     ].forEach(key => {
         const checkbox = document.getElementById('log' + key.charAt(0).toUpperCase() + key.slice(1));
         if (checkbox) {
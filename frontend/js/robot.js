@@ -17,6 +17,7 @@ class RobotManager {
         this.api = APIManager;
         this.automation = null; // Will be set by AutomationManager
         this.RobotBuilderClass = RobotBuilderClass;
+        this.watchInterval = 50; // ms between move status checks
     }
     
     async init() {
@@ -53,124 +54,78 @@ class RobotManager {
     async moveTo(startAngles = null, targetAngles, duration = 2000, manualIntervention = false) {
         
         try {
-            if (startAngles === null) {
-                let state = await this.api.getState();
-                startAngles = state.currentAngles;
+            // The backend executor interpolates and steps the robot; we only start the move and watch it
+            const response = await this.api.startMove(targetAngles, duration, startAngles, manualIntervention);
+            if (!response) throw new Error('Failed to start move');
+            if (response.success === false) {
+                // Rejected by the joint limit or collision check before the robot moved
+                console.warn('❌ Move rejected:', response.message);
+                this.ui.showStatus(
+                    response.collision
+                        ? `Move would collide: ${response.collision.link} hits ${response.collision.obstacle}.`
+                        : 'Joints are at their limits. Movement would damage the robot.',
+                    'error'
+                );
+                return;
             }
-
-            let path = await this.api.getInterpolatedPath(startAngles, targetAngles, 30);
-            
-            await this.api.setMovingState(true);
             await this.ui.updateAutomationStatus();
 
-            // Animate visual robot
-            let i = 0;
-            while (i < path.length) {
-                if (!manualIntervention) {
-                    await this.waitWhilePaused();
-                    let state = await this.api.getState();
-                    let currentAngles = state.currentAngles;
-                    if (!this.arraysAlmostEqual(currentAngles, path[i])) {
-                        console.warn("Robot moved during pause, re-interpolating path...");
-                        if(currentAngles[1] > 50.0) {
-                            console.warn("Robot is too low, moving to safer position...");
-                            await this.moveToSaferPosition(currentAngles, duration);
-                            state = await this.api.getState();
-                            currentAngles = state.currentAngles;
-                        }
-                        // Recalculate path with current angles
-                        path = await this.api.getInterpolatedPath(currentAngles, targetAngles, 30);
-                        i = 0; // Reset index to start from the new path
-                        continue; // Restart the loop with the new path
-                    }
-                }
-                const limitCheck = await this.api.check_joint_limits(path[i]);
-                if (limitCheck && limitCheck.success === false) {
-                    console.warn('❌ Joint limit violation detected, stopping animation');
-                    this.ui.showStatus(
-                        'Joints are at their limits. Movement would damage the robot.',
-                        'error'
-                    );
-                    return;
-                }
-                this.setJointAngles(path[i]);
-                if (this.ui.updateJointDisplays) this.ui.updateJointDisplays(path[i]);
-                await this.api.setCurrentAngles(path[i]);
-                await this.sleep(duration / path.length); // Adjust sleep based on path length
-                i++;
-            }
+            const move = await this.watchMove(response.move.id);
+            if (move.status === 'stopped') throw new Error('Robot movement stopped');
+            if (move.status !== 'completed') throw new Error(`Robot movement ${move.status}: ${move.message}`);
 
             console.log('✅ Robot movement finished');
-            await this.api.setMovingState(false);
-            await this.ui.updateAutomationStatus();
             
         } catch (error) {
             console.error('❌ Robot movement failed:', error);
             throw error;
         } finally {
-            this.api.setMovingState(false);
             await this.ui.updateAutomationStatus();
         }
     }
 
+    async watchMove(moveId, onEvent = null) {
+        const terminal = ['completed', 'stopped', 'cancelled', 'failed'];
+        let lastStatus = null;
+        let lastEvent = null;
+        while (true) {
+            const move = await this.api.getMove(moveId);
+            if (!move) throw new Error(`Lost track of move ${moveId}`);
+            this.setJointAngles(move.currentAngles);
+            if (this.ui.updateJointDisplays) this.ui.updateJointDisplays(move.currentAngles);
+            if (move.status !== lastStatus) {
+                if (move.status === 'waiting') console.warn('⏸️ Move held by pause, emergency or safety mode...');
+                this.ui.updateAutomationStatus();
+                lastStatus = move.status;
+            }
+            const eventKey = move.lastEvent ? JSON.stringify(move.lastEvent) : null;
+            if (onEvent && eventKey && eventKey !== lastEvent) {
+                lastEvent = eventKey;
+                await onEvent(move.lastEvent);
+            }
+            if (terminal.includes(move.status)) return move;
+            await this.sleep(this.watchInterval);
+        }
+    }
+
     async moveToSaferPosition(startAngles, duration = 2000, manualIntervention = false) {
         console.log('🤖 Moving robot to safer position...');
 
         try {
             let saferAngles = [...startAngles];
             saferAngles[1] = 45;
-            let pathSafer = await this.api.getInterpolatedPath(startAngles, saferAngles, 30);
-            await this.api.setMovingState(true);
-            await this.ui.updateAutomationStatus();
-            // Animate visual robot
-            let i = 0;
-            while (i < pathSafer.length) {
-                if (!manualIntervention) {
-                    await this.waitWhilePaused();
-                    let state = await this.api.getState();
-                    let currentAngles = state.currentAngles;
-                    if (!this.arraysAlmostEqual(currentAngles, pathSafer[i])) {
-                        console.warn("Robot moved during pause, re-interpolating path...");
-                        if(currentAngles[1] > 50) {
-                            await this.moveToSaferPosition(currentAngles, duration);
-                            state = await this.api.getState();
-                            currentAngles = state.currentAngles;
-                        }
-                        // Recalculate path with current angles
-                        pathSafer = await this.api.getInterpolatedPath(currentAngles, saferAngles, 30);
-                        i = 0; // Reset index to start from the new path
-                        continue; // Restart the loop with the new path
-                    }
-                }
-                const limitCheck = await this.api.check_joint_limits(pathSafer[i]);
-                if (limitCheck && limitCheck.success === false) {
-                    console.warn('❌ Joint limit violation detected, stopping animation');
-                    this.ui.showStatus(
-                        'Joints are at their limits. Movement would damage the robot.',
-                        'error'
-                    );
-                    return;
-                }
-                this.setJointAngles(pathSafer[i]);
-                if (this.ui.updateJointDisplays) this.ui.updateJointDisplays(pathSafer[i]);
-                await this.api.setCurrentAngles(pathSafer[i]);
-                await this.sleep(duration / pathSafer.length);
-                i++;
-                }
+            await this.moveTo(startAngles, saferAngles, duration, manualIntervention);
             if (this.automation.stepAutomation === 'drop') {
-                await this.moveTo(pathSafer[i],this.automation.positions[`${this.automation.targetBin}BinApproach`], duration);
+                await this.moveTo(saferAngles, this.automation.positions[`${this.automation.targetBin}BinApproach`], duration);
             } else if (this.automation.stepAutomation === 'pick') {
-                await this.moveTo(pathSafer[i], this.automation.positions[`${this.automation.sourceBin}BinApproach`], duration);
+                await this.moveTo(saferAngles, this.automation.positions[`${this.automation.sourceBin}BinApproach`], duration);
             }
             console.log('✅ Robot movement to safer position finished');
-            await this.api.setMovingState(false);
-            await this.ui.updateAutomationStatus();            
             
         } catch (error) {
             console.error('❌ Robot movement to safer position failed:', error);
             throw error;
         } finally {
-            this.api.setMovingState(false);
             await this.ui.updateAutomationStatus();
         }
     }
@@ -210,15 +165,8 @@ class RobotManager {
         return true;
     }
 
-    arraysAlmostEqual(a, b, tol = 2.0) {
-        for (let i = 0; i < a.length; i++) {
-            if (Math.abs(a[i] - b[i]) > tol) return false;
-        }
-        return true;
-    }
-    
-    async pickObject(binName) {
-        await this.sleep(500); // Simulate gripper closing
+    async pickObject(binName, simulateGripper = true) {
+        if (simulateGripper) await this.sleep(500); // Simulate gripper closing
         this.currentlyHeldObject = this.automation.binManager.pickupObject(binName);
         if (this.currentlyHeldObject) {
             this.attachObjectToRobot(this.currentlyHeldObject);
@@ -238,9 +186,9 @@ class RobotManager {
         }
     }
 
-    async dropObject(binName) {
+    async dropObject(binName, simulateGripper = true) {
         if (!this.currentlyHeldObject) throw new Error('No object to drop');
-        await this.sleep(500); // Simulate gripper opening
+        if (simulateGripper) await this.sleep(500); // Simulate gripper opening
         this.automation.binManager.dropObject(this.currentlyHeldObject, binName);
         this.detachObjectFromRobot();
         this.currentlyHeldObject = null;
@@ -260,24 +208,6 @@ class RobotManager {
         }
     }
 
-    async waitWhilePaused() {
-        let state = await this.api.getState();
-        while (state.isEmergencyMode || state.isPaused || state.isSafetyMode) {
-            this.api.setMovingState(false); // Ensure robot is not moving
-            if (state.isEmergencyMode) {
-                console.warn('⏸️ Waiting for emergency mode to clear...');
-            } else if (state.isPaused) {
-                console.warn('⏸️ Waiting for user pause to end...');
-            } else if (state.isSafetyMode) {
-                console.warn('⏸️ Waiting for safety mode to end...');
-            }
-            this.ui.updateAutomationStatus();
-            await this.sleep(100); // Check every 100ms
-            state = await this.api.getState();
-        }
-        
-    }
-
     sleep(ms) {
         return new Promise(resolve => setTimeout(resolve, ms));
     }
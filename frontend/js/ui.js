@@ -123,12 +123,8 @@ class UIManager {
 
             // Reset the scene
             if (this.robot.sceneManager.reset) {
-                await this.api.setCurrentAngles(resetData.targetAngles);
-                await this.api.setMovingState(false);
-                await this.api.setPauseState(false);
-                await this.api.setStopState(false);
-                await this.api.setEmergencyState(false);
-                await this.api.setSafetyMode(false);
+                // Home pose and every flag cleared in one state change
+                await this.api.sendCommands([{ command: 'reset' }]);
                 this.updateJointDisplays(resetData.currentAngles);
                 this.updateAutomationStatus();
                 this.updateAutomationButtons();
@@ -172,8 +168,10 @@ class UIManager {
                 this.automation.automationLoopPromise = null;
             }        
             if (this.automation.automationInterval) clearTimeout(this.automation.automationInterval);
-            this.api.setMovingState(false);
-            this.api.setStopState(false);
+            await this.api.sendCommands([
+                { command: 'moving', value: false },
+                { command: 'stop', value: false }
+            ]);
             console.log('✅ Automation stopped');
             this.updateAutomationButtons();
             this.toggleOverrideControls();
@@ -186,8 +184,10 @@ class UIManager {
     
     async handlePauseAutomation() {
         try {
-            await this.api.setPauseState(true);
-            await this.api.setMovingState(false);
+            await this.api.sendCommands([
+                { command: 'pause', value: true },
+                { command: 'moving', value: false }
+            ]);
             await this.updateAutomationStatus();
             await this.updatePauseResumeButtons();
             await this.toggleOverrideControls();
@@ -201,8 +201,10 @@ class UIManager {
 
     async handleResumeAutomation() {
         try {
-            await this.api.setPauseState(false);
-            await this.api.setMovingState(true);
+            await this.api.sendCommands([
+                { command: 'pause', value: false },
+                { command: 'moving', value: true }
+            ]);
             await this.updateAutomationStatus();
             await this.toggleOverrideControls();
             await this.updateAutomationButtons();